@@ -1,74 +1,401 @@
 # app.py
 
-from flask import Flask, jsonify, request
+import itertools
+import math
+import threading
+import time
+from dataclasses import replace
+from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timezone
 
-from config import KEYWORDS
+import config
+from config import (
+    SUMMARY_MAX_WORKERS, SUMMARY_DEADLINE_SECONDS,
+    CACHE_STALE_SECONDS, CACHE_LOCK_TTL_SECONDS, CACHE_LOCK_WAIT_SECONDS,
+    PREWARM_ENABLED, DATA_RELOAD_INTERVAL_SECONDS, PRELOAD_APP,
+    SUMMARY_PAGE_MAX, SUMMARY_QUERY_CACHE_ENTRIES, HISTORY_DEFAULT_DAYS,
+    SEARCH_DEFAULT_RESULTS, SEARCH_MAX_RESULTS, SEARCH_SUGGESTIONS,
+    DETAIL_BATCH_MAX_KEYWORDS, DETAIL_DEADLINE_SECONDS, ANALYSIS_DEADLINE_SECONDS,
+    COLD_FETCH_MAX_INFLIGHT, COLD_FETCH_BACKGROUND_MAX_INFLIGHT, COLD_WAIT_MAX_REQUESTS,
+)
 from cache import cache_manager
+from cache.singleflight import SingleFlight
 from services import trends_service, marketplace_service, pinterest_service, scoring_engine
+from services import scheduler, data_sources, history_store, keyword_index
+from services.analysis import analysis_inputs, analysis_ttl, build_analysis, degraded_analysis
+from services.records import Analysis
+from services.summary_index import SummaryIndex, SORT_FIELDS, encode_cursor, decode_cursor
+from utils import deadline, metrics
+from utils.metrics import STAGE_SECONDS, REQUEST_SECONDS, ADMISSION_SHED, Gauge
+from utils.rate_limiter import PriorityLimiter
+from utils.snapshot import Snapshot, dumps
 
 app = Flask(__name__)
 CORS(app)  # Allow requests from Flutter app on any origin
 
+# Shared, bounded pool for per-keyword pipelines. Work that misses a summary
+# deadline keeps running here and lands in the cache for the next poll.
+_EXECUTOR = ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS, thread_name_prefix="analysis")
+_INFLIGHT: dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
 
-def get_full_analysis(keyword: str) -> dict:
+# Collapses concurrent computations of the same analysis into one
+_FLIGHTS = SingleFlight()
+
+# Admission for cold work, i.e. anything that has to go to Google. Priority
+# classes, highest first: /api/health and warm (cached) reads are never
+# gated; analyses a request is waiting for ("request") may take any of
+# COLD_FETCH_MAX_INFLIGHT slots; stale-result refreshes ("background") only
+# start while fewer than COLD_FETCH_BACKGROUND_MAX_INFLIGHT are taken.
+# _COLD_WAITS bounds the request threads blocked on cold work. Nothing
+# waits for a slot — work that isn't admitted degrades right away.
+_COLD_FETCHES = PriorityLimiter({"request": COLD_FETCH_MAX_INFLIGHT, "background": COLD_FETCH_BACKGROUND_MAX_INFLIGHT})
+_COLD_WAITS = PriorityLimiter({"request": COLD_WAIT_MAX_REQUESTS})
+
+Gauge("trendspire_cold_fetches_inflight", "Analyses fetching from Google right now (admitted cold work).",
+      lambda: _COLD_FETCHES.inflight)
+Gauge("trendspire_cold_waits_inflight", "Request threads waiting on cold work right now.",
+      lambda: _COLD_WAITS.inflight)
+
+def _on_keywords_reload(old: dict, new: dict):
+    config.KEYWORD_CATEGORIES = new
+    config.KEYWORDS = list(new)
+    keyword_index.rebuild(new)
+    data_sources.invalidate_analyses(old.keys() - new.keys())
+
+
+# The active keyword list is hot-reloaded like the signal CSVs
+_keywords_source = data_sources.register(
+    "keywords", config.KEYWORDS_CSV_PATH, config.read_keywords, _on_keywords_reload,
+    fallback=lambda: config.KEYWORD_CATEGORIES,
+)
+config.KEYWORD_CATEGORIES = _keywords_source.current
+config.KEYWORDS = list(_keywords_source.current)
+keyword_index.rebuild(config.KEYWORDS)
+
+# Pre-encoded responses, rebuilt only when their content changes
+_DETAIL_SNAPSHOTS: dict[str, Snapshot] = {}
+
+# The current summary as (snapshot, query index over its rows, payload),
+# replaced as one tuple so readers never pair a snapshot with another
+# build's index. Versions come from one counter: two threads rebuilding at
+# once never share a version. Encoded responses for recent filtered/sorted
+# queries are keyed by that version.
+_SUMMARY = None
+_SUMMARY_VERSIONS = itertools.count(1)
+_QUERY_SNAPSHOTS: dict[tuple, Snapshot] = {}
+
+
+def get_full_analysis(keyword: str) -> Analysis:
     """
     Core pipeline for one keyword:
     1. Check cache
     2. Fetch all three signals
     3. Compute score, classify, recommend
     4. Cache and return result
+
+    Concurrent misses for the same keyword share one computation
+    (single-flight within this process, a cache lock across workers).
+    Results that expired less than CACHE_STALE_SECONDS ago are returned
+    immediately while a single background refresh replaces them (unless the
+    pre-warming scheduler is running — it owns refreshes then).
     """
-    cache_key = f"analysis:{keyword}"
-    cached = cache_manager.get(cache_key)
+    cached = get_cached_analysis(keyword)
     if cached:
-        cached["cached"] = True
         return cached
 
-    # Fetch all three signals
-    google     = trends_service.fetch_google_trends(keyword)
+    cache_key = f"analysis:{keyword}"
+    result, _ = _FLIGHTS.do(cache_key, lambda: _load_analysis(keyword))
+    # A background revalidation that lost the cross-worker lock returns None
+    return result or _load_analysis(keyword)
+
+
+def get_cached_analysis(keyword: str):
+    """
+    The cached analysis (fresh or stale) without computing anything, or None.
+    A stale hit kicks off the background refresh.
+    """
+    cache_key = f"analysis:{keyword}"
+    with STAGE_SECONDS.time("cache_lookup"):
+        entry = cache_manager.get_entry(cache_key)
+    if entry is None:
+        return None
+    cached, fresh = entry
+    if not isinstance(cached, Analysis):
+        # Written before analyses were records; recomputed like a miss
+        return None
+    if not _inputs_current(cached):
+        cached = _FLIGHTS.do(f"rescore:{keyword}", lambda: _rescore(keyword, cached))[0]
+    if not fresh and not scheduler.is_running():
+        _revalidate_in_background(keyword)
+    return replace(cached, cached=True)
+
+
+def _inputs_current(analysis: Analysis) -> bool:
+    """True if the local signals and scoring rules are the versions the analysis was built from."""
+    inputs = analysis.inputs
+    return (
+        inputs.scoring == scoring_engine.VERSION and
+        inputs.marketplace == marketplace_service.version() and
+        inputs.pinterest == pinterest_service.version()
+    )
+
+
+def _rescore(keyword: str, analysis: Analysis) -> Analysis:
+    """
+    Brings a cached analysis up to date with the current marketplace/Pinterest
+    data and scoring rules, reusing its Google signal — no network call.
+    Derived fields are only recomputed if an input row or the rules changed;
+    otherwise just the recorded versions move forward.
+    """
+    google = analysis.google
     marketplace = marketplace_service.get_marketplace_signal(keyword)
-    pinterest  = pinterest_service.get_pinterest_signal(keyword)
+    pinterest = pinterest_service.get_pinterest_signal(keyword)
+    unchanged = (
+        marketplace == analysis.marketplace and
+        pinterest == analysis.pinterest and
+        analysis.inputs.scoring == scoring_engine.VERSION
+    )
+    if unchanged:
+        result = replace(analysis, inputs=analysis_inputs(google))
+    else:
+        with STAGE_SECONDS.time("rescore"):
+            result = build_analysis(keyword, google, marketplace, pinterest)
+    # Same Google signal, so the entry keeps its expiry and stale window: a
+    # rescore must not keep a stale analysis around longer
+    with STAGE_SECONDS.time("cache_store"):
+        if not cache_manager.replace_value(f"analysis:{keyword}", result):
+            cache_manager.set(f"analysis:{keyword}", result, ttl=analysis_ttl(result), stale_ttl=CACHE_STALE_SECONDS)
+    if not unchanged:
+        with STAGE_SECONDS.time("history"):
+            history_store.record(result)
+    return result
 
-    # Compute score and derive outputs
-    trend_score    = scoring_engine.compute_trend_score(google, marketplace, pinterest)
-    classification = scoring_engine.classify(trend_score, google["growth_pct"])
-    rec            = scoring_engine.recommend(classification, trend_score)
-    explanation    = scoring_engine.build_explanation(classification, google, marketplace, pinterest)
 
-    result = {
-        "keyword": keyword,
-        "trend_score": trend_score,
-        "classification": classification,
-        "recommendation": rec["action"],
-        "adjustment_pct": rec["adjustment_pct"],
-        "explanation": explanation,
-        "signals": {
-            "google_trends": google,
-            "marketplace": marketplace,
-            "pinterest": pinterest
-        },
-        "generated_at": datetime.utcnow().isoformat(),
-        "cached": False
-    }
+def _load_analysis(keyword: str) -> Analysis:
+    """Computes and caches a missing analysis, or waits for the worker already doing it."""
+    cache_key = f"analysis:{keyword}"
+    if not cache_manager.acquire_lock(cache_key, ttl=CACHE_LOCK_TTL_SECONDS):
+        cached = cache_manager.wait_for(cache_key, timeout=deadline.remaining(CACHE_LOCK_WAIT_SECONDS))
+        if isinstance(cached, Analysis):
+            return replace(cached, cached=True)
+        # The holder is stuck or died — compute it ourselves
+        return _store_analysis(keyword)
 
-    cache_manager.set(cache_key, result)
+    try:
+        return _store_analysis(keyword)
+    finally:
+        cache_manager.release_lock(cache_key)
+
+
+def _revalidate(keyword: str, max_age: Optional[float] = None):
+    """
+    Background refresh of a stale analysis. Skipped if another worker is already on it.
+    max_age is passed on to fetch_google_trends.
+    """
+    cache_key = f"analysis:{keyword}"
+    if not cache_manager.acquire_lock(cache_key, ttl=CACHE_LOCK_TTL_SECONDS):
+        return None
+    try:
+        return _store_analysis(keyword, max_age)
+    except Exception as e:
+        print(f"[ANALYSIS] Background refresh failed for '{keyword}': {e}")
+        return None
+    finally:
+        cache_manager.release_lock(cache_key)
+
+
+def _revalidate_in_background(keyword: str):
+    """
+    Starts _revalidate on the shared pool at background priority. If that
+    would need a cold slot and none is free, nothing is started — the stale
+    result stays in place and a later hit tries again.
+    """
+    admitted, holds_slot = admit_analysis(keyword, "background")
+    if not admitted:
+        return
+
+    def run():
+        try:
+            with deadline.detached(ANALYSIS_DEADLINE_SECONDS):
+                return _revalidate(keyword)
+        finally:
+            if holds_slot:
+                release_cold_fetch()
+
+    try:
+        started = _FLIGHTS.go(f"analysis:{keyword}", run, _EXECUTOR)
+    except RuntimeError as e:
+        # The pool is shut down (worker exiting): the stale result stays
+        print(f"[ANALYSIS] Could not start background refresh for '{keyword}': {e}")
+        started = False
+    if not started and holds_slot:
+        release_cold_fetch()
+
+
+def admit_analysis(keyword: str, priority: str) -> tuple:
+    """
+    Cold-fetch admission for computing keyword's analysis: (admitted, holds_slot).
+    One whose Google signal is cached, or is being fetched by a batch
+    prefetch (which already bounds that Google traffic), needs no slot and
+    is always admitted; one that took a slot gives it back with
+    release_cold_fetch() when done.
+    """
+    if trends_service.is_cached(keyword) or trends_service.is_prefetching(keyword):
+        return True, False
+    admitted = _admit(_COLD_FETCHES, "cold_fetch", priority)
+    return admitted, admitted
+
+
+def release_cold_fetch():
+    _COLD_FETCHES.release()
+
+
+def _admit(limiter: PriorityLimiter, limit: str, priority: str) -> bool:
+    """limiter.try_acquire, counting refusals for /api/metrics."""
+    if limiter.try_acquire(priority):
+        return True
+    ADMISSION_SHED.inc(limit, priority)
+    return False
+
+
+def refresh_analysis(keyword: str):
+    """
+    Recomputes and caches an analysis now, whatever its cache state. Used by
+    the scheduler: a Google signal that is due for refresh is refetched
+    rather than reused, so the new analysis expires later than the old one.
+    """
+    result, _ = _FLIGHTS.do(
+        f"analysis:{keyword}", lambda: _revalidate(keyword, max_age=scheduler.REFRESH_MAX_AGE_SECONDS))
+    return result
+
+
+def _store_analysis(keyword: str, max_age: Optional[float] = None) -> Analysis:
+    result = _compute_analysis(keyword, max_age)
+    with STAGE_SECONDS.time("cache_store"):
+        cache_manager.set(f"analysis:{keyword}", result, ttl=analysis_ttl(result), stale_ttl=CACHE_STALE_SECONDS)
+    with STAGE_SECONDS.time("history"):
+        history_store.record(result)
     return result
 
 
+def _compute_analysis(keyword: str, max_age: Optional[float] = None) -> Analysis:
+    """Fetches all three signals and derives score, classification and recommendation."""
+    with STAGE_SECONDS.time("google"):
+        google     = trends_service.fetch_google_trends(keyword, max_age=max_age)
+    with STAGE_SECONDS.time("marketplace"):
+        marketplace = marketplace_service.get_marketplace_signal(keyword)
+    with STAGE_SECONDS.time("pinterest"):
+        pinterest  = pinterest_service.get_pinterest_signal(keyword)
+    with STAGE_SECONDS.time("scoring"):
+        return build_analysis(keyword, google, marketplace, pinterest)
+
+
+def submit_analysis(keyword: str) -> Optional[Future]:
+    """
+    Schedules get_full_analysis on the shared pool, with its own
+    ANALYSIS_DEADLINE_SECONDS budget (it outlives the requests waiting on it).
+    A keyword that is already being computed reuses the running future,
+    so repeated dashboard polls during a cold load don't queue duplicates.
+    One that needs a Google fetch must get a cold slot first; returns None
+    if none is free (shed — the caller degrades).
+    """
+    with _INFLIGHT_LOCK:
+        fut = _INFLIGHT.get(keyword)
+        if fut is not None:
+            return fut
+        admitted, holds_slot = admit_analysis(keyword, "request")
+        if not admitted:
+            return None
+        try:
+            fut = _EXECUTOR.submit(_run_analysis, keyword)
+        except BaseException:
+            if holds_slot:
+                release_cold_fetch()
+            raise
+        _INFLIGHT[keyword] = fut
+    # Outside the lock: a future that has already finished runs the callback
+    # right here, and _clear_inflight takes the lock itself
+    fut.add_done_callback(lambda f, k=keyword, h=holds_slot: _clear_inflight(k, f, h))
+    return fut
+
+
+def _run_analysis(keyword: str) -> Analysis:
+    with deadline.detached(ANALYSIS_DEADLINE_SECONDS):
+        return get_full_analysis(keyword)
+
+
+def _clear_inflight(keyword: str, fut: Future, holds_slot: bool):
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT.get(keyword) is fut:
+            del _INFLIGHT[keyword]
+    if holds_slot:
+        release_cold_fetch()
+
+
+def serve_analysis(keyword: str) -> Analysis:
+    """
+    The analysis for one request, within DETAIL_DEADLINE_SECONDS (or the
+    enclosing deadline). Cached results are served as they are. Otherwise
+    the request waits for the shared computation until its budget runs out,
+    and gets degraded_analysis if it was shed or ran out of time — the
+    computation, if admitted, keeps going and fills the cache.
+    """
+    cached = get_cached_analysis(keyword)
+    if cached:
+        return cached
+
+    fut = submit_analysis(keyword)
+    if fut is None or not _admit(_COLD_WAITS, "cold_wait", "request"):
+        return degraded_analysis(keyword, reason="overloaded")
+    try:
+        return fut.result(timeout=deadline.remaining(DETAIL_DEADLINE_SECONDS))
+    except TimeoutError:
+        return degraded_analysis(keyword, reason="deadline")
+    finally:
+        _COLD_WAITS.release()
+
+
+def _summary_row(analysis: Analysis) -> dict:
+    """Lightweight projection of a full analysis for the dashboard list."""
+    return analysis.to_summary_row(config.KEYWORD_CATEGORIES.get(analysis.keyword))
+
+
 # ─────────────────────────────────────────────
 # ROUTES
 # ─────────────────────────────────────────────
 
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method, str(response.status_code))
+    return response
+
+
 @app.route("/api/health", methods=["GET"])
 def health():
     """Simple health check. Hit this first during demo to confirm server is up."""
-    return jsonify({
+    return jsonify(health_payload())
+
+
+def health_payload() -> dict:
+    return {
         "status": "ok",
-        "cache_size": cache_manager.size(),
+        "cache": cache_manager.stats(),
+        "google": trends_service.client_status(),
+        "admission": {"cold_fetches": _COLD_FETCHES.inflight, "cold_waits": _COLD_WAITS.inflight},
         "timestamp": datetime.utcnow().isoformat()
-    })
+    }
 
 
 @app.route("/api/trends/summary", methods=["GET"])
@@ -76,29 +403,215 @@ def summary():
     """
     Returns a lightweight score summary for all active keywords.
     This powers the main dashboard list in the Flutter app.
+
+    Optional query parameters narrow it down (see parse_summary_query), e.g.
+    GET /api/trends/summary?category=outerwear&classification=Accelerating&sort=trend_score&limit=20
+
+    Keywords are analysed concurrently on the shared pool. Anything not
+    finished within SUMMARY_DEADLINE_SECONDS comes back as a row with
+    status "pending" (or "error") instead of holding up the response, as do
+    cold keywords that weren't admitted (see submit_analysis). Under load
+    (COLD_WAIT_MAX_REQUESTS) the response doesn't wait at all.
+    With the pre-warming scheduler running, only precomputed results are
+    read; keywords it hasn't reached yet are "pending".
+    """
+    try:
+        query = parse_summary_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    analyses = {keyword: get_cached_analysis(keyword) for keyword in config.KEYWORDS}
+    errors = set()
+
+    cold = [k for k, analysis in analyses.items() if analysis is None]
+    if cold and not scheduler.is_running():
+        # Cold keywords get their Google data from a few multi-term requests;
+        # the per-keyword pipelines below pick it up instead of fetching alone.
+        trends_service.prefetch_google_trends(cold)
+
+        # Keywords the prefetch covers need no cold slot; any others that
+        # weren't admitted stay "pending" and a later poll retries them
+        futures = [(keyword, fut) for keyword in cold if (fut := submit_analysis(keyword)) is not None]
+        if futures and _admit(_COLD_WAITS, "cold_wait", "request"):
+            try:
+                wait([fut for _, fut in futures], timeout=SUMMARY_DEADLINE_SECONDS)
+            finally:
+                _COLD_WAITS.release()
+
+        for keyword, fut in futures:
+            if not fut.done():
+                continue
+            if fut.exception() is not None:
+                print(f"[SUMMARY] Analysis failed for '{keyword}': {fut.exception()}")
+                errors.add(keyword)
+            else:
+                analyses[keyword] = fut.result()
+
+    snapshot = summary_snapshot(analyses, errors)
+    if query:
+        snapshot = summary_query_snapshot(query)
+    return _snapshot_response(snapshot)
+
+
+def summary_snapshot(analyses: dict, errors: set) -> Snapshot:
     """
+    Reuses the last encoded summary unless some row changed. The fingerprint
+    is each keyword's analysis timestamp/state, so an unchanged dashboard
+    costs no row building, serialization or compression.
+    """
+    global _SUMMARY
+    categories = config.KEYWORD_CATEGORIES
+    fingerprint = tuple(
+        (keyword, categories.get(keyword),
+         analysis.generated_at if analysis else ("error" if keyword in errors else "pending"))
+        for keyword, analysis in analyses.items()
+    )
+    current = _SUMMARY
+    if current is not None and current[0].fingerprint == fingerprint:
+        return current[0]
+
     results = []
-    for keyword in KEYWORDS:
-        analysis = get_full_analysis(keyword)
-        results.append({
-            "keyword": analysis["keyword"],
-            "trend_score": analysis["trend_score"],
-            "classification": analysis["classification"],
-            "recommendation": analysis["recommendation"],
-            "adjustment_pct": analysis["adjustment_pct"],
-            "signals": {
-                "google_trends_score": analysis["signals"]["google_trends"]["normalized_score"],
-                "marketplace_score": analysis["signals"]["marketplace"]["normalized_score"],
-                "pinterest_score": analysis["signals"]["pinterest"]["normalized_score"]
-            }
-        })
+    for keyword, analysis in analyses.items():
+        if analysis is not None:
+            results.append(_summary_row(analysis))
+        else:
+            results.append({
+                "keyword": keyword,
+                "category": categories.get(keyword),
+                "status": "error" if keyword in errors else "pending",
+            })
 
-    return jsonify({
-        "status": "ok",
-        "generated_at": datetime.utcnow().isoformat(),
+    # The newest analysis time, so every worker holding the same cached
+    # data produces byte-identical output (and the same ETag)
+    stamps = [analysis.generated_at for analysis in analyses.values() if analysis]
+    generated_at = max(stamps) if stamps else datetime.utcnow().isoformat()
+    pending = sum(1 for row in results if row["status"] == "pending")
+
+    payload = {
+        "status": "partial" if pending else "ok",
+        "generated_at": generated_at,
         "count": len(results),
+        "pending": pending,
         "data": results
-    })
+    }
+    snapshot = Snapshot(payload, fingerprint, next(_SUMMARY_VERSIONS), datetime.fromisoformat(generated_at))
+    _SUMMARY = (snapshot, SummaryIndex(results), payload)
+    return snapshot
+
+
+def parse_summary_query(args) -> dict:
+    """
+    Filter/sort/page options from summary query parameters ({} if none).
+    Raises ValueError with a client-facing message for invalid values.
+
+      category        comma-separated categories from keywords.csv
+      classification  comma-separated classifications (e.g. Accelerating)
+      min_score       trend_score lower bound (inclusive)
+      max_score       trend_score upper bound (inclusive)
+      sort            trend_score, adjustment_pct, google_trends_score,
+                      marketplace_score or pinterest_score
+      order           desc (default) or asc
+      limit           page size, 1..SUMMARY_PAGE_MAX
+      cursor          next_cursor from the previous page
+    """
+    query = {}
+    for name in ("category", "classification"):
+        values = [v.strip() for v in (args.get(name) or "").split(",") if v.strip()]
+        if values:
+            query[name] = tuple(sorted(set(values)))
+    unknown = set(query.get("classification", ())) - set(scoring_engine.CLASSIFICATIONS)
+    if unknown:
+        raise ValueError(f"Unknown classification: {', '.join(sorted(unknown))}. "
+                         f"Use one of: {', '.join(scoring_engine.CLASSIFICATIONS)}.")
+
+    for name in ("min_score", "max_score"):
+        if args.get(name):
+            try:
+                query[name] = float(args[name])
+            except ValueError:
+                raise ValueError(f"'{name}' must be a number.")
+            if not math.isfinite(query[name]):
+                raise ValueError(f"'{name}' must be a finite number.")
+
+    if args.get("sort"):
+        if args["sort"] not in SORT_FIELDS:
+            raise ValueError(f"'sort' must be one of: {', '.join(SORT_FIELDS)}.")
+        query["sort"] = args["sort"]
+    order = (args.get("order") or "desc").lower()
+    if order not in ("asc", "desc"):
+        raise ValueError("'order' must be 'asc' or 'desc'.")
+    if "sort" in query:
+        query["order"] = order
+
+    if args.get("limit"):
+        try:
+            query["limit"] = int(args["limit"])
+        except ValueError:
+            raise ValueError("'limit' must be an integer.")
+        if not 1 <= query["limit"] <= SUMMARY_PAGE_MAX:
+            raise ValueError(f"'limit' must be between 1 and {SUMMARY_PAGE_MAX}.")
+    if args.get("cursor"):
+        decode_cursor(args["cursor"], query.get("sort"))
+        query["cursor"] = args["cursor"]
+    return query
+
+
+def summary_query_snapshot(query: dict) -> Snapshot:
+    """One filtered/sorted page of the summary, encoded once per summary version."""
+    summary, index, base = _SUMMARY
+    version = summary.version
+    key = tuple(sorted(query.items()))
+    snapshot = _QUERY_SNAPSHOTS.get(key)
+    if snapshot is not None and snapshot.fingerprint == version:
+        return snapshot
+
+    after = decode_cursor(query["cursor"], query.get("sort")) if "cursor" in query else None
+    total, rows, last_key = index.query(
+        categories=query.get("category"),
+        classifications=query.get("classification"),
+        min_score=query.get("min_score"),
+        max_score=query.get("max_score"),
+        sort=query.get("sort"),
+        descending=query.get("order") != "asc",
+        limit=query.get("limit"),
+        after=after,
+    )
+    payload = {
+        "status": base["status"],
+        "generated_at": base["generated_at"],
+        "count": len(rows),
+        "total": total,
+        "pending": base["pending"],
+        "data": rows,
+        "next_cursor": encode_cursor(last_key) if last_key is not None else None,
+    }
+    snapshot = Snapshot(payload, version, modified_at=datetime.fromisoformat(base["generated_at"]))
+    if len(_QUERY_SNAPSHOTS) >= SUMMARY_QUERY_CACHE_ENTRIES:
+        _QUERY_SNAPSHOTS.clear()
+    _QUERY_SNAPSHOTS[key] = snapshot
+    return snapshot
+
+
+def detail_snapshot(keyword: str, result: Analysis) -> Snapshot:
+    """Encoded detail payload, reused while the analysis is unchanged."""
+    fingerprint = (result.generated_at, result.cached)
+    snapshot = _DETAIL_SNAPSHOTS.get(keyword)
+    if snapshot is None or snapshot.fingerprint != fingerprint:
+        snapshot = Snapshot(result.to_detail(), fingerprint, modified_at=datetime.fromisoformat(result.generated_at))
+        _DETAIL_SNAPSHOTS[keyword] = snapshot
+    return snapshot
+
+
+def _snapshot_response(snapshot: Snapshot):
+    """Serves a pre-encoded snapshot, answering a matching If-None-Match with 304."""
+    headers = snapshot.headers()
+    if snapshot.matches(request.headers.get("If-None-Match")):
+        return Response(status=304, headers=headers)
+
+    body, encoding = snapshot.encoded(request.headers.get("Accept-Encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, mimetype="application/json", headers=headers)
 
 
 @app.route("/api/trends/detail", methods=["GET"])
@@ -107,20 +620,252 @@ def detail():
     Returns the full breakdown for a single keyword.
     Use: GET /api/trends/detail?keyword=oversized+linen+shirt
     This powers the detail screen in the Flutter app.
+    A keyword that isn't cached and can't be computed within
+    DETAIL_DEADLINE_SECONDS, or under load, is served with Google
+    neutral-filled (see serve_analysis).
     """
-    keyword = request.args.get("keyword", "").strip()
+    keyword, error = resolve_keyword(request.args.get("keyword", ""))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    scheduler.record_request(keyword)
+    result = serve_analysis(keyword)
+    return _snapshot_response(detail_snapshot(keyword, result))
 
-    if not keyword:
-        return jsonify({"error": "Missing 'keyword' query parameter."}), 400
 
-    if keyword not in KEYWORDS:
-        return jsonify({
-            "error": f"Keyword '{keyword}' is not in the supported list.",
-            "supported_keywords": KEYWORDS
-        }), 404
+def resolve_keyword(text: str) -> tuple:
+    """
+    (supported keyword, None), or (None, (error payload, HTTP status)) if it
+    can't be served. Case and extra whitespace are ignored; an unknown
+    keyword's 404 suggests the closest supported ones.
+    """
+    text = text.strip()
+    if not text:
+        return None, ({"error": "Missing 'keyword' query parameter."}, 400)
 
-    result = get_full_analysis(keyword)
-    return jsonify(result)
+    keyword = keyword_index.resolve(text)
+    if keyword is None:
+        return None, ({
+            "error": f"Keyword '{text}' is not in the supported list.",
+            "suggestions": [match["keyword"] for match in keyword_index.search(text, SEARCH_SUGGESTIONS)],
+        }, 404)
+    return keyword, None
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+@app.route("/api/trends/detail/batch", methods=["GET", "POST"])
+def detail_batch():
+    """
+    Full analyses for several keywords in one request, streamed as NDJSON:
+    one detail object per line, written as soon as that keyword is ready
+    (cached ones first). A keyword that can't be served gets an inline
+    {"keyword", "error"} line instead. Cold keywords that are shed, or not
+    ready within SUMMARY_DEADLINE_SECONDS, are sent with Google neutral-filled.
+    Use: POST /api/trends/detail/batch with {"keywords": ["cargo pants men", ...]}
+     or: GET /api/trends/detail/batch?keyword=cargo+pants+men&keyword=...
+    """
+    try:
+        keywords = parse_batch_keywords(
+            request.args.getlist("keyword"),
+            request.get_json(silent=True) if request.method == "POST" else None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return Response(_batch_lines(keywords), mimetype=NDJSON_MIMETYPE)
+
+
+def parse_batch_keywords(args: list, body) -> list:
+    """
+    Keywords for a batch request, from repeated ?keyword= parameters or a JSON
+    body {"keywords": [...]}, de-duplicated in order. Raises ValueError with a
+    client-facing message.
+    """
+    keywords = list(args)
+    if body is not None:
+        requested = body.get("keywords") if isinstance(body, dict) else None
+        if not isinstance(requested, list) or not all(isinstance(k, str) for k in requested):
+            raise ValueError("Body must be {\"keywords\": [\"...\", ...]}.")
+        keywords += requested
+    keywords = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))
+    if not keywords:
+        raise ValueError("Pass at least one keyword.")
+    if len(keywords) > DETAIL_BATCH_MAX_KEYWORDS:
+        raise ValueError(f"At most {DETAIL_BATCH_MAX_KEYWORDS} keywords per request.")
+    return keywords
+
+
+def batch_cached(keywords: list) -> tuple:
+    """
+    First pass of a batch: ([NDJSON lines ready now], [keywords to compute]).
+    Ready lines are cached analyses and inline errors.
+    """
+    ready, cold, seen = [], [], set()
+    for text in keywords:
+        keyword, error = resolve_keyword(text)
+        if error:
+            ready.append(batch_line({"keyword": text, **error[0]}))
+            continue
+        if keyword in seen:
+            continue
+        seen.add(keyword)
+        scheduler.record_request(keyword)
+        cached = get_cached_analysis(keyword)
+        if cached:
+            ready.append(batch_line(cached.to_detail()))
+        else:
+            cold.append(keyword)
+    return ready, cold
+
+
+def batch_line(payload: dict) -> bytes:
+    return dumps(payload) + b"\n"
+
+
+def _batch_lines(keywords: list):
+    ready, cold = batch_cached(keywords)
+    yield from ready
+    if not cold:
+        return
+
+    # Cold keywords share a few multi-term Google requests, as in the summary
+    if len(cold) > 1:
+        trends_service.prefetch_google_trends(cold)
+    futures = {}
+    for keyword in cold:
+        fut = submit_analysis(keyword)
+        if fut is None:
+            yield batch_line(degraded_analysis(keyword, reason="overloaded").to_detail())
+        else:
+            futures[fut] = keyword
+    if not futures:
+        return
+
+    if not _admit(_COLD_WAITS, "cold_wait", "request"):
+        for keyword in futures.values():
+            yield batch_line(degraded_analysis(keyword, reason="overloaded").to_detail())
+        return
+    try:
+        for fut in as_completed(futures, timeout=SUMMARY_DEADLINE_SECONDS):
+            keyword = futures.pop(fut)
+            try:
+                yield batch_line(fut.result().to_detail())
+            except Exception as e:
+                print(f"[BATCH] Analysis failed for '{keyword}': {e}")
+                yield batch_line({"keyword": keyword, "error": "Analysis failed."})
+    except TimeoutError:
+        for keyword in futures.values():
+            yield batch_line(degraded_analysis(keyword, reason="deadline").to_detail())
+    finally:
+        _COLD_WAITS.release()
+
+
+@app.route("/api/trends/search", methods=["GET"])
+def search():
+    """
+    Keyword autocomplete / fuzzy search, ranked exact > prefix > fuzzy, with
+    each match's cached score (null until it has been analysed).
+    Use: GET /api/trends/search?q=cargo+pan&limit=10
+    """
+    try:
+        return jsonify(search_payload(request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def search_payload(args) -> dict:
+    """Matches for ?q=, with category and cached scores. Raises ValueError for invalid parameters."""
+    text = (args.get("q") or "").strip()
+    if not text:
+        raise ValueError("Missing 'q' query parameter.")
+    limit = SEARCH_DEFAULT_RESULTS
+    if args.get("limit"):
+        try:
+            limit = int(args["limit"])
+        except ValueError:
+            raise ValueError("'limit' must be an integer.")
+        if not 1 <= limit <= SEARCH_MAX_RESULTS:
+            raise ValueError(f"'limit' must be between 1 and {SEARCH_MAX_RESULTS}.")
+
+    rows = []
+    for match in keyword_index.search(text, limit):
+        analysis = get_cached_analysis(match["keyword"])
+        rows.append({
+            **match,
+            "category": config.KEYWORD_CATEGORIES.get(match["keyword"]),
+            "trend_score": analysis.trend_score if analysis else None,
+            "classification": analysis.classification if analysis else None,
+        })
+    return {"query": text, "count": len(rows), "data": rows}
+
+
+@app.route("/api/trends/history", methods=["GET"])
+def history():
+    """
+    Score trajectory for one keyword.
+    Use: GET /api/trends/history?keyword=cargo+pants+men&from=2026-01-01&to=2026-03-31&resolution=day
+    from/to are ISO dates or datetimes (UTC); default is the last
+    HISTORY_DEFAULT_DAYS days. resolution is raw, hour, day or week
+    (default: raw up to 7 days, day up to 180, week beyond).
+    """
+    keyword, error = resolve_keyword(request.args.get("keyword", ""))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    try:
+        payload = history_payload(keyword, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(payload)
+
+
+def history_payload(keyword: str, args) -> dict:
+    """Range query over the history store. Raises ValueError for invalid parameters."""
+    def parse_time(name, default):
+        value = args.get(name)
+        if not value:
+            return default
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"'{name}' must be an ISO date or datetime.")
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+    end = parse_time("to", time.time())
+    start = parse_time("from", end - HISTORY_DEFAULT_DAYS * 86400)
+    if start > end:
+        raise ValueError("'from' must not be after 'to'.")
+
+    resolution = args.get("resolution") or (
+        "raw" if end - start <= 7 * 86400 else "day" if end - start <= 180 * 86400 else "week"
+    )
+    if resolution not in history_store.RESOLUTIONS:
+        raise ValueError(f"'resolution' must be one of: {', '.join(history_store.RESOLUTIONS)}.")
+
+    points = history_store.to_points(history_store.query(keyword, start, end, resolution))
+    return {
+        "keyword": keyword,
+        "from": datetime.fromtimestamp(start, tz=timezone.utc).isoformat(),
+        "to": datetime.fromtimestamp(end, tz=timezone.utc).isoformat(),
+        "resolution": resolution,
+        "count": len(points),
+        "points": points,
+    }
+
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus scrape target: stage/route latency histograms and counters for this worker."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/scheduler/status", methods=["GET"])
+def scheduler_status():
+    """Pre-warming progress: queue depth, refresh counts and rate-limiter tokens."""
+    return jsonify(scheduler.status())
 
 
 # ─────────────────────────────────────────────
@@ -129,6 +874,27 @@ def detail():
 
 import os
 
+
+def start_background():
+    """Starts this process's background threads (threads don't survive a fork)."""
+    if PREWARM_ENABLED:
+        scheduler.start(refresh_analysis)
+
+    if DATA_RELOAD_INTERVAL_SECONDS:
+        data_sources.start_watcher(DATA_RELOAD_INTERVAL_SECONDS)
+
+
+def stop_background():
+    """Signals this process's background threads to finish (worker shutdown)."""
+    scheduler.stop()
+    data_sources.stop()
+
+
+# With a preloading server the master only loads data; each worker calls
+# start_background() after it is forked (see gunicorn.conf.py)
+if not PRELOAD_APP:
+    start_background()
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(debug=False, host="0.0.0.0", port=port)
@@ -0,0 +1,365 @@
+# asgi.py
+
+import asyncio
+import json
+import time
+from dataclasses import replace
+from typing import Optional
+from urllib.parse import parse_qs
+
+import app as wsgi
+import config
+from cache import cache_manager
+from config import (
+    SUMMARY_DEADLINE_SECONDS, DETAIL_DEADLINE_SECONDS, ANALYSIS_DEADLINE_SECONDS,
+    CACHE_STALE_SECONDS, CACHE_LOCK_TTL_SECONDS, CACHE_LOCK_WAIT_SECONDS,
+)
+from services import trends_async, trends_service, marketplace_service, pinterest_service, scheduler, history_store
+from services.records import Analysis
+from utils import deadline, metrics
+from utils.metrics import STAGE_SECONDS, REQUEST_SECONDS
+from utils.snapshot import Snapshot, dumps
+
+# ─────────────────────────────────────────────
+# ASGI entry point
+# ─────────────────────────────────────────────
+# Serves the same routes as app.py (run with `uvicorn asgi:app`) on one
+# event loop. Cache, snapshots, scoring and the scheduler are shared with
+# the Flask app; only the slow part — the Google Trends fetch — is async,
+# so hundreds of in-flight dashboard requests don't need a thread each.
+# Cold-fetch admission is shared with app.py; waiting requests hold no
+# thread here, so only app.py bounds them (COLD_WAIT_MAX_REQUESTS).
+# Cache and history calls block (SQLite, files), and snapshots compress,
+# so they run in the default executor via asyncio.to_thread (cache locks:
+# trends_async's lock helpers), never on the loop itself.
+# ─────────────────────────────────────────────
+
+# keyword -> task computing its analysis on this loop
+_inflight: dict[str, asyncio.Task] = {}
+
+# Routes that also accept POST; their handler gets the request body
+_POST_ROUTES = {"/api/trends/detail/batch"}
+
+_CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+]
+
+
+async def get_full_analysis(keyword: str) -> Analysis:
+    """
+    Async app.serve_analysis: cached (fresh or stale) result, or the shared
+    computation awaited until the caller's deadline budget runs out.
+    Degraded (Google neutral-filled) if it was shed or ran out of time.
+    """
+    cached = await asyncio.to_thread(wsgi.get_cached_analysis, keyword)
+    if cached:
+        return cached
+
+    task = await _analysis_task(keyword)
+    if task is None:
+        return wsgi.degraded_analysis(keyword, reason="overloaded")
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        return wsgi.degraded_analysis(keyword, reason="deadline")
+
+
+async def _analysis_task(keyword: str) -> Optional[asyncio.Task]:
+    """
+    The task computing keyword's analysis on this loop, started if cold-fetch
+    admission allows (see app.submit_analysis); None if it was shed.
+    """
+    task = _inflight.get(keyword)
+    if task is None:
+        # Admission checks the cache (SQLite), so it runs off the loop
+        admitted, holds_slot = await asyncio.to_thread(wsgi.admit_analysis, keyword, "request")
+        if not admitted:
+            return None
+        # Another request may have started it while this one was admitted
+        task = _inflight.get(keyword)
+        if task is not None:
+            if holds_slot:
+                wsgi.release_cold_fetch()
+            return task
+        task = asyncio.ensure_future(_run_analysis(keyword))
+        _inflight[keyword] = task
+        task.add_done_callback(lambda _t: _clear_inflight(keyword, holds_slot))
+    return task
+
+
+def _clear_inflight(keyword: str, holds_slot: bool):
+    _inflight.pop(keyword, None)
+    if holds_slot:
+        wsgi.release_cold_fetch()
+
+
+async def _run_analysis(keyword: str) -> Analysis:
+    # Shared by every request waiting on it, so it runs on a budget of its
+    # own rather than the first caller's
+    with deadline.detached(ANALYSIS_DEADLINE_SECONDS):
+        return await _load_analysis(keyword)
+
+
+async def _load_analysis(keyword: str) -> Analysis:
+    cache_key = f"analysis:{keyword}"
+    if not await trends_async.acquire_lock(cache_key, ttl=CACHE_LOCK_TTL_SECONDS):
+        until = time.monotonic() + deadline.remaining(CACHE_LOCK_WAIT_SECONDS)
+        while time.monotonic() < until and await asyncio.to_thread(cache_manager.locked, cache_key):
+            await asyncio.sleep(0.2)
+        cached = await asyncio.to_thread(cache_manager.get, cache_key)
+        if isinstance(cached, Analysis):
+            return replace(cached, cached=True)
+        return await _compute_analysis(keyword)
+
+    try:
+        return await _compute_analysis(keyword)
+    finally:
+        await trends_async.release_lock(cache_key)
+
+
+async def _compute_analysis(keyword: str) -> Analysis:
+    with STAGE_SECONDS.time("google"):
+        google = await trends_async.fetch_google_trends(keyword)
+    with STAGE_SECONDS.time("marketplace"):
+        marketplace = marketplace_service.get_marketplace_signal(keyword)
+    with STAGE_SECONDS.time("pinterest"):
+        pinterest = pinterest_service.get_pinterest_signal(keyword)
+    with STAGE_SECONDS.time("scoring"):
+        result = wsgi.build_analysis(keyword, google, marketplace, pinterest)
+    with STAGE_SECONDS.time("cache_store"):
+        await asyncio.to_thread(
+            cache_manager.set, f"analysis:{keyword}", result,
+            ttl=wsgi.analysis_ttl(result), stale_ttl=CACHE_STALE_SECONDS,
+        )
+    with STAGE_SECONDS.time("history"):
+        await asyncio.to_thread(history_store.record, result)
+    return result
+
+
+# ─────────────────────────────────────────────
+# ROUTES
+# ─────────────────────────────────────────────
+
+async def health(query: dict, headers: dict):
+    return _json(wsgi.health_payload())
+
+
+async def summary(query: dict, headers: dict):
+    """Same contract as app.summary; cold keywords are fetched concurrently on the loop."""
+    try:
+        summary_query = wsgi.parse_summary_query({name: values[0] for name, values in query.items()})
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+
+    analyses = await asyncio.to_thread(lambda: {keyword: wsgi.get_cached_analysis(keyword) for keyword in config.KEYWORDS})
+    errors = set()
+
+    cold = [k for k, analysis in analyses.items() if analysis is None]
+    if cold and not scheduler.is_running():
+        # Cold keywords get their Google data from a few multi-term requests,
+        # as in app.summary; the per-keyword tasks below wait for it
+        await asyncio.to_thread(trends_service.prefetch_google_trends, cold)
+
+        # Shed keywords stay "pending"; tasks still running at the deadline
+        # keep going and fill the cache
+        started = await asyncio.gather(*(_analysis_task(keyword) for keyword in cold))
+        tasks = {keyword: task for keyword, task in zip(cold, started) if task is not None}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=SUMMARY_DEADLINE_SECONDS)
+
+        for keyword, task in tasks.items():
+            if not task.done():
+                continue
+            if task.exception() is not None:
+                print(f"[SUMMARY] Analysis failed for '{keyword}': {task.exception()}")
+                errors.add(keyword)
+            else:
+                analyses[keyword] = task.result()
+
+    # Encoding and compressing the payload is CPU work: off the loop too
+    snapshot = await asyncio.to_thread(wsgi.summary_snapshot, analyses, errors)
+    if summary_query:
+        snapshot = await asyncio.to_thread(wsgi.summary_query_snapshot, summary_query)
+    return _snapshot(snapshot, headers)
+
+
+async def detail(query: dict, headers: dict):
+    keyword, error = wsgi.resolve_keyword(query.get("keyword", [""])[0])
+    if error:
+        return _json(error[0], error[1])
+
+    scheduler.record_request(keyword)
+    with deadline.scope(DETAIL_DEADLINE_SECONDS):
+        result = await get_full_analysis(keyword)
+    return _snapshot(wsgi.detail_snapshot(keyword, result), headers)
+
+
+async def detail_batch(query: dict, headers: dict, body: bytes = b""):
+    """Same contract as app.detail_batch: NDJSON lines streamed as each keyword completes."""
+    try:
+        keywords = wsgi.parse_batch_keywords(query.get("keyword", []), _json_body(headers, body))
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+    return 200, [(b"content-type", wsgi.NDJSON_MIMETYPE.encode())], _batch_lines(keywords)
+
+
+async def _batch_lines(keywords: list):
+    ready, cold = await asyncio.to_thread(wsgi.batch_cached, keywords)
+    for line in ready:
+        yield line
+
+    # Cold keywords share a few multi-term Google requests, as in the summary
+    if len(cold) > 1:
+        await asyncio.to_thread(trends_service.prefetch_google_trends, cold)
+
+    # Each task keeps this budget (tasks copy the context they start in)
+    with deadline.scope(SUMMARY_DEADLINE_SECONDS):
+        tasks = {asyncio.ensure_future(get_full_analysis(keyword)): keyword for keyword in cold}
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            keyword = tasks[task]
+            if task.exception() is not None:
+                print(f"[BATCH] Analysis failed for '{keyword}': {task.exception()}")
+                yield wsgi.batch_line({"keyword": keyword, "error": "Analysis failed."})
+            else:
+                yield wsgi.batch_line(task.result().to_detail())
+
+
+async def search(query: dict, headers: dict):
+    try:
+        return _json(wsgi.search_payload({name: values[0] for name, values in query.items()}))
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+
+
+async def history(query: dict, headers: dict):
+    keyword, error = wsgi.resolve_keyword(query.get("keyword", [""])[0])
+    if error:
+        return _json(error[0], error[1])
+
+    try:
+        return _json(wsgi.history_payload(keyword, {name: values[0] for name, values in query.items()}))
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+
+
+async def metrics_endpoint(query: dict, headers: dict):
+    return 200, [(b"content-type", metrics.CONTENT_TYPE.encode())], metrics.render().encode()
+
+
+async def scheduler_status(query: dict, headers: dict):
+    return _json(scheduler.status())
+
+
+_ROUTES = {
+    "/api/health": health,
+    "/api/trends/summary": summary,
+    "/api/trends/detail": detail,
+    "/api/trends/detail/batch": detail_batch,
+    "/api/trends/search": search,
+    "/api/trends/history": history,
+    "/api/metrics": metrics_endpoint,
+    "/api/scheduler/status": scheduler_status,
+}
+
+
+# ─────────────────────────────────────────────
+# Responses: (status, [(header, value)], body bytes)
+# ─────────────────────────────────────────────
+
+def _json(payload, status: int = 200):
+    return status, [(b"content-type", b"application/json")], dumps(payload)
+
+
+def _json_body(headers: dict, body: bytes):
+    """
+    The request body as JSON, or None if it isn't a JSON body or doesn't
+    parse — what Flask's request.get_json(silent=True) returns.
+    """
+    mimetype = headers.get("content-type", "").split(";")[0].strip().lower()
+    if not (mimetype == "application/json" or (mimetype.startswith("application/") and mimetype.endswith("+json"))):
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def _snapshot(snapshot: Snapshot, headers: dict):
+    out = [(name.lower().encode(), value.encode()) for name, value in snapshot.headers().items()]
+    if snapshot.matches(headers.get("if-none-match")):
+        return 304, out, b""
+
+    body, encoding = snapshot.encoded(headers.get("accept-encoding"))
+    out.append((b"content-type", b"application/json"))
+    if encoding:
+        out.append((b"content-encoding", encoding.encode()))
+    return 200, out, body
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    started = time.perf_counter()
+    route = scope["path"].rstrip("/") or "/"
+    handler = _ROUTES.get(route)
+    if scope["method"] == "OPTIONS":
+        status, headers, body = 204, [
+            (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+            (b"access-control-allow-headers", b"*"),
+        ], b""
+    elif handler is None:
+        status, headers, body = _json({"error": "Not found."}, 404)
+    elif scope["method"] not in ("GET", "HEAD") and not (scope["method"] == "POST" and route in _POST_ROUTES):
+        status, headers, body = _json({"error": "Method not allowed."}, 405)
+    else:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        request_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        try:
+            if scope["method"] == "POST":
+                status, headers, body = await handler(query, request_headers, await _read_body(receive))
+            else:
+                status, headers, body = await handler(query, request_headers)
+        except Exception as e:
+            print(f"[ASGI] {scope['path']} failed: {e}")
+            status, headers, body = _json({"error": "Internal server error."}, 500)
+
+    if isinstance(body, bytes):
+        headers = headers + _CORS_HEADERS + [(b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+    else:
+        # Streamed body (async iterator of chunks), sent chunked as it is produced
+        await send({"type": "http.response.start", "status": status, "headers": headers + _CORS_HEADERS})
+        if scope["method"] != "HEAD":
+            async for chunk in body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    REQUEST_SECONDS.observe(time.perf_counter() - started, route if handler else "unmatched", scope["method"], str(status))
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            wsgi.stop_background()
+            await trends_async.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -0,0 +1,181 @@
+# bench/fake_trends.py
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ─────────────────────────────────────────────
+# Local Google Trends stand-in
+# ─────────────────────────────────────────────
+# Serves the three URLs the app calls, under /trends:
+#   /trends/explore                     cookie warm-up page
+#   /trends/api/explore                 widget list (fixtures/explore.json)
+#   /trends/api/widgetdata/multiline    timeline (fixtures/multiline.json)
+# API bodies carry Google's ")]}'" anti-hijacking prefix. The recorded
+# payloads are templated per request: the TIMESERIES widget echoes the
+# requested comparison items, and each keyword gets a deterministic raw
+# series (seeded by its name) on the recorded time axis. Like Google, the
+# series in one request are scaled together so the request's peak is 100 —
+# a keyword's values depend on what it is compared with. Latency, jitter and a
+# 429 rate are configurable; counters are kept for reporting.
+#
+#   python bench/fake_trends.py --port 8765 --latency-ms 150 --rate-429 0.05
+#   TRENDS_BASE_URL=http://127.0.0.1:8765/trends python app.py
+# ─────────────────────────────────────────────
+
+_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+_PREFIX = ")]}'\n"
+
+
+def _load(name: str) -> dict:
+    with open(os.path.join(_FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeTrends:
+    """Configuration, recorded payloads and request counters for one server."""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, rate_429: float = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.explore = _load("explore.json")
+        self.multiline = _load("multiline.json")
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"explore_page": 0, "explore": 0, "multiline": 0, "429": 0}
+
+    def count(self, name: str):
+        with self.lock:
+            self.counts[name] += 1
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            throttled = self.random.random() < self.rate_429
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+        return throttled
+
+    def explore_body(self, req: dict) -> dict:
+        keywords = [item["keyword"] for item in req["comparisonItem"]]
+        body = copy.deepcopy(self.explore)
+        for widget in body["widgets"]:
+            if widget["id"] == "TIMESERIES":
+                widget["request"]["comparisonItem"] = [
+                    {"geo": {"country": "IN"},
+                     "complexKeywordsRestriction": {"keyword": [{"type": "BROAD", "value": k}]}}
+                    for k in keywords
+                ]
+                widget["token"] = "APP6_" + hashlib.sha1("|".join(keywords).encode()).hexdigest()
+        body["keywords"] = [{"keyword": k, "name": k, "type": "Search term"} for k in keywords]
+        return body
+
+    def multiline_body(self, req: dict) -> dict:
+        keywords = [
+            item["complexKeywordsRestriction"]["keyword"][0]["value"]
+            for item in req["comparisonItem"]
+        ]
+        recorded = self.multiline["default"]["timelineData"]
+        raw = [_series(k, len(recorded)) for k in keywords]
+        peak = max((v for s in raw for v in s), default=0) or 1.0
+        series = [[int(round(v * 100 / peak)) for v in s] for s in raw]
+        timeline = []
+        for i, point in enumerate(recorded):
+            values = [s[i] for s in series]
+            timeline.append({
+                **point,
+                "value": values,
+                "hasData": [True] * len(values),
+                "formattedValue": [str(v) for v in values],
+            })
+        return {"default": {"timelineData": timeline, "averages": []}}
+
+
+def _series(keyword: str, length: int) -> list:
+    """Deterministic raw (unscaled) interest series for a keyword; popularity varies ~10x between keywords."""
+    rng = random.Random(hashlib.md5(keyword.encode()).hexdigest())
+    popularity = rng.uniform(0.3, 3.0)
+    base, slope = rng.uniform(20, 80), rng.uniform(-1.0, 1.5)
+    return [max(0.0, popularity * (base + slope * i + rng.uniform(-8, 8))) for i in range(length)]
+
+
+def _handler(fake: FakeTrends):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/trends/explore":
+                fake.count("explore_page")
+                return self._send(200, "<html><body>trends</body></html>", "text/html")
+
+            if url.path not in ("/trends/api/explore", "/trends/api/widgetdata/multiline"):
+                return self._send(404, "not found", "text/plain")
+
+            if fake.delay():
+                fake.count("429")
+                return self._send(429, "Too Many Requests", "text/plain")
+            try:
+                req = json.loads(params["req"])
+            except (KeyError, ValueError):
+                return self._send(400, "bad req", "text/plain")
+
+            if url.path == "/trends/api/explore":
+                fake.count("explore")
+                body = fake.explore_body(req)
+            else:
+                fake.count("multiline")
+                body = fake.multiline_body(req)
+            self._send(200, _PREFIX + json.dumps(body), "application/json; charset=utf-8")
+
+        def _send(self, status: int, text: str, content_type: str):
+            data = text.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int = 0, **options):
+    """Starts a server on a daemon thread. Returns (server, FakeTrends, base URL)."""
+    fake = FakeTrends(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fake-trends").start()
+    return server, fake, f"http://127.0.0.1:{server.server_address[1]}/trends"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Google Trends stand-in.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-429", type=float, default=0)
+    args = parser.parse_args()
+
+    server, fake, url = serve(args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_429=args.rate_429)
+    print(f"[FAKE-TRENDS] Serving {url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[FAKE-TRENDS] {fake.counts}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# bench/gen_data.py
+
+import argparse
+import csv
+import itertools
+import os
+
+import numpy as np
+
+# ─────────────────────────────────────────────
+# Synthetic keyword / marketplace / Pinterest CSVs
+# ─────────────────────────────────────────────
+# Writes keywords.csv, marketplace_data.csv and pinterest_data.csv with the
+# same columns as data/, for any number of keywords, into a directory the
+# app can be pointed at with DATA_DIR. Output is deterministic per seed.
+#
+#   python bench/gen_data.py --keywords 10000 --out bench/data/10000
+# ─────────────────────────────────────────────
+
+_CATEGORIES = {
+    "tops": ["shirt", "tee", "polo", "henley", "kurta", "tank top", "overshirt"],
+    "bottoms": ["cargo pants", "chinos", "jeans", "joggers", "shorts", "trousers"],
+    "outerwear": ["bomber jacket", "varsity jacket", "blazer", "overcoat", "puffer jacket", "gilet"],
+    "footwear": ["sneakers", "loafers", "chelsea boots", "sandals", "derby shoes"],
+    "accessories": ["cap", "belt", "sunglasses", "watch", "tote bag", "beanie"],
+    "ethnic": ["nehru jacket", "sherwani", "pathani suit", "bandhgala"],
+    "sets": ["co-ord set", "tracksuit", "linen set", "pyjama set"],
+}
+_MODIFIERS = [
+    "oversized", "slim fit", "relaxed", "linen", "cotton", "denim", "corduroy", "knit",
+    "vintage", "minimal", "graphic", "striped", "checked", "pastel", "black", "olive",
+    "beige", "navy", "washed", "cropped", "pleated", "utility", "retro", "y2k",
+    "korean", "streetwear", "formal", "summer", "winter", "monsoon",
+]
+_AUDIENCES = ["men", "for men", "men 2026", "men india", "mens", "boys"]
+
+
+def keywords(count: int):
+    """First `count` (keyword, category) pairs from a fixed combinatorial catalog."""
+    items = [(item, category) for category, names in _CATEGORIES.items() for item in names]
+    combos = itertools.product(_AUDIENCES, _MODIFIERS, _MODIFIERS, items)
+    out, seen = [], set()
+    for audience, first, second, (item, category) in combos:
+        words = [first] if first == second else [first, second]
+        keyword = " ".join(words + [item, audience])
+        if keyword not in seen:
+            seen.add(keyword)
+            out.append((keyword, category))
+            if len(out) == count:
+                return out
+    raise ValueError(f"catalog only has {len(out)} keywords")
+
+
+def generate(count: int, out_dir: str, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    rows = keywords(count)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(out_dir, "keywords.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["keyword", "category", "active"])
+        w.writerows((k, c, "true") for k, c in rows)
+
+    rank_today = rng.integers(1, 500, count)
+    rank_7d_ago = np.clip(rank_today + rng.integers(-40, 60, count), 1, 600)
+    rank_30d_ago = np.clip(rank_7d_ago + rng.integers(-60, 80, count), 1, 800)
+    sales_4w_avg = rng.integers(50, 5000, count)
+    weekly_sales = np.maximum(0, (sales_4w_avg * rng.uniform(0.6, 1.8, count)).astype(int))
+    with open(os.path.join(out_dir, "marketplace_data.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["keyword", "rank_today", "rank_7d_ago", "rank_30d_ago", "weekly_sales_units", "sales_4w_avg"])
+        w.writerows(zip((k for k, _ in rows), rank_today, rank_7d_ago, rank_30d_ago, weekly_sales, sales_4w_avg))
+
+    saves_4w_avg = rng.integers(100, 20000, count)
+    weekly_saves = (saves_4w_avg * rng.uniform(0.5, 2.2, count)).astype(int)
+    boards_4w_avg = rng.integers(10, 2000, count)
+    board_count = (boards_4w_avg * rng.uniform(0.7, 1.9, count)).astype(int)
+    with open(os.path.join(out_dir, "pinterest_data.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["keyword", "weekly_saves", "saves_4w_avg", "board_count", "boards_4w_avg"])
+        w.writerows(zip((k for k, _ in rows), weekly_saves, saves_4w_avg, board_count, boards_4w_avg))
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic keyword and signal CSVs.")
+    parser.add_argument("--keywords", type=int, default=100)
+    parser.add_argument("--out", default=None, help="output directory (default: bench/data/<keywords>)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", str(args.keywords))
+    generate(args.keywords, out, args.seed)
+    print(f"[GEN] {args.keywords} keywords -> {out}")
+
+
+if __name__ == "__main__":
+    main()
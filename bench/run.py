@@ -0,0 +1,220 @@
+# bench/run.py
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+import fake_trends
+import gen_data
+
+# ─────────────────────────────────────────────
+# Endpoint benchmark
+# ─────────────────────────────────────────────
+# For each dataset size: generate synthetic CSVs, start a fake Trends
+# server and the app (uvicorn asgi:app or the Flask server) against them,
+# then measure, in order:
+#
+#   detail cold    distinct uncached keywords, concurrently
+#   summary cold   first dashboard load (partial after the deadline)
+#   summary warm   repeated loads once the cache has filled
+#   summary 304    repeated loads with If-None-Match
+#   summary top20  sort=trend_score&limit=20
+#   detail warm    cached keywords
+#
+# Latency percentiles (ms) and throughput (req/s) are printed and can be
+# saved with --json; --compare fails the run if p50 or p99 of any scenario
+# regressed by more than --threshold against a saved baseline.
+#
+#   python bench/run.py --sizes 100,10000 --latency-ms 150 --rate-429 0.02
+#   python bench/run.py --json baseline.json
+#   python bench/run.py --compare baseline.json
+# ─────────────────────────────────────────────
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _timed_get(url: str, headers: dict = None):
+    started = time.perf_counter()
+    try:
+        resp = _session().get(url, headers=headers, timeout=300)
+        ok = resp.status_code in (200, 304)
+        body = resp.content
+    except requests.RequestException:
+        ok, body = False, b""
+    return time.perf_counter() - started, ok, body
+
+
+def measure(urls: list, concurrency: int, headers: dict = None) -> dict:
+    """Fetches every URL with `concurrency` clients; returns latency/throughput stats."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda u: _timed_get(u, headers), urls))
+    wall = time.perf_counter() - started
+    latencies = np.array([r[0] for r in results]) * 1000
+    return {
+        "requests": len(results),
+        "errors": sum(1 for r in results if not r[1]),
+        "p50": float(np.percentile(latencies, 50)),
+        "p90": float(np.percentile(latencies, 90)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(latencies.max()),
+        "rps": len(results) / wall if wall else 0.0,
+    }
+
+
+def _wait_healthy(base: str, proc: subprocess.Popen, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            if requests.get(f"{base}/api/health", timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("server did not become healthy")
+
+
+def _wait_warm(base: str, timeout: float) -> int:
+    """Polls the summary until nothing is pending (or timeout). Returns pending count."""
+    deadline = time.time() + timeout
+    pending = -1
+    while time.time() < deadline:
+        pending = requests.get(f"{base}/api/trends/summary", timeout=300).json().get("pending", 0)
+        if pending == 0:
+            break
+        time.sleep(1)
+    return pending
+
+
+def run_size(size: int, args) -> dict:
+    data_dir = gen_data.generate(size, os.path.join(HERE, "data", str(size)))
+    server, fake, trends_url = fake_trends.serve(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_429=args.rate_429, seed=size,
+    )
+    port = args.port
+    env = dict(
+        os.environ,
+        DATA_DIR=data_dir,
+        TRENDS_BASE_URL=trends_url,
+        HISTORY_DIR=tempfile.mkdtemp(prefix="bench-history-"),
+        CACHE_BACKEND="memory",
+        PREWARM_ENABLED="false",
+        PORT=str(port),
+    )
+    if args.server == "asgi":
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "app.py"]
+    log = open(os.path.join(tempfile.gettempdir(), f"bench-server-{size}.log"), "w")
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        results["startup_seconds"] = _wait_healthy(base, proc, timeout=600)
+        keywords = [k for k, _ in gen_data.keywords(size)]
+        rng = random.Random(size)
+        sample = rng.sample(keywords, min(args.detail_requests, len(keywords)))
+        detail_urls = [f"{base}/api/trends/detail?keyword={requests.utils.quote(k)}" for k in sample]
+
+        results["detail cold"] = measure(detail_urls, args.concurrency)
+        results["summary cold"] = measure([f"{base}/api/trends/summary"], 1)
+        results["pending_after_warmup"] = _wait_warm(base, args.warm_timeout)
+
+        summary_urls = [f"{base}/api/trends/summary"] * args.summary_requests
+        results["summary warm"] = measure(summary_urls, args.concurrency, {"Accept-Encoding": "gzip"})
+        etag = requests.get(summary_urls[0]).headers.get("ETag")
+        results["summary 304"] = measure(summary_urls, args.concurrency, {"If-None-Match": etag})
+        results["summary top20"] = measure(
+            [f"{base}/api/trends/summary?sort=trend_score&limit=20"] * args.summary_requests, args.concurrency)
+        results["detail warm"] = measure(detail_urls * args.warm_repeats, args.concurrency)
+        results["google_requests"] = dict(fake.counts)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        log.close()
+        server.shutdown()
+    return results
+
+
+def _print(size: int, results: dict):
+    print(f"\n[BENCH] {size} keywords — startup {results['startup_seconds']:.2f}s, "
+          f"pending after warm-up {results['pending_after_warmup']}, google {results['google_requests']}")
+    print(f"  {'scenario':<15} {'n':>6} {'err':>4} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'req/s':>9}")
+    for name, stats in results.items():
+        if isinstance(stats, dict) and "p50" in stats:
+            print(f"  {name:<15} {stats['requests']:>6} {stats['errors']:>4} {stats['p50']:>9.1f} "
+                  f"{stats['p90']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f} {stats['rps']:>9.1f}")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Scenario/metric pairs whose latency grew by more than threshold (fraction)."""
+    regressions = []
+    for size, scenarios in current.items():
+        for name, stats in scenarios.items():
+            base = baseline.get(size, {}).get(name)
+            if not (isinstance(stats, dict) and isinstance(base, dict) and "p50" in stats):
+                continue
+            for metric in ("p50", "p99"):
+                if base[metric] > 0 and stats[metric] > base[metric] * (1 + threshold):
+                    regressions.append(f"{size} {name} {metric}: {base[metric]:.1f} -> {stats[metric]:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary/detail against a fake Google Trends.")
+    parser.add_argument("--sizes", default="100", help="comma-separated keyword counts, e.g. 100,10000,100000")
+    parser.add_argument("--server", choices=["asgi", "flask"], default="asgi")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency-ms", type=float, default=100, help="fake Google latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of Google requests answered 429")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--detail-requests", type=int, default=50)
+    parser.add_argument("--summary-requests", type=int, default=100)
+    parser.add_argument("--warm-repeats", type=int, default=4)
+    parser.add_argument("--warm-timeout", type=float, default=120, help="seconds to wait for the cache to fill")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from a previous --json run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50/p99 growth vs baseline")
+    args = parser.parse_args()
+
+    all_results = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        all_results[str(size)] = run_size(size, args)
+        _print(size, all_results[str(size)])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(all_results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(all_results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"[BENCH] REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# bench/startup.py
+
+import argparse
+import gc
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# No background threads in the benchmark processes
+os.environ["PRELOAD_APP"] = "true"
+
+# ─────────────────────────────────────────────
+# Startup benchmark
+# ─────────────────────────────────────────────
+# 1. Import time of app.py in a fresh interpreter (best of N), plus the
+#    slowest modules app.py imports, from `python -X importtime`.
+# 2. Per-worker boot time and memory for N forked workers, with the app
+#    preloaded in the parent (gunicorn preload_app) vs imported by every
+#    worker after the fork. Memory comes from /proc/<pid>/smaps_rollup:
+#    RSS counts shared pages in full, PSS splits them between sharers and
+#    USS is what the worker alone would free on exit.
+#
+#   python bench/startup.py --workers 4 --runs 5
+# ─────────────────────────────────────────────
+
+_IMPORT_PROBE = (
+    "import sys, time; t = time.perf_counter(); import app; "
+    "print(time.perf_counter() - t); print('pandas' in sys.modules)"
+)
+
+
+def measure_import(runs: int):
+    best, pandas_loaded, stderr = None, None, ""
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _IMPORT_PROBE],
+            cwd=ROOT, capture_output=True, text=True, env=os.environ.copy(),
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr[-2000:])
+        elapsed, pandas = proc.stdout.strip().splitlines()[-2:]
+        if best is None or float(elapsed) < best:
+            best, pandas_loaded, stderr = float(elapsed), pandas == "True", proc.stderr
+    return best, pandas_loaded, _top_imports(stderr)
+
+
+def _top_imports(importtime_output: str, limit: int = 8):
+    """Slowest modules imported directly by app.py, as (module, cumulative ms)."""
+    rows = []
+    for line in importtime_output.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if m and len(m.group(2)) == 2:
+            rows.append((m.group(3), int(m.group(1)) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:limit]
+
+
+def _memory(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0) / 1024,
+        "pss": values.get("Pss", 0) / 1024,
+        "uss": (values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)) / 1024,
+    }
+
+
+def _serve_some(app_module):
+    """Touches what a request touches: keyword list, signal tables, a route."""
+    import config
+    from services import marketplace_service, pinterest_service
+
+    marketplace_service.get_marketplace_signals(config.KEYWORDS)
+    pinterest_service.get_pinterest_signals(config.KEYWORDS)
+    client = app_module.app.test_client()
+    for _ in range(20):
+        client.get("/api/health")
+
+
+def measure_workers(count: int, preload: bool):
+    """Forks `count` workers; returns [(boot seconds, memory dict)]."""
+    if preload:
+        import app as app_module
+        gc.collect()
+        gc.freeze()
+
+    workers = []
+    for _ in range(count):
+        ready_r, ready_w = os.pipe()
+        release_r, release_w = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(release_w)
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, 1)
+            if not preload:
+                import app as app_module
+            _serve_some(app_module)
+            os.write(ready_w, b"1")
+            os.read(release_r, 1)  # stay alive until measured
+            os._exit(0)
+
+        os.close(ready_w)
+        os.close(release_r)
+        os.read(ready_r, 1)
+        os.close(ready_r)
+        workers.append((pid, time.perf_counter() - started, release_w))
+
+    results = [(boot, _memory(pid)) for pid, boot, _ in workers]
+    for pid, _, release_w in workers:
+        os.write(release_w, b"1")
+        os.close(release_w)
+        os.waitpid(pid, 0)
+    return results
+
+
+def _run_mode(count: int, preload: bool):
+    # Fork from a clean child so the two modes don't share a parent heap
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        results = measure_workers(count, preload)
+        os.write(w, repr(results).encode())
+        os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        data = f.read()
+    os.waitpid(pid, 0)
+    return eval(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and per-worker memory.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=5, help="fresh-interpreter imports (best is reported)")
+    args = parser.parse_args()
+
+    best, pandas_loaded, top = measure_import(args.runs)
+    print(f"[BENCH] import app: {best * 1000:.0f} ms (best of {args.runs}), pandas imported: {pandas_loaded}")
+    for module, ms in top:
+        print(f"          {module:<28} {ms:8.1f} ms")
+
+    print(f"\n[BENCH] {args.workers} workers       boot ms    RSS MiB    PSS MiB    USS MiB")
+    for label, preload in (("import per worker", False), ("preload + fork", True)):
+        results = _run_mode(args.workers, preload)
+        n = len(results)
+        boot = sum(b for b, _ in results) / n * 1000
+        mem = {k: sum(m[k] for _, m in results) / n for k in ("rss", "pss", "uss")}
+        print(f"  {label:<20} {boot:9.1f} {mem['rss']:10.1f} {mem['pss']:10.1f} {mem['uss']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
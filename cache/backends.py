@@ -0,0 +1,306 @@
+# cache/backends.py
+
+import copy
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from cache import codec
+
+# ─────────────────────────────────────────────
+# Cache storage backends
+# ─────────────────────────────────────────────
+# cache_manager talks to one of these. Both expose the same small API:
+#   get / get_entry / contains / expires_in / set / delete / clear / size / sweep
+#   acquire_lock / locked / release_lock
+# and keep their own eviction/expiration counters.
+#
+# Every entry has two deadlines: expires_at (fresh until) and stale_until
+# (kept, and served by get_entry as stale, until). get/contains only ever
+# see fresh values.
+#
+#   MemoryBackend — per-process LRU dict (the default)
+#   SQLiteBackend — one WAL-mode database file shared by every worker
+#                   process on the host; survives worker restarts
+# ─────────────────────────────────────────────
+
+
+# SQLite hits only rewrite accessed_at once it is this old: LRU order to
+# the minute is plenty for eviction, and most hits stay read-only
+ACCESS_TOUCH_SECONDS = 60
+
+
+def _lock_owner() -> str:
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+
+class MemoryBackend:
+    """Lock-guarded LRU dict. Values are deep-copied in and out (free for records, which are immutable)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._store: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, stale_until)
+        self._locks: dict[str, tuple] = {}                       # key -> (owner, expires_at)
+        self._mutex = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        entry = self.get_entry(key)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def get_entry(self, key: str):
+        """(value copy, is_fresh), or None once the entry is past its stale window."""
+        now = time.time()
+        with self._mutex:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            value, expires_at, stale_until = entry
+            if stale_until <= now:
+                del self._store[key]
+                self.expirations += 1
+                return None
+            self._store.move_to_end(key)
+        return copy.deepcopy(value), expires_at > now
+
+    def contains(self, key: str) -> bool:
+        with self._mutex:
+            entry = self._store.get(key)
+            return entry is not None and entry[1] > time.time()
+
+    def expires_in(self, key: str):
+        with self._mutex:
+            entry = self._store.get(key)
+            return None if entry is None else entry[1] - time.time()
+
+    def set(self, key: str, value, expires_at: float, stale_until: float):
+        value = copy.deepcopy(value)
+        with self._mutex:
+            self._store[key] = (value, expires_at, stale_until)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+                self.evictions += 1
+
+    def replace_value(self, key: str, value) -> bool:
+        value = copy.deepcopy(value)
+        with self._mutex:
+            entry = self._store.get(key)
+            if entry is None or entry[2] <= time.time():
+                return False
+            self._store[key] = (value, entry[1], entry[2])
+            return True
+
+    def delete(self, key: str):
+        with self._mutex:
+            self._store.pop(key, None)
+
+    def clear(self):
+        with self._mutex:
+            self._store.clear()
+
+    def size(self) -> int:
+        with self._mutex:
+            return len(self._store)
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._mutex:
+            expired = [key for key, (_, _, stale_until) in self._store.items() if stale_until <= now]
+            for key in expired:
+                del self._store[key]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._mutex:
+            held = self._locks.get(key)
+            if held is not None and held[1] > now:
+                return False
+            self._locks[key] = (_lock_owner(), now + ttl)
+            return True
+
+    def locked(self, key: str) -> bool:
+        with self._mutex:
+            held = self._locks.get(key)
+            return held is not None and held[1] > time.time()
+
+    def release_lock(self, key: str):
+        with self._mutex:
+            held = self._locks.get(key)
+            if held is not None and held[0] == _lock_owner():
+                del self._locks[key]
+
+
+class SQLiteBackend:
+    """
+    Cache table in a WAL-mode SQLite file. Every process on the host opens
+    the same file, so a value fetched by one gunicorn worker is a hit for
+    all of them. Values are stored as JSON (cache.codec, so records come back
+    as records). LRU order is tracked with an accessed_at column (rewritten
+    at most every ACCESS_TOUCH_SECONDS per key) and the row count by
+    triggers; refresh locks live in their own table with an expiry so a
+    crashed worker can't hold a key forever.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL,"
+            " stale_until REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS locks ("
+            " key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        # Row count kept by triggers, so writes don't COUNT(*) the table.
+        # Seeded once from an existing table, under a write lock so two
+        # workers starting together don't both seed it.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_size (rows INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_inserted AFTER INSERT ON cache"
+                " BEGIN UPDATE cache_size SET rows = rows + 1; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_deleted AFTER DELETE ON cache"
+                " BEGIN UPDATE cache_size SET rows = rows - 1; END"
+            )
+            conn.execute(
+                "INSERT INTO cache_size SELECT COUNT(*) FROM cache"
+                " WHERE NOT EXISTS (SELECT 1 FROM cache_size)"
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (and per process — reopened after fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str):
+        entry = self.get_entry(key)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def get_entry(self, key: str):
+        """(value, is_fresh), or None once the entry is past its stale window."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, stale_until, accessed_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, stale_until, accessed_at = row
+        if stale_until <= now:
+            if conn.execute("DELETE FROM cache WHERE key = ? AND stale_until <= ?", (key, now)).rowcount:
+                self._count("expirations", 1)
+            return None
+        if accessed_at <= now - ACCESS_TOUCH_SECONDS:
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return codec.loads(value), expires_at > now
+
+    def contains(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def expires_in(self, key: str):
+        row = self._conn().execute("SELECT expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0] - time.time()
+
+    def set(self, key: str, value, expires_at: float, stale_until: float):
+        conn = self._conn()
+        # An upsert, not INSERT OR REPLACE: replacing a key fires no triggers
+        conn.execute(
+            "INSERT INTO cache (key, value, expires_at, stale_until, accessed_at) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at,"
+            " stale_until = excluded.stale_until, accessed_at = excluded.accessed_at",
+            (key, codec.dumps(value), expires_at, stale_until, time.time()),
+        )
+        over = self.size() - self.max_entries
+        if over > 0:
+            evicted = conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (over,),
+            ).rowcount
+            self._count("evictions", evicted)
+
+    def replace_value(self, key: str, value) -> bool:
+        return self._conn().execute(
+            "UPDATE cache SET value = ? WHERE key = ? AND stale_until > ?", (codec.dumps(value), key, time.time())
+        ).rowcount == 1
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT rows FROM cache_size").fetchone()[0]
+
+    def sweep(self) -> int:
+        now = time.time()
+        conn = self._conn()
+        dropped = conn.execute("DELETE FROM cache WHERE stale_until <= ?", (now,)).rowcount
+        conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+        self._count("expirations", dropped)
+        return dropped
+
+    def _count(self, counter: str, n: int):
+        """Adds to the evictions/expirations counters (shared by every thread)."""
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, _lock_owner(), now + ttl),
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return acquired
+
+    def locked(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM locks WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def release_lock(self, key: str):
+        self._conn().execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, _lock_owner()))
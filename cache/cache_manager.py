@@ -1,24 +1,183 @@
 # cache/cache_manager.py
 
+import threading
 import time
 
-_store = {}
+from config import (
+    CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, CACHE_SWEEP_INTERVAL_SECONDS,
+    CACHE_BACKEND, CACHE_DB_PATH,
+)
+from cache.backends import MemoryBackend, SQLiteBackend
+from utils.metrics import CounterFunc, Gauge
+
+
+def _create_backend():
+    if CACHE_BACKEND == "sqlite":
+        print(f"[CACHE] Using shared SQLite cache at {CACHE_DB_PATH}")
+        return SQLiteBackend(CACHE_DB_PATH, CACHE_MAX_ENTRIES)
+    return MemoryBackend(CACHE_MAX_ENTRIES)
+
+
+_backend = _create_backend()
+_lock = threading.Lock()
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0}
+_sweeper = None
+
 
 def get(key: str):
-    """Return cached value if it exists and hasn't expired. Otherwise return None."""
-    from config import CACHE_TTL_SECONDS
-    if key in _store:
-        value, timestamp = _store[key]
-        if time.time() - timestamp < CACHE_TTL_SECONDS:
-            return value
+    """
+    Return a copy of the cached value if it exists and hasn't expired. Otherwise return None.
+    Callers get their own copy, so mutating it never touches the cached entry.
+    """
+    value = _backend.get(key)
+    with _lock:
+        _stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def get_entry(key: str):
+    """
+    Like get(), but also returns entries that expired less than their stale
+    window ago. Returns (value copy, is_fresh) or None.
+    Used for stale-while-revalidate: serve the old value, refresh behind it.
+    """
+    entry = _backend.get_entry(key)
+    with _lock:
+        if entry is None:
+            _stats["misses"] += 1
         else:
-            del _store[key]
-    return None
+            _stats["hits" if entry[1] else "stale_hits"] += 1
+    return entry
+
+
+def contains(key: str) -> bool:
+    """True if a fresh value is cached. Doesn't copy, touch LRU order or count as a hit/miss."""
+    return _backend.contains(key)
+
+
+def expires_in(key: str):
+    """Seconds until key stops being fresh (negative once stale), or None if it isn't cached."""
+    return _backend.expires_in(key)
+
+
+def set(key: str, value, ttl: float = None, stale_ttl: float = 0):
+    """
+    Store a copy of value for ttl seconds (default CACHE_TTL_SECONDS), evicting
+    the least recently used entries over the cap. The entry stays available
+    to get_entry() as stale for another stale_ttl seconds.
+    """
+    expires_at = time.time() + (CACHE_TTL_SECONDS if ttl is None else ttl)
+    _backend.set(key, value, expires_at, expires_at + stale_ttl)
+    _ensure_sweeper()
+
+
+def replace_value(key: str, value) -> bool:
+    """
+    Swap in a new value for a cached (fresh or stale) entry, keeping its
+    expiry and stale window. False if the entry is gone.
+    """
+    return _backend.replace_value(key, value)
+
+
+def delete(key: str):
+    """Drop a key if present."""
+    _backend.delete(key)
+
+
+def clear():
+    """Drop everything (stats are kept)."""
+    _backend.clear()
 
-def set(key: str, value):
-    """Store a value with the current timestamp."""
-    _store[key] = (value, time.time())
 
 def size() -> int:
     """Return how many items are currently cached."""
-    return len(_store)
+    return _backend.size()
+
+
+def stats() -> dict:
+    """Hit/miss/eviction counters plus current size, for /api/health."""
+    with _lock:
+        hits, stale_hits, misses = _stats["hits"], _stats["stale_hits"], _stats["misses"]
+    lookups = hits + stale_hits + misses
+    return {
+        "backend": CACHE_BACKEND,
+        "hits": hits,
+        "stale_hits": stale_hits,
+        "misses": misses,
+        "evictions": _backend.evictions,
+        "expirations": _backend.expirations,
+        "size": _backend.size(),
+        "max_entries": CACHE_MAX_ENTRIES,
+        "hit_ratio": round((hits + stale_hits) / lookups, 3) if lookups else 0.0,
+    }
+
+
+def sweep() -> int:
+    """Remove every entry past its stale window. Returns how many were dropped."""
+    return _backend.sweep()
+
+
+# ─────────────────────────────────────────────
+# Refresh locks
+# ─────────────────────────────────────────────
+# With the SQLite backend these are shared by every worker process, so only
+# one of them recomputes a given key while the rest wait for its result.
+
+def acquire_lock(key: str, ttl: float = 60) -> bool:
+    """Try to become the one caller refreshing key. The lock expires after ttl seconds."""
+    return _backend.acquire_lock(key, ttl)
+
+
+def locked(key: str) -> bool:
+    """True while someone holds the refresh lock for key."""
+    return _backend.locked(key)
+
+
+def release_lock(key: str):
+    """Release a lock taken by this thread with acquire_lock."""
+    _backend.release_lock(key)
+
+
+def wait_for(key: str, timeout: float, poll_interval: float = 0.2):
+    """
+    Poll until key is cached (returning a copy). Returns None after timeout
+    seconds, or as soon as the lock holder lets go without caching anything.
+    """
+    deadline = time.time() + timeout
+    while not contains(key) and time.time() < deadline and locked(key):
+        time.sleep(poll_interval)
+    # Polls don't count as lookups: the wait is one hit or one miss
+    return get(key)
+
+
+def _ensure_sweeper():
+    """Start the background expiry sweeper the first time something is cached."""
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+    with _lock:
+        # A forked worker inherits the handle but not the thread
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = threading.Thread(target=_sweep_loop, daemon=True, name="cache-sweeper")
+            _sweeper.start()
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(CACHE_SWEEP_INTERVAL_SECONDS)
+        try:
+            sweep()
+        except Exception as e:
+            print(f"[CACHE] Sweep failed: {e}")
+
+
+# ─────────────────────────────────────────────
+# Metrics (read from stats() at scrape time)
+# ─────────────────────────────────────────────
+
+CounterFunc("trendspire_cache_lookups_total", "Cache lookups since start, by result.", lambda: {
+    (result,): stats()[key] for result, key in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses"))
+}, ("result",))
+Gauge("trendspire_cache_hit_ratio", "Fresh or stale hits / lookups since start.", lambda: stats()["hit_ratio"])
+Gauge("trendspire_cache_entries", "Entries currently cached.", size)
+CounterFunc("trendspire_cache_evictions_total", "Entries evicted by the size cap since start.", lambda: _backend.evictions)
@@ -0,0 +1,41 @@
+# cache/codec.py
+
+import json
+
+# ─────────────────────────────────────────────
+# JSON codec for cache backends that store text
+# ─────────────────────────────────────────────
+# Record types (see services/records.py) register here; they are written
+# as {"__record__": <class name>, <slot>: <value>, ...} and rebuilt on the
+# way out. Plain JSON values pass through unchanged.
+# ─────────────────────────────────────────────
+
+_TYPES: dict[str, type] = {}
+
+
+def register(cls):
+    """Class decorator: makes a __slots__ record type storable."""
+    _TYPES[cls.__name__] = cls
+    return cls
+
+
+def _default(obj):
+    cls = type(obj)
+    if _TYPES.get(cls.__name__) is not cls:
+        raise TypeError(f"{cls.__name__} is not JSON serializable")
+    state = {name: getattr(obj, name) for name in cls.__slots__}
+    state["__record__"] = cls.__name__
+    return state
+
+
+def _hook(obj: dict):
+    name = obj.pop("__record__", None)
+    return obj if name is None else _TYPES[name](**obj)
+
+
+def dumps(value) -> str:
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+def loads(text: str):
+    return json.loads(text, object_hook=_hook)
@@ -0,0 +1,74 @@
+# cache/singleflight.py
+
+import copy
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one: the first caller
+    runs fn, everyone who arrives while it is running waits for that result
+    instead of doing the work again. Waiters get their own deep copy.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn):
+        """Returns (result, shared). shared is True if another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            return self._run(key, call, fn), False
+
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result), True
+
+    def go(self, key: str, fn, executor) -> bool:
+        """
+        Fire-and-forget form of do(): runs fn on executor unless a call for
+        key is already in flight. Returns True if it started one; if the
+        executor refuses the task (e.g. it is shut down) its error is raised.
+        """
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = self._calls[key] = _Call()
+        try:
+            executor.submit(self._run, key, call, fn)
+        except BaseException as e:
+            # Nothing will run it: free the key and fail anyone already waiting
+            with self._lock:
+                del self._calls[key]
+            call.error = e
+            call.done.set()
+            raise
+        return True
+
+    def _run(self, key: str, call: _Call, fn):
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -1,37 +1,192 @@
 import os
 import csv
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory holding keywords.csv and the signal CSVs/store; overridable so
+# benchmarks can point a server at generated data.
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(BASE_DIR, "data"))
+
+KEYWORDS_CSV_PATH = os.path.join(DATA_DIR, "keywords.csv")
+
 def load_keywords_from_csv():
     """
-    Loads active keywords from data/keywords.csv.
+    Loads active keywords from data/keywords.csv as {keyword: category},
+    in file order.
     Expected CSV columns: keyword, category, active
     """
-    keywords = []
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(base_dir, "data", "keywords.csv")
-    
-    if not os.path.exists(csv_path):
-        print(f"Warning: {csv_path} not found. Using empty keyword list.")
-        return []
+    if not os.path.exists(KEYWORDS_CSV_PATH):
+        print(f"Warning: {KEYWORDS_CSV_PATH} not found. Using empty keyword list.")
+        return {}
 
     try:
-        with open(csv_path, mode='r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('active', '').lower() == 'true':
-                    keywords.append(row['keyword'])
+        return read_keywords(KEYWORDS_CSV_PATH)
     except Exception as e:
-        print(f"Error reading keywords from {csv_path}: {e}")
-        return []
+        print(f"Error reading keywords from {KEYWORDS_CSV_PATH}: {e}")
+        return {}
 
+def read_keywords(csv_path: str) -> dict:
+    """Active keywords from a keywords CSV as {keyword: category}. Raises if the file can't be read."""
+    keywords = {}
+    with open(csv_path, mode='r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if row.get('active', '').lower() == 'true':
+                keywords.setdefault(row['keyword'], (row.get('category') or '').strip())
     return keywords
 
-# Dynamically load keywords from CSV
-KEYWORDS = load_keywords_from_csv()
+# Dynamically load keywords from CSV. Both are reassigned (never mutated)
+# when the file is hot-reloaded, so read them as config.KEYWORDS /
+# config.KEYWORD_CATEGORIES at use time.
+KEYWORD_CATEGORIES = load_keywords_from_csv()
+KEYWORDS = list(KEYWORD_CATEGORIES)
+
+# Set by gunicorn.conf.py when the app is imported once in the master and
+# forked into workers: background threads are then started per worker by
+# app.start_background() instead of at import.
+PRELOAD_APP = os.environ.get("PRELOAD_APP", "false").lower() == "true"
+
+# How often (seconds) data/*.csv files are checked for changes; 0 disables
+# hot reload.
+DATA_RELOAD_INTERVAL_SECONDS = 30
 
 # How long to keep cached results (in seconds). 12 hours.
 CACHE_TTL_SECONDS = 43200
 
+# How long a live Google Trends result is reused (seconds). An analysis
+# expires together with the Google signal it was built on; the local
+# marketplace/Pinterest signals and the scoring rules are versioned instead,
+# and a change to them rescores cached analyses without refetching Google.
+GOOGLE_SIGNAL_TTL_SECONDS = CACHE_TTL_SECONDS
+
+# After expiry an analysis may still be served for this long (seconds) while
+# a background refresh replaces it (stale-while-revalidate).
+CACHE_STALE_SECONDS = 3600
+
+# Upper bound on cached entries (least recently used are evicted first) and
+# how often the background sweeper drops expired entries.
+CACHE_MAX_ENTRIES = 5000
+CACHE_SWEEP_INTERVAL_SECONDS = 300
+
+# Cache backend: "memory" keeps a private cache per worker process;
+# "sqlite" shares one WAL-mode database file between every worker on the
+# host (no external service needed) and survives worker restarts.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", os.path.join(BASE_DIR, "cache.sqlite3"))
+
+# How long a worker may hold the refresh lock for one key before another
+# worker is allowed to take over, and how long others wait for its result.
+CACHE_LOCK_TTL_SECONDS = 60
+CACHE_LOCK_WAIT_SECONDS = 30
+
+# Summary fan-out: size of the shared worker pool that runs per-keyword
+# pipelines, and the overall deadline (seconds) for one summary response.
+# Keywords still running at the deadline are returned with status "pending".
+SUMMARY_MAX_WORKERS = 8
+SUMMARY_DEADLINE_SECONDS = 20
+
+# Deadline budgets (seconds). A detail request that can't be answered from
+# cache waits at most DETAIL_DEADLINE_SECONDS for its analysis, then gets one
+# with Google neutral-filled; the computation itself gives up on locks and
+# Google after ANALYSIS_DEADLINE_SECONDS and falls back.
+DETAIL_DEADLINE_SECONDS = 5
+ANALYSIS_DEADLINE_SECONDS = 30
+
+# Admission control for cold work (analyses that need a Google fetch), per
+# worker. At most COLD_FETCH_MAX_INFLIGHT run at once — below
+# SUMMARY_MAX_WORKERS, so analyses that only need local data always find a
+# pool thread — and background refreshes of stale results only start while
+# fewer than COLD_FETCH_BACKGROUND_MAX_INFLIGHT are running. At most
+# COLD_WAIT_MAX_REQUESTS request threads block on cold work at once; keep it
+# below GUNICORN_THREADS so warm reads and /api/health always get a thread.
+# Cold work that isn't admitted degrades (pending rows, neutral Google
+# score) instead of queueing.
+COLD_FETCH_MAX_INFLIGHT = 6
+COLD_FETCH_BACKGROUND_MAX_INFLIGHT = 2
+COLD_WAIT_MAX_REQUESTS = 4
+
+# Filtered/sorted summary queries: largest page a client may ask for, and
+# how many encoded query responses are kept per worker.
+SUMMARY_PAGE_MAX = 500
+SUMMARY_QUERY_CACHE_ENTRIES = 256
+
+# /api/trends/search: default and largest number of matches returned, and
+# how many suggestions a 404 for an unknown keyword carries.
+SEARCH_DEFAULT_RESULTS = 10
+SEARCH_MAX_RESULTS = 50
+SEARCH_SUGGESTIONS = 5
+
+# Most keywords one /api/trends/detail/batch request may ask for
+DETAIL_BATCH_MAX_KEYWORDS = 100
+
+# Trend-score history: every computed analysis with a live Google signal
+# is appended here (repeats of the last point are skipped). Raw
+# points are kept HISTORY_RAW_DAYS, then rolled up to one point per day,
+# to one per week after HISTORY_DAILY_DAYS, and dropped after
+# HISTORY_RETENTION_DAYS. HISTORY_DEFAULT_DAYS is the range returned when
+# a history request gives no start.
+HISTORY_DIR = os.environ.get("HISTORY_DIR", os.path.join(DATA_DIR, "history"))
+HISTORY_RAW_DAYS = 14
+HISTORY_DAILY_DAYS = 180
+HISTORY_RETENTION_DAYS = 730
+HISTORY_DEFAULT_DAYS = 30
+
+# Background pre-warming: refresh every active keyword PREWARM_LEAD_SECONDS
+# before its cached analysis expires, so requests only read precomputed
+# results. Google traffic is capped by a token bucket: each token pays for
+# one batched Trends fetch (up to trends_service.BATCH_MAX_TERMS - 1
+# keywords; the anchor takes the last term). PREWARM_PRIORITY picks which
+# due keyword goes first: "oldest" (closest to expiry) or "popular" (most
+# requested since startup). Every worker starts a scheduler, but only the
+# one holding an flock on PREWARM_LOCK_PATH refreshes, so the rate is per
+# host; with the memory cache backend only that worker's cache is warmed.
+PREWARM_ENABLED = os.environ.get("PREWARM_ENABLED", "false").lower() == "true"
+PREWARM_LEAD_SECONDS = 1800
+PREWARM_PRIORITY = "oldest"
+PREWARM_RATE_PER_MINUTE = 6
+PREWARM_BURST = 2
+PREWARM_TICK_SECONDS = 10
+PREWARM_LOCK_PATH = os.environ.get("PREWARM_LOCK_PATH", CACHE_DB_PATH + ".prewarm.lock")
+
+# Google Trends host (a local stand-in is used by bench/)
+TRENDS_BASE_URL = os.environ.get("TRENDS_BASE_URL", "https://trends.google.com/trends")
+
+# Keyword sent alongside every Google fetch: its series rescales each
+# request onto one shared scale (see trends_service.anchor_reference).
+# Pick a steady, mid-popularity term; changing it changes every score.
+ANCHOR_KEYWORD = "men shirt"
+
+# Google circuit breaker: after GOOGLE_BREAKER_FAILURES failed fetches in a
+# row every fetch falls back immediately; a single probe is let through
+# after GOOGLE_BREAKER_RESET_SECONDS (doubling on each failed probe, up to
+# GOOGLE_BREAKER_MAX_RESET_SECONDS).
+GOOGLE_BREAKER_FAILURES = 5
+GOOGLE_BREAKER_RESET_SECONDS = 60
+GOOGLE_BREAKER_MAX_RESET_SECONDS = 600
+
+# Concurrent Google fetches per worker: starts at GOOGLE_CONCURRENCY_INITIAL,
+# grows by one per window of successes up to GOOGLE_CONCURRENCY_MAX and
+# halves on a 429. A fetch that can't get a slot within
+# GOOGLE_CONCURRENCY_WAIT_SECONDS falls back.
+GOOGLE_CONCURRENCY_INITIAL = 4
+GOOGLE_CONCURRENCY_MAX = 8
+GOOGLE_CONCURRENCY_WAIT_SECONDS = 10
+
+# Pooled Google sessions per worker (one per concurrent fetch), and how long
+# a session's cookies are trusted before it visits the trends page again.
+GOOGLE_SESSION_POOL_SIZE = GOOGLE_CONCURRENCY_MAX
+GOOGLE_SESSION_MAX_AGE_SECONDS = 3600
+
+# Offline bulk scoring (python -m services.bulk_score): keywords per chunk —
+# the unit of work, output and checkpointing — and how many chunks fetch
+# from Google at once (each still goes through the adaptive limit above).
+BULK_CHUNK_SIZE = 2000
+BULK_GOOGLE_WORKERS = GOOGLE_CONCURRENCY_MAX
+
+# Analyses built on a fallback Google score are cached only this long
+# (seconds), so they are replaced soon after Google recovers.
+CACHE_FALLBACK_TTL_SECONDS = 300
+
 # Weight of each signal in the final Trend Momentum Score
 SCORING_WEIGHTS = {
     "google": 0.45,
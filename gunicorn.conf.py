@@ -0,0 +1,56 @@
+# gunicorn.conf.py
+
+import gc
+import multiprocessing
+import os
+
+# ─────────────────────────────────────────────
+# Preloaded, fork-shared workers
+# ─────────────────────────────────────────────
+# The app (keyword list, signal tables, snapshots) is imported once in the
+# master; workers are forked from it and share those pages copy-on-write,
+# so a new worker is serving within milliseconds instead of re-importing
+# and re-parsing everything. Background threads can't be inherited across
+# fork, so each worker starts its own in post_fork (of the pre-warming
+# schedulers, only one per host refreshes; see services/scheduler.py).
+#
+#   gunicorn -c gunicorn.conf.py asgi:app     (async, uvicorn workers)
+#   GUNICORN_WORKER_CLASS=gthread gunicorn -c gunicorn.conf.py app:app
+# ─────────────────────────────────────────────
+
+os.environ.setdefault("PRELOAD_APP", "true")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+threads = int(os.environ.get("GUNICORN_THREADS", 8))  # gthread only
+preload_app = os.environ["PRELOAD_APP"].lower() == "true"
+timeout = 60
+
+# Keep the collector from touching (and so un-sharing) the master's
+# objects while the app is being imported
+if preload_app:
+    gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        # Everything allocated so far moves to a permanent generation that
+        # collections in the workers never scan or write to
+        gc.collect()
+        gc.freeze()
+        server.log.info(f"Preloaded app; froze {gc.get_freeze_count()} objects")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+        import app
+        app.start_background()
+
+
+def worker_exit(server, worker):
+    # Let the scheduler and file watcher wind down (it also releases the
+    # pre-warm leader lock for another worker to take)
+    import app
+    app.stop_background()
@@ -0,0 +1,122 @@
+# services/analysis.py
+
+import time
+from datetime import datetime
+
+from config import CACHE_FALLBACK_TTL_SECONDS, GOOGLE_SIGNAL_TTL_SECONDS
+from services import marketplace_service, pinterest_service, scoring_engine, trends_service
+from services.records import Analysis, AnalysisInputs, GoogleSignal, MarketplaceSignal, PinterestSignal
+from utils.metrics import DEGRADED_ANALYSES
+
+# ─────────────────────────────────────────────
+# Analysis assembly
+# ─────────────────────────────────────────────
+# Turns three signals into an Analysis. Shared by the web tier (app.py,
+# asgi.py) and the offline bulk scorer (services/bulk_score.py), which must
+# not import the Flask app — importing it starts the scheduler and watcher.
+# ─────────────────────────────────────────────
+
+
+def analysis_ttl(result: Analysis):
+    """
+    Cache TTL for an analysis: whatever is left of its Google signal's
+    freshness — GOOGLE_SIGNAL_TTL_SECONDS after the fetch, or
+    CACHE_FALLBACK_TTL_SECONDS when Google was neutral-filled, so the keyword
+    is retried once Google recovers.
+    """
+    google = result.google
+    lifetime = CACHE_FALLBACK_TTL_SECONDS if google.source == "fallback" else GOOGLE_SIGNAL_TTL_SECONDS
+    fetched_at = google.fetched_at
+    if fetched_at is None:
+        return lifetime
+    return max(0.0, fetched_at + lifetime - time.time())
+
+
+def analysis_inputs(google: GoogleSignal) -> AnalysisInputs:
+    """Versions of everything an analysis is derived from."""
+    return AnalysisInputs(
+        google=google.fetched_at,
+        marketplace=marketplace_service.version(),
+        pinterest=pinterest_service.version(),
+        scoring=scoring_engine.VERSION,
+    )
+
+
+def build_analysis(keyword: str, google: GoogleSignal, marketplace: MarketplaceSignal,
+                   pinterest: PinterestSignal) -> Analysis:
+    """
+    Scores, classifies and explains one keyword from its three signals.
+    `inputs` records the version of each signal and of the scoring rules,
+    so a cached result can tell when it needs rescoring.
+    """
+    # Compute score and derive outputs
+    trend_score    = scoring_engine.compute_trend_score(google, marketplace, pinterest)
+    classification = scoring_engine.classify(trend_score, google.growth_pct)
+    rec            = scoring_engine.recommend(classification, trend_score)
+    explanation    = scoring_engine.build_explanation(classification, google, marketplace, pinterest)
+
+    return Analysis(
+        keyword=keyword,
+        trend_score=trend_score,
+        classification=classification,
+        recommendation=rec["action"],
+        adjustment_pct=rec["adjustment_pct"],
+        explanation=explanation,
+        google=google,
+        marketplace=marketplace,
+        pinterest=pinterest,
+        inputs=analysis_inputs(google),
+        generated_at=datetime.utcnow().isoformat(),
+    )
+
+
+def degraded_analysis(keyword: str, reason: str) -> Analysis:
+    """
+    Stand-in for an analysis a request can't wait for (shed under load, or
+    out of deadline budget): the local signals with Google neutral-filled.
+    Not cached — the real analysis replaces it once it has been computed.
+    """
+    DEGRADED_ANALYSES.inc(reason)
+    google = trends_service._neutral_fallback(keyword, reason=reason)
+    marketplace = marketplace_service.get_marketplace_signal(keyword)
+    pinterest = pinterest_service.get_pinterest_signal(keyword)
+    return build_analysis(keyword, google, marketplace, pinterest)
+
+
+def build_analyses(keywords: list[str], google: list[GoogleSignal], marketplace: list[MarketplaceSignal],
+                   pinterest: list[PinterestSignal]) -> list[Analysis]:
+    """
+    build_analysis for many keywords at once (equal-length lists): the
+    score/classification/recommendation come from one vectorized
+    scoring_engine.score_batch call. Results match build_analysis.
+    """
+    scored = scoring_engine.score_batch(
+        [g.normalized_score for g in google],
+        [m.normalized_score for m in marketplace],
+        [p.normalized_score for p in pinterest],
+        [g.growth_pct for g in google],
+    )
+    columns = zip(
+        keywords, google, marketplace, pinterest,
+        scored["trend_score"].tolist(), scored["classification"].tolist(),
+        scored["recommendation"].tolist(), scored["adjustment_pct"].tolist(),
+    )
+    versions = (marketplace_service.version(), pinterest_service.version(), scoring_engine.VERSION)
+    generated_at = datetime.utcnow().isoformat()
+
+    return [
+        Analysis(
+            keyword=keyword,
+            trend_score=trend_score,
+            classification=classification,
+            recommendation=action,
+            adjustment_pct=adjustment_pct,
+            explanation=scoring_engine.build_explanation(classification, g, m, p),
+            google=g,
+            marketplace=m,
+            pinterest=p,
+            inputs=AnalysisInputs(g.fetched_at, *versions),
+            generated_at=generated_at,
+        )
+        for keyword, g, m, p, trend_score, classification, action, adjustment_pct in columns
+    ]
@@ -0,0 +1,351 @@
+# services/bulk_score.py
+
+import argparse
+import csv
+import glob
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from cache import cache_manager
+from config import BULK_CHUNK_SIZE, BULK_GOOGLE_WORKERS, CACHE_BACKEND, CACHE_STALE_SECONDS
+from services import history_store, marketplace_service, pinterest_service, trends_service
+from services.analysis import analysis_ttl, build_analyses
+from services.records import Analysis, GoogleSignal
+from utils.circuit_breaker import CircuitOpenError
+
+# pyarrow is optional: without it only CSV output is available
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# ─────────────────────────────────────────────
+# Offline bulk scoring
+# ─────────────────────────────────────────────
+#   python -m services.bulk_score keywords.txt --out scores.csv
+#   python -m services.bulk_score data/keywords.csv --out scores.parquet --publish
+#
+# Scores any keyword list — one per line, or a CSV with a "keyword" column,
+# active or not — through the same pipeline as the web tier, without it:
+#
+#   google   chunks are fetched on BULK_GOOGLE_WORKERS threads with
+#            fetch_google_trends_batch: multi-term requests behind the same
+#            adaptive concurrency limit and circuit breaker, all rescaled to
+#            one anchor reference for the whole run. Cached live signals are
+#            reused and new ones cached.
+#   scoring  marketplace/Pinterest lookups, vectorized scoring, explanations
+#            and output encoding run on a process pool, one chunk per task.
+#   output   chunks are written in input order. After each one a checkpoint
+#            records how many input keywords are done, and --resume carries
+#            on from there. CSV goes to one file, Parquet to a directory with
+#            one part file per chunk. If the Google circuit opens, the run
+#            stops before the first chunk that fell back because of it, so a
+#            resumed run fetches those keywords instead of keeping neutral
+#            scores (--offline runs don't fetch and never stop for it).
+#
+# --publish also caches every analysis and records its history (SQLite
+# cache backend), so a nightly full-catalog run feeds the dashboard without
+# going through the web tier.
+# ─────────────────────────────────────────────
+
+COLUMNS = (
+    "keyword", "trend_score", "classification", "recommendation", "adjustment_pct",
+    "google_trends_score", "google_growth_pct", "google_source",
+    "marketplace_score", "pinterest_score", "explanation", "generated_at",
+)
+
+# Parquet column types (pyarrow aliases), so every part has the same schema
+_PARQUET_TYPES = {
+    "keyword": "string", "trend_score": "float64", "classification": "string",
+    "recommendation": "string", "adjustment_pct": "int64",
+    "google_trends_score": "float64", "google_growth_pct": "float64", "google_source": "string",
+    "marketplace_score": "float64", "pinterest_score": "float64",
+    "explanation": "string", "generated_at": "string",
+}
+
+
+def read_keywords(path: str):
+    """Yields the keywords in a text file (one per line) or a CSV with a "keyword" column."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            lines = (row.get("keyword") or "" for row in csv.DictReader(f))
+        else:
+            lines = f
+        for line in lines:
+            keyword = line.strip()
+            if keyword:
+                yield keyword
+
+
+def _chunks(keywords, size: int):
+    keywords = iter(keywords)
+    while chunk := list(itertools.islice(keywords, size)):
+        yield chunk
+
+
+# ─────────────────────────────────────────────
+# Google stage (threads in this process)
+# ─────────────────────────────────────────────
+
+def anchor_reference() -> Optional[float]:
+    """The anchor keyword's own average interest: the scale every chunk is rescaled to."""
+    reference = trends_service.anchor_reference()
+    if reference is None:
+        print("[BULK] No anchor reference; each chunk is scaled on its own")
+    return reference
+
+
+def google_signals(keywords: list[str], reference: Optional[float], offline: bool) -> list[GoogleSignal]:
+    """
+    A Google signal per keyword: the cached live one, else fetched now
+    (and cached), else — offline or failed — the neutral fallback.
+    """
+    found = {}
+    for keyword in dict.fromkeys(keywords):
+        cached = trends_service._cached(cache_manager.get(trends_service._cache_key(keyword)))
+        if cached is not None:
+            found[keyword] = cached
+    missing = [k for k in dict.fromkeys(keywords) if k not in found]
+
+    if missing and offline:
+        found.update((k, trends_service._neutral_fallback(k, reason="offline")) for k in missing)
+    elif missing:
+        # Chunks already run on BULK_GOOGLE_WORKERS threads: one batch at a time each
+        found.update(trends_service.fetch_google_trends_batch(
+            missing, on_result=_cache_live, reference=reference, workers=1))
+    return [found[k] for k in keywords]
+
+
+# Set when a run is interrupted: chunks mid-fetch give up after their current batch
+_stopping = threading.Event()
+
+
+def _cache_live(keyword: str, result: GoogleSignal):
+    if _stopping.is_set():
+        raise RuntimeError("Bulk run stopping")
+    if result.source == "live":
+        cache_manager.set(trends_service._cache_key(keyword), result, ttl=trends_service._CACHE_TTL)
+
+
+# ─────────────────────────────────────────────
+# Scoring stage (process pool)
+# ─────────────────────────────────────────────
+
+def score_chunk(start: int, keywords: list[str], google: list[GoogleSignal], out_format: str,
+                out: str, publish: bool) -> bytes:
+    """
+    Scores one chunk and encodes it: returns the CSV rows, or writes the
+    Parquet part file for the chunk starting at input position `start`
+    (and returns b"").
+    """
+    marketplace = marketplace_service.get_marketplace_signals(keywords)
+    pinterest = pinterest_service.get_pinterest_signals(keywords)
+    analyses = build_analyses(keywords, google, [marketplace[k] for k in keywords], [pinterest[k] for k in keywords])
+
+    if publish:
+        for analysis in analyses:
+            cache_manager.set(f"analysis:{analysis.keyword}", analysis,
+                              ttl=analysis_ttl(analysis), stale_ttl=CACHE_STALE_SECONDS)
+            history_store.record(analysis)
+
+    rows = [_row(analysis) for analysis in analyses]
+    if out_format == "csv":
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue().encode("utf-8")
+
+    schema = pyarrow.schema([(name, pyarrow.type_for_alias(_PARQUET_TYPES[name])) for name in COLUMNS])
+    table = pyarrow.Table.from_pylist([dict(zip(COLUMNS, row)) for row in rows], schema=schema)
+    path = os.path.join(out, f"part-{start:012d}.parquet")
+    pyarrow.parquet.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return b""
+
+
+def _row(analysis: Analysis) -> tuple:
+    return (
+        analysis.keyword, analysis.trend_score, analysis.classification, analysis.recommendation,
+        analysis.adjustment_pct, analysis.google.normalized_score, analysis.google.growth_pct,
+        analysis.google.source, analysis.marketplace.normalized_score,
+        analysis.pinterest.normalized_score, analysis.explanation, analysis.generated_at,
+    )
+
+
+# ─────────────────────────────────────────────
+# Output and checkpoints
+# ─────────────────────────────────────────────
+
+def checkpoint_path(out: str) -> str:
+    return out.rstrip("/") + ".checkpoint.json"
+
+
+def _load_checkpoint(out: str, input_path: str, out_format: str) -> Optional[dict]:
+    try:
+        with open(checkpoint_path(out)) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if state["input"] != os.path.abspath(input_path) or state["format"] != out_format:
+        raise ValueError(f"{checkpoint_path(out)} is for {state['input']} ({state['format']}), not this run")
+    return state
+
+
+def _save_checkpoint(out: str, state: dict):
+    path = checkpoint_path(out)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def _open_output(out: str, out_format: str, state: Optional[dict]):
+    """The CSV file to append to (None for Parquet), cut back to the last checkpoint."""
+    if out_format == "parquet":
+        os.makedirs(out, exist_ok=True)
+        if state is None:
+            for part in glob.glob(os.path.join(out, "part-*.parquet")):
+                os.remove(part)
+        return None
+    if state is None:
+        f = open(out, "wb")
+        f.write(",".join(COLUMNS).encode("utf-8") + b"\r\n")
+        return f
+    # Rows written after the last checkpoint belong to an unfinished chunk
+    f = open(out, "r+b")
+    f.truncate(state["bytes"])
+    f.seek(state["bytes"])
+    return f
+
+
+def _start_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The scoring pool, with every worker started now so their imports overlap
+    the first Google fetches. Workers are spawned, not forked (this process
+    runs threads), and ignore Ctrl-C: the parent stops the run.
+    """
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    previous = signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        for _ in range(workers):
+            pool.submit(os.getpid)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    return pool
+
+
+def run(input_path: str, out: str, out_format: str = "csv", chunk_size: int = BULK_CHUNK_SIZE,
+        workers: Optional[int] = None, google_workers: int = BULK_GOOGLE_WORKERS,
+        offline: bool = False, publish: bool = False, resume: bool = False) -> dict:
+    """Scores every keyword in input_path into out. Returns the run's totals."""
+    if out_format == "parquet" and pyarrow is None:
+        raise ValueError("Parquet output needs pyarrow (pip install pyarrow)")
+    if publish and CACHE_BACKEND != "sqlite":
+        raise ValueError("--publish needs the shared cache (CACHE_BACKEND=sqlite)")
+
+    state = _load_checkpoint(out, input_path, out_format) if resume else None
+    f = _open_output(out, out_format, state)
+    if state is None:
+        state = {"input": os.path.abspath(input_path), "format": out_format, "done": 0,
+                 "bytes": f.tell() if f is not None else 0, "sources": {}}
+        _save_checkpoint(out, state)
+    else:
+        print(f"[BULK] Resuming after {state['done']} keywords")
+    sources = Counter(state["sources"])
+    _stopping.clear()
+    workers = workers or os.cpu_count() or 1
+    cpu = _start_pool(workers)
+    reference = None if offline else anchor_reference()
+    fetchers = ThreadPoolExecutor(google_workers, thread_name_prefix="bulk-google")
+
+    def process(start: int, chunk: list[str]) -> tuple:
+        google = google_signals(chunk, reference, offline)
+        if not offline and trends_service._BREAKER.is_open() and any(g.source == "fallback" for g in google):
+            raise CircuitOpenError("Google Trends circuit is open")
+        body = cpu.submit(score_chunk, start, chunk, google, out_format, out, publish).result()
+        return len(chunk), body, Counter(g.source for g in google)
+
+    def write(fut):
+        count, body, chunk_sources = fut.result()
+        if f is not None:
+            f.write(body)
+            f.flush()
+            state["bytes"] = f.tell()
+        sources.update(chunk_sources)
+        state["done"] += count
+        state["sources"] = dict(sources)
+        _save_checkpoint(out, state)
+        rate = (state["done"] - first) / (time.perf_counter() - started)
+        print(f"[BULK] {state['done']} keywords scored ({rate:.0f}/s)")
+
+    started, first = time.perf_counter(), state["done"]
+    # Enough chunks in flight to keep both stages busy, and no more
+    window = google_workers + workers
+    pending = deque()
+    try:
+        offset = state["done"]
+        for chunk in _chunks(itertools.islice(read_keywords(input_path), offset, None), chunk_size):
+            pending.append(fetchers.submit(process, offset, chunk))
+            offset += len(chunk)
+            while len(pending) >= window or (pending and pending[0].done()):
+                write(pending.popleft())
+        while pending:
+            write(pending.popleft())
+    except BaseException:
+        print(f"[BULK] Stopped after {state['done']} keywords; rerun with --resume to continue")
+        _stopping.set()
+        fetchers.shutdown(cancel_futures=True)
+        cpu.shutdown(cancel_futures=True)
+        raise
+    finally:
+        if f is not None:
+            f.close()
+    fetchers.shutdown()
+    cpu.shutdown()
+
+    os.remove(checkpoint_path(out))
+    elapsed = time.perf_counter() - started
+    print(f"[BULK] Done: {state['done']} keywords in {elapsed:.1f}s, Google {dict(sources)} -> {out}")
+    return {"keywords": state["done"], "seconds": round(elapsed, 2), "google": dict(sources)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a keyword list offline, streaming results to CSV or Parquet.")
+    parser.add_argument("input", help="keywords: one per line, or a CSV with a 'keyword' column")
+    parser.add_argument("--out", required=True, help="output .csv file, or directory for .parquet parts")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="output format (default: parquet if --out ends in .parquet, else csv)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: one per CPU)")
+    parser.add_argument("--google-workers", type=int, default=BULK_GOOGLE_WORKERS,
+                        help="chunks fetching from Google at once")
+    parser.add_argument("--offline", action="store_true",
+                        help="no Google requests: cached signals, else the neutral fallback")
+    parser.add_argument("--publish", action="store_true",
+                        help="also cache each analysis and record its history (needs CACHE_BACKEND=sqlite)")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint")
+    args = parser.parse_args()
+
+    out_format = args.format or ("parquet" if args.out.rstrip("/").endswith(".parquet") else "csv")
+    try:
+        run(args.input, args.out, out_format, args.chunk_size, args.workers, args.google_workers,
+            args.offline, args.publish, args.resume)
+    except ValueError as e:
+        parser.error(str(e))
+    except CircuitOpenError as e:
+        sys.exit(f"[BULK] {e}; rerun with --resume once Google recovers, or --offline for neutral scores")
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# services/data_sources.py
+
+import hashlib
+import os
+import threading
+from typing import Callable, Optional
+
+from cache import cache_manager
+
+# ─────────────────────────────────────────────
+# Hot-reloadable data files
+# ─────────────────────────────────────────────
+# Each DataSource owns one file on disk and the table built from it.
+# check() looks at mtime/size first and only re-reads the file when those
+# moved; the table is rebuilt only if the content hash actually changed.
+# The new table is fully built before it replaces `current` in a single
+# assignment, so a request that grabbed the old table keeps a complete one.
+# ─────────────────────────────────────────────
+
+
+class DataSource:
+    def __init__(self, name: str, path: str, loader: Callable[[str], object],
+                 on_change: Optional[Callable[[object, object], None]] = None,
+                 fallback: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.path = path
+        self.loader = loader
+        self.on_change = on_change
+        self._stat = None
+        self._digest = None
+        self._lock = threading.Lock()
+        try:
+            self.current = self._load()
+        except Exception as e:
+            if fallback is None:
+                raise
+            print(f"[DATA] ERROR loading {name} from {path}: {e}")
+            self.current = fallback()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Content hash of the loaded file: the same on every worker holding the same data."""
+        return self._digest.hex() if self._digest else None
+
+    def _file_state(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _load(self):
+        self._stat = self._file_state()
+        self._digest = _digest(self.path)
+        return self.loader(self.path)
+
+    def check(self) -> bool:
+        """Reloads the table if the file's content changed. Returns True if it did."""
+        with self._lock:
+            state = self._file_state()
+            if state == self._stat:
+                return False
+            self._stat = state
+            digest = _digest(self.path)
+            if digest == self._digest:
+                return False
+
+            try:
+                table = self.loader(self.path)
+            except Exception as e:
+                # Keep serving the previous table; a half-written file will
+                # be picked up again once its mtime moves
+                print(f"[DATA] Failed to reload {self.name} from {self.path}: {e}")
+                self._stat = None
+                return False
+
+            old, self.current, self._digest = self.current, table, digest
+
+        print(f"[DATA] Reloaded {self.name} from {self.path}")
+        if self.on_change is not None:
+            try:
+                self.on_change(old, table)
+            except Exception as e:
+                print(f"[DATA] Change handler for {self.name} failed: {e}")
+        return True
+
+
+def _digest(path: str):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    except OSError:
+        return None
+
+
+_sources: dict[str, DataSource] = {}
+_watcher: Optional[threading.Thread] = None
+_watch_lock = threading.Lock()
+_stop = threading.Event()
+
+
+def register(name: str, path: str, loader: Callable[[str], object],
+             on_change: Optional[Callable[[object, object], None]] = None,
+             fallback: Optional[Callable[[], object]] = None) -> DataSource:
+    """
+    Loads a file now and keeps it under watch. Returns its DataSource.
+    If the first load fails, fallback() provides the table instead.
+    """
+    source = DataSource(name, path, loader, on_change, fallback)
+    _sources[name] = source
+    return source
+
+
+def check_all() -> list[str]:
+    """Checks every registered file once. Returns the names that were reloaded."""
+    return [name for name, source in list(_sources.items()) if source.check()]
+
+
+def start_watcher(interval: float):
+    """Polls every registered file each `interval` seconds on a daemon thread."""
+    global _watcher
+    with _watch_lock:
+        if _watcher is not None and _watcher.is_alive():
+            return
+        _stop.clear()
+        _watcher = threading.Thread(target=_watch_loop, args=(interval,), daemon=True, name="data-watcher")
+        _watcher.start()
+
+
+def stop():
+    """Ends the watcher after its current check (a later start_watcher starts a new one)."""
+    _stop.set()
+
+
+def _watch_loop(interval: float):
+    while not _stop.wait(interval):
+        try:
+            check_all()
+        except Exception as e:
+            print(f"[DATA] Watch cycle failed: {e}")
+
+
+def invalidate_analyses(keywords) -> int:
+    """Drops cached analyses for keywords whose inputs changed."""
+    count = 0
+    for keyword in keywords:
+        cache_manager.delete(f"analysis:{keyword}")
+        count += 1
+    if count:
+        print(f"[DATA] Invalidated {count} cached analyses")
+    return count
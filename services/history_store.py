@@ -0,0 +1,245 @@
+# services/history_store.py
+
+import fcntl
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config import (
+    HISTORY_DIR, HISTORY_RAW_DAYS, HISTORY_DAILY_DAYS, HISTORY_RETENTION_DAYS,
+)
+from services.records import Analysis
+from services.scoring_engine import CLASSIFICATIONS
+
+# ─────────────────────────────────────────────
+# Trend-score history
+# ─────────────────────────────────────────────
+# Every computed analysis is appended as one fixed-size record to
+# <HISTORY_DIR>/<key>.raw — except analyses built on a fallback (neutral)
+# Google signal, and repeats of the last point (same Google fetch and
+# score, e.g. a scheduler pass that reused the cached signal). Records older than HISTORY_RAW_DAYS are folded
+# into <key>.rollup: one record per day up to HISTORY_DAILY_DAYS old, one
+# per week after that, nothing past HISTORY_RETENTION_DAYS — so a
+# keyword's files stay at a few thousand records however long it runs.
+#
+# Appends and compaction hold an flock on the .raw file, so every worker
+# process can write; queries hold it shared, so they never see the rollup
+# and raw files from either side of a compaction. Compaction replaces files
+# by rename; an appender or reader that opened the old inode notices and
+# reopens.
+# ─────────────────────────────────────────────
+
+RECORD = np.dtype([
+    ("ts", "<i8"),              # unix seconds (bucket start for rolled-up records)
+    ("trend_score", "<f4"),
+    ("google", "<f4"),
+    ("marketplace", "<f4"),
+    ("pinterest", "<f4"),
+    ("classification", "i1"),   # index into CLASSIFICATIONS, -1 if unknown
+    ("pad", "u1"),
+    ("samples", "<u2"),         # raw analyses merged into this record
+    ("fetched_at", "<u4"),      # unix seconds of the Google fetch, 0 if unknown
+])
+
+SCORE_FIELDS = ("trend_score", "google", "marketplace", "pinterest")
+
+RESOLUTIONS = {"raw": 0, "hour": 3600, "day": 86400, "week": 7 * 86400}
+
+_DAY = 86400
+_CLASS_INDEX = {name: i for i, name in enumerate(CLASSIFICATIONS)}
+
+
+def _paths(keyword: str):
+    key = hashlib.blake2b(keyword.encode("utf-8"), digest_size=10).hexdigest()
+    base = os.path.join(HISTORY_DIR, key)
+    return base + ".raw", base + ".rollup"
+
+
+def record(analysis: Analysis):
+    """
+    Appends one analysis to its keyword's history, unless it has no live
+    Google signal or repeats the last stored point. Never raises.
+    """
+    try:
+        if analysis.google.source != "live":
+            return
+        generated_at = datetime.fromisoformat(analysis.generated_at)
+        if generated_at.tzinfo is None:
+            generated_at = generated_at.replace(tzinfo=timezone.utc)
+        rec = np.zeros(1, dtype=RECORD)
+        rec["ts"] = int(generated_at.timestamp())
+        rec["trend_score"] = analysis.trend_score
+        rec["google"] = analysis.google.normalized_score
+        rec["marketplace"] = analysis.marketplace.normalized_score
+        rec["pinterest"] = analysis.pinterest.normalized_score
+        rec["classification"] = _CLASS_INDEX.get(analysis.classification, -1)
+        rec["samples"] = 1
+        rec["fetched_at"] = int(analysis.google.fetched_at or 0)
+        _append(analysis.keyword, rec)
+    except Exception as e:
+        print(f"[HISTORY] Failed to record '{getattr(analysis, 'keyword', None)}': {e}")
+
+
+def _append(keyword: str, rec: np.ndarray):
+    raw_path, rollup_path = _paths(keyword)
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    while True:
+        fd = os.open(raw_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                # Compaction may have renamed a new file into place meanwhile
+                if os.fstat(fd).st_ino != os.stat(raw_path).st_ino:
+                    continue
+            except FileNotFoundError:
+                continue
+            if _repeats_last(raw_path, rec):
+                return
+            os.write(fd, rec.tobytes())
+            if _compaction_due(raw_path):
+                _compact(raw_path, rollup_path)
+            return
+        finally:
+            os.close(fd)
+
+
+def _repeats_last(raw_path: str, rec: np.ndarray) -> bool:
+    """True if the last raw record has rec's (known) Google fetch time and scores. Caller holds the flock."""
+    if not rec["fetched_at"][0]:
+        return False
+    with open(raw_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < RECORD.itemsize:
+            return False
+        f.seek(-RECORD.itemsize, os.SEEK_END)
+        last = np.frombuffer(f.read(RECORD.itemsize), dtype=RECORD)
+    return bool(
+        last["fetched_at"][0] == rec["fetched_at"][0] and
+        all(last[field][0] == rec[field][0] for field in SCORE_FIELDS)
+    )
+
+
+def _compaction_due(raw_path: str) -> bool:
+    """True once the oldest raw record is a day past the raw window (so it runs ~daily)."""
+    with open(raw_path, "rb") as f:
+        head = f.read(RECORD.itemsize)
+    if len(head) < RECORD.itemsize:
+        return False
+    oldest = int(np.frombuffer(head, dtype=RECORD)["ts"][0])
+    return oldest < time.time() - (HISTORY_RAW_DAYS + 1) * _DAY
+
+
+def _compact(raw_path: str, rollup_path: str):
+    """Moves aged raw records into the rollup. Caller holds the .raw flock."""
+    now = time.time()
+    raw = _read(raw_path)
+    raw = raw[np.argsort(raw["ts"], kind="stable")]
+    keep = raw["ts"] >= now - HISTORY_RAW_DAYS * _DAY
+
+    rollup = np.concatenate([_read(rollup_path), raw[~keep]])
+    rollup = rollup[rollup["ts"] >= now - HISTORY_RETENTION_DAYS * _DAY]
+    # Daily buckets while young, weekly once older than HISTORY_DAILY_DAYS
+    width = np.where(rollup["ts"] >= now - HISTORY_DAILY_DAYS * _DAY, _DAY, 7 * _DAY)
+    rollup = downsample(rollup[np.argsort(rollup["ts"], kind="stable")], width)
+
+    _replace(rollup_path, rollup)
+    _replace(raw_path, raw[keep])
+
+
+def _replace(path: str, records: np.ndarray):
+    tmp = path + ".tmp"
+    records.tofile(tmp)
+    os.replace(tmp, path)
+
+
+def _read(path: str) -> np.ndarray:
+    try:
+        return np.fromfile(path, dtype=RECORD)
+    except FileNotFoundError:
+        return np.zeros(0, dtype=RECORD)
+
+
+def _read_all(raw_path: str, rollup_path: str) -> np.ndarray:
+    """Rollup then raw records, read under a shared flock on the .raw file."""
+    while True:
+        try:
+            fd = os.open(raw_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return _read(rollup_path)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            try:
+                if os.fstat(fd).st_ino != os.stat(raw_path).st_ino:
+                    continue
+            except FileNotFoundError:
+                continue
+            return np.concatenate([_read(rollup_path), _read(raw_path)])
+        finally:
+            os.close(fd)
+
+
+def downsample(records: np.ndarray, width) -> np.ndarray:
+    """
+    Merges time-sorted records into buckets of `width` seconds (scalar or
+    per-record array): scores become sample-weighted means, classification
+    is the latest one in the bucket.
+    """
+    if len(records) == 0:
+        return records
+    starts = records["ts"] // width * width
+    # Bucket boundaries, also splitting where the bucket width changes
+    boundary = np.ones(len(records), dtype=bool)
+    boundary[1:] = starts[1:] != starts[:-1]
+    if np.ndim(width):
+        boundary[1:] |= width[1:] != width[:-1]
+    first = np.flatnonzero(boundary)
+    last = np.append(first[1:], len(records)) - 1
+
+    weights = records["samples"].astype(np.float64)
+    counts = np.add.reduceat(weights, first)
+    out = np.zeros(len(first), dtype=RECORD)
+    out["ts"] = starts[first]
+    for field in SCORE_FIELDS:
+        out[field] = np.add.reduceat(records[field] * weights, first) / counts
+    out["classification"] = records["classification"][last]
+    out["fetched_at"] = records["fetched_at"][last]
+    out["samples"] = np.minimum(counts, np.iinfo(np.uint16).max)
+    return out
+
+
+def query(keyword: str, start: float, end: float, resolution: str = "raw") -> np.ndarray:
+    """Records for keyword with start <= ts <= end, downsampled to a RESOLUTIONS key."""
+    raw_path, rollup_path = _paths(keyword)
+    records = _read_all(raw_path, rollup_path)
+    if len(records) and np.any(np.diff(records["ts"]) < 0):
+        # Workers can append a few seconds out of order
+        records = records[np.argsort(records["ts"], kind="stable")]
+
+    lo = np.searchsorted(records["ts"], int(start), side="left")
+    hi = np.searchsorted(records["ts"], int(end), side="right")
+    records = records[lo:hi]
+    width = RESOLUTIONS[resolution]
+    return downsample(records, width) if width else records
+
+
+def to_points(records: np.ndarray) -> list:
+    """JSON-ready points for the history endpoint."""
+    timestamps = records["ts"].tolist()
+    scores = {field: np.round(records[field].astype(np.float64), 1).tolist() for field in SCORE_FIELDS}
+    classes = records["classification"].tolist()
+    samples = records["samples"].tolist()
+    return [
+        {
+            "t": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "trend_score": scores["trend_score"][i],
+            "classification": CLASSIFICATIONS[classes[i]] if classes[i] >= 0 else None,
+            "google_trends_score": scores["google"][i],
+            "marketplace_score": scores["marketplace"][i],
+            "pinterest_score": scores["pinterest"][i],
+            "samples": samples[i],
+        }
+        for i, ts in enumerate(timestamps)
+    ]
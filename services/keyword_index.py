@@ -0,0 +1,199 @@
+# services/keyword_index.py
+
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+
+# ─────────────────────────────────────────────
+# Keyword index: exact, prefix and fuzzy lookup
+# ─────────────────────────────────────────────
+# Built once from keywords.csv (and rebuilt on hot reload). Every keyword
+# is folded to a normalized form — Unicode NFKC, casefolded, runs of
+# whitespace collapsed — so "Cargo  Pants Men" finds "cargo pants men".
+#
+#   exact   dict: normalized form -> keyword
+#   prefix  normalized forms in sorted order; a prefix is a contiguous
+#           range found by bisection (a trie flattened into an array)
+#   fuzzy   trigram -> sorted int32 array of keyword ids. Shared trigrams
+#           are counted with one np.bincount over the rarest trigrams'
+#           postings; the best candidates then get their exact count (a
+#           searchsorted per remaining trigram) and are ranked by Jaccard
+#           similarity, with keywords containing the text as a word prefix
+#           first ("cargo pan" -> "korean cargo pants men")
+# ─────────────────────────────────────────────
+
+_NGRAM = 3
+
+# Most posting entries one fuzzy query counts; beyond it the most common
+# trigrams (" me", "men", ...) are skipped — they match nearly everything
+_CANDIDATE_BUDGET = 20_000
+
+# Most candidates given an exact similarity per fuzzy query
+_RERANK_MAX = 400
+
+# Fuzzy matches below this Jaccard similarity are dropped
+MIN_FUZZY_SCORE = 0.2
+
+
+def normalize(text: str) -> str:
+    """Case- and whitespace-folded form used for every comparison."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def _grams(norm: str) -> set:
+    padded = f" {norm} "
+    return {padded[i:i + _NGRAM] for i in range(len(padded) - _NGRAM + 1)}
+
+
+class KeywordIndex:
+    __slots__ = ("keywords", "norms", "exact", "sorted_norms", "sorted_ids", "postings", "gram_counts")
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.norms = [normalize(k) for k in self.keywords]
+        # The first keyword wins when two only differ by case/whitespace
+        self.exact = {}
+        for i, norm in enumerate(self.norms):
+            self.exact.setdefault(norm, i)
+
+        order = sorted(range(len(self.norms)), key=self.norms.__getitem__)
+        self.sorted_norms = [self.norms[i] for i in order]
+        self.sorted_ids = order
+
+        postings = defaultdict(list)
+        self.gram_counts = np.empty(len(self.norms), dtype=np.int32)
+        for i, norm in enumerate(self.norms):
+            grams = _grams(norm)
+            self.gram_counts[i] = len(grams)
+            for gram in grams:
+                postings[gram].append(i)
+        # Ids are appended in order, so every posting array is sorted
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def lookup(self, text: str) -> Optional[str]:
+        """The keyword whose normalized form equals text's, or None."""
+        i = self.exact.get(normalize(text))
+        return None if i is None else self.keywords[i]
+
+    def prefix(self, norm: str, limit: int) -> list:
+        """Ids of up to `limit` keywords starting with norm, shortest first."""
+        start = bisect_left(self.sorted_norms, norm)
+        ids = []
+        # Look a little past `limit` so the shortest matches can be picked
+        for j in range(start, min(start + limit * 4, len(self.sorted_norms))):
+            if not self.sorted_norms[j].startswith(norm):
+                break
+            ids.append(self.sorted_ids[j])
+        ids.sort(key=lambda i: (len(self.norms[i]), self.norms[i]))
+        return ids[:limit]
+
+    def fuzzy(self, norm: str, limit: int) -> list:
+        """
+        [(id, similarity, contains)] for up to `limit` keywords sharing the
+        most trigrams with norm; contains is True if the keyword has norm at
+        the start of one of its words.
+        """
+        grams = _grams(norm)
+        present = sorted((len(self.postings[g]), g) for g in grams if g in self.postings)
+        if not present:
+            return []
+        chosen, rest, total = [], [], 0
+        for size, gram in present:
+            if chosen and total + size > _CANDIDATE_BUDGET:
+                rest.append(gram)
+            else:
+                chosen.append(gram)
+                total += size
+
+        # A query whose rarest trigram is everywhere ("men") ties nearly every
+        # keyword; counting a budget's worth of them is as good as all
+        hits = np.concatenate([self.postings[g] for g in chosen])[:_CANDIDATE_BUDGET]
+        shared = np.bincount(hits)
+        # Lowest shared count that still leaves `keep` candidates. Work on
+        # the hit list, not the whole id range: a keyword sharing s trigrams
+        # appears s times in it.
+        keep = max(limit * 4, 20)
+        hit_shared = shared[hits]
+        per_count = np.bincount(hit_shared) / np.maximum(np.arange(len(chosen) + 1)[:hit_shared.max() + 1], 1)
+        at_least = np.cumsum(per_count[::-1])[::-1]
+        threshold = max(1, int(np.flatnonzero(at_least >= keep)[-1]) if at_least[0] >= keep else 1)
+        # Everything above the threshold, plus as many ties as the rerank allows
+        above = np.unique(hits[hit_shared > threshold])
+        tied = np.unique(hits[hit_shared == threshold][:_RERANK_MAX * threshold])
+        candidates = np.concatenate([above, tied[:max(0, _RERANK_MAX - len(above))]])
+
+        counts = shared[candidates]
+        for gram in rest:
+            ids = self.postings[gram]
+            pos = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+            counts += ids[pos] == candidates
+        scores = counts / (len(grams) + self.gram_counts[candidates] - counts)
+        if len(candidates) > keep:
+            top = np.argpartition(-scores, keep - 1)[:keep]
+            candidates, scores = candidates[top], scores[top]
+
+        needle = " " + norm
+        scored = []
+        for i, score in zip(candidates.tolist(), scores.tolist()):
+            contains = needle in " " + self.norms[i]
+            if contains or score >= MIN_FUZZY_SCORE:
+                scored.append((i, score, contains))
+        scored.sort(key=lambda item: (not item[2], -item[1], self.norms[item[0]]))
+        return scored[:limit]
+
+    def search(self, text: str, limit: int = 10) -> list:
+        """
+        Ranked matches for a search box: the exact match, then keywords
+        starting with the text (shortest first), then keywords containing
+        it, then fuzzy matches.
+        Returns [{"keyword", "match", "score"}].
+        """
+        norm = normalize(text)
+        if not norm:
+            return []
+        results, seen = [], set()
+
+        def add(i: int, match: str, score: float):
+            if i not in seen and len(results) < limit:
+                seen.add(i)
+                results.append({"keyword": self.keywords[i], "match": match, "score": round(score, 3)})
+
+        exact = self.exact.get(norm)
+        if exact is not None:
+            add(exact, "exact", 1.0)
+        for i in self.prefix(norm, limit):
+            add(i, "prefix", len(norm) / len(self.norms[i]))
+        if len(results) < limit:
+            for i, score, contains in self.fuzzy(norm, limit):
+                add(i, "contains" if contains else "fuzzy", score)
+        return results
+
+
+# Swapped in whole on rebuild; readers always see a complete index
+_index = KeywordIndex([])
+
+
+def rebuild(keywords) -> KeywordIndex:
+    """Builds a new index over keywords and makes it the current one."""
+    global _index
+    started = time.perf_counter()
+    index = KeywordIndex(keywords)
+    _index = index
+    print(f"[KEYWORDS] Indexed {len(index)} keywords in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return index
+
+
+def resolve(text: str) -> Optional[str]:
+    """The supported keyword text refers to (ignoring case and spacing), or None."""
+    return _index.lookup(text)
+
+
+def search(text: str, limit: int = 10) -> list:
+    return _index.search(text, limit)
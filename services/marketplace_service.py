@@ -1,67 +1,123 @@
 # services/marketplace_service.py
 
-import pandas as pd
 import os
 
+from config import DATA_DIR
+from services import data_sources, signal_store
+from services.records import MarketplaceSignal
+from services.signal_table import SignalTable
+from utils.normalizer import round_array
+
 # Load the CSV once at startup — not on every request
-_CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'marketplace_data.csv')
+_CSV_PATH = os.path.join(DATA_DIR, 'marketplace_data.csv')
+
+# Columnar store built by `python -m services.signal_store`; preferred when present
+_STORE_META = os.path.join(signal_store.store_path("marketplace"), "meta.json")
 
-try:
-    _df = pd.read_csv(_CSV_PATH)
-    print(f"[MARKETPLACE] Loaded {len(_df)} rows from CSV.")
-except Exception as e:
-    print(f"[MARKETPLACE] ERROR loading CSV: {e}")
-    _df = pd.DataFrame()
+# Output fields and how each is converted back to a plain Python value
+_FIELDS = {
+    "current_rank": int,
+    "rank_7d_ago": int,
+    "rank_velocity": float,
+    "sales_growth_pct": float,
+    "normalized_score": float,
+}
 
 
-def get_marketplace_signal(keyword: str) -> dict:
+def _build_table(df) -> SignalTable:
     """
-    Computes rank velocity and sales growth from the pre-seeded CSV.
-    Returns a normalized 0-100 score.
+    Computes rank velocity, sales growth and the normalized 0-100 score for
+    every row in one vectorized pass.
     """
-    if _df.empty:
-        return _neutral_fallback()
-
-    row = _df[_df['keyword'] == keyword]
-    if row.empty:
-        print(f"[MARKETPLACE] Keyword not found: '{keyword}'")
-        return _neutral_fallback()
-
-    row = row.iloc[0]
+    rank_today = df['rank_today'].to_numpy(dtype=float)
+    rank_7d_ago = df['rank_7d_ago'].to_numpy(dtype=float)
+    weekly_sales = df['weekly_sales_units'].to_numpy(dtype=float)
+    sales_4w_avg = df['sales_4w_avg'].to_numpy(dtype=float)
 
     # Rank velocity: how many positions improved in 7 days
     # Positive = rising (e.g., was rank 30, now rank 12 = +18 improvement)
-    rank_velocity = float(row['rank_7d_ago']) - float(row['rank_today'])
+    rank_velocity = rank_7d_ago - rank_today
 
     # Sales growth vs 4-week average
-    sales_growth_pct = (
-        (float(row['weekly_sales_units']) - float(row['sales_4w_avg']))
-        / (float(row['sales_4w_avg']) + 0.001)
-    ) * 100
+    sales_growth_pct = ((weekly_sales - sales_4w_avg) / (sales_4w_avg + 0.001)) * 100
 
     # Normalize rank velocity: max meaningful improvement = 50 positions
-    velocity_norm = min(max((rank_velocity / 50.0) * 100, 0), 100)
+    velocity_norm = ((rank_velocity / 50.0) * 100).clip(0, 100)
 
     # Normalize sales growth: cap at 100% growth
-    sales_norm = min(max(sales_growth_pct, 0), 100)
+    sales_norm = sales_growth_pct.clip(0, 100)
 
     # Combined marketplace score (velocity weighted more than sales)
     normalized_score = (velocity_norm * 0.6) + (sales_norm * 0.4)
 
-    return {
-        "current_rank": int(row['rank_today']),
-        "rank_7d_ago": int(row['rank_7d_ago']),
-        "rank_velocity": round(rank_velocity, 1),
-        "sales_growth_pct": round(sales_growth_pct, 1),
-        "normalized_score": round(normalized_score, 1)
-    }
-
-
-def _neutral_fallback() -> dict:
-    return {
-        "current_rank": 50,
-        "rank_7d_ago": 50,
-        "rank_velocity": 0.0,
-        "sales_growth_pct": 0.0,
-        "normalized_score": 50.0
-    }
+    return SignalTable(df['keyword'].tolist(), {
+        "current_rank": df['rank_today'].to_numpy(dtype=int),
+        "rank_7d_ago": df['rank_7d_ago'].to_numpy(dtype=int),
+        "rank_velocity": round_array(rank_velocity, 1),
+        "sales_growth_pct": round_array(sales_growth_pct, 1),
+        "normalized_score": round_array(normalized_score, 1),
+    })
+
+
+def _load_table(path: str) -> SignalTable:
+    # pandas is only needed to parse the CSV; with a signal store in place
+    # workers never import it
+    import pandas as pd
+
+    table = _build_table(pd.read_csv(path))
+    print(f"[MARKETPLACE] Loaded {len(table)} keywords from CSV.")
+    return table
+
+
+def _load_store(path: str) -> SignalTable:
+    table = signal_store.load_table(path)
+    print(f"[MARKETPLACE] Mapped {len(table)} keywords from the signal store.")
+    return table
+
+
+def _on_reload(old: SignalTable, new: SignalTable):
+    # Cached analyses are rescored from the new rows when next read (see
+    # app.get_cached_analysis); nothing is refetched from Google
+    print(f"[MARKETPLACE] {len(old.changed_keywords(new))} keywords changed")
+
+
+def version():
+    """Version of the loaded marketplace data; changes whenever the file's content does."""
+    return _source.version
+
+
+# Loaded once at startup, then swapped in whole whenever the file changes
+if os.path.exists(_STORE_META):
+    _source = data_sources.register("marketplace", _STORE_META, _load_store, _on_reload, fallback=lambda: SignalTable([], {}))
+else:
+    _source = data_sources.register("marketplace", _CSV_PATH, _load_table, _on_reload, fallback=lambda: SignalTable([], {}))
+
+
+def get_marketplace_signal(keyword: str) -> MarketplaceSignal:
+    """
+    Returns rank velocity, sales growth and the normalized 0-100 score
+    precomputed from the pre-seeded CSV.
+    """
+    table = _source.current
+    signal = table.row(keyword, _FIELDS, MarketplaceSignal)
+    if signal is None:
+        if len(table):
+            print(f"[MARKETPLACE] Keyword not found: '{keyword}'")
+        return _FALLBACK
+    return signal
+
+
+def get_marketplace_signals(keywords: list[str]) -> dict:
+    """Batch lookup: {keyword: signal} for every keyword, with fallbacks for unknown ones."""
+    found = _source.current.rows(keywords, _FIELDS, MarketplaceSignal)
+    return {keyword: found.get(keyword) or _FALLBACK for keyword in keywords}
+
+
+# Neutral signal for keywords with no marketplace row (immutable, so shared)
+_FALLBACK = MarketplaceSignal(
+    current_rank=50,
+    rank_7d_ago=50,
+    rank_velocity=0.0,
+    sales_growth_pct=0.0,
+    normalized_score=50.0,
+)
@@ -1,64 +1,114 @@
 # services/pinterest_service.py
 
-import pandas as pd
 import os
 
-_CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'pinterest_data.csv')
+from config import DATA_DIR
+from services import data_sources, signal_store
+from services.records import PinterestSignal
+from services.signal_table import SignalTable
+from utils.normalizer import round_array
 
-try:
-    _df = pd.read_csv(_CSV_PATH)
-    print(f"[PINTEREST] Loaded {len(_df)} rows from CSV.")
-except Exception as e:
-    print(f"[PINTEREST] ERROR loading CSV: {e}")
-    _df = pd.DataFrame()
+_CSV_PATH = os.path.join(DATA_DIR, 'pinterest_data.csv')
 
+# Columnar store built by `python -m services.signal_store`; preferred when present
+_STORE_META = os.path.join(signal_store.store_path("pinterest"), "meta.json")
 
-def get_pinterest_signal(keyword: str) -> dict:
-    """
-    Computes save growth and board growth from the pre-seeded Pinterest CSV.
-    Returns a normalized 0-100 score.
-    """
-    if _df.empty:
-        return _neutral_fallback()
-
-    row = _df[_df['keyword'] == keyword]
-    if row.empty:
-        print(f"[PINTEREST] Keyword not found: '{keyword}'")
-        return _neutral_fallback()
+# Output fields and how each is converted back to a plain Python value
+_FIELDS = {
+    "weekly_saves": int,
+    "save_growth_pct": float,
+    "board_count": int,
+    "board_growth_pct": float,
+    "normalized_score": float,
+}
 
-    row = row.iloc[0]
 
-    save_growth = (
-        (float(row['weekly_saves']) - float(row['saves_4w_avg']))
-        / (float(row['saves_4w_avg']) + 0.001)
-    ) * 100
+def _build_table(df) -> SignalTable:
+    """
+    Computes save growth, board growth and the normalized 0-100 score for
+    every row in one vectorized pass.
+    """
+    weekly_saves = df['weekly_saves'].to_numpy(dtype=float)
+    saves_4w_avg = df['saves_4w_avg'].to_numpy(dtype=float)
+    board_count = df['board_count'].to_numpy(dtype=float)
+    boards_4w_avg = df['boards_4w_avg'].to_numpy(dtype=float)
 
-    board_growth = (
-        (float(row['board_count']) - float(row['boards_4w_avg']))
-        / (float(row['boards_4w_avg']) + 0.001)
-    ) * 100
+    save_growth = ((weekly_saves - saves_4w_avg) / (saves_4w_avg + 0.001)) * 100
+    board_growth = ((board_count - boards_4w_avg) / (boards_4w_avg + 0.001)) * 100
 
     # Normalize: cap at 100% growth
-    save_norm = min(max(save_growth, 0), 100)
-    board_norm = min(max(board_growth, 0), 100)
+    save_norm = save_growth.clip(0, 100)
+    board_norm = board_growth.clip(0, 100)
 
     # Saves are a stronger signal than boards
     normalized_score = (save_norm * 0.7) + (board_norm * 0.3)
 
-    return {
-        "weekly_saves": int(row['weekly_saves']),
-        "save_growth_pct": round(save_growth, 1),
-        "board_count": int(row['board_count']),
-        "board_growth_pct": round(board_growth, 1),
-        "normalized_score": round(normalized_score, 1)
-    }
-
-
-def _neutral_fallback() -> dict:
-    return {
-        "weekly_saves": 0,
-        "save_growth_pct": 0.0,
-        "board_count": 0,
-        "board_growth_pct": 0.0,
-        "normalized_score": 40.0
-    }
+    return SignalTable(df['keyword'].tolist(), {
+        "weekly_saves": df['weekly_saves'].to_numpy(dtype=int),
+        "save_growth_pct": round_array(save_growth, 1),
+        "board_count": df['board_count'].to_numpy(dtype=int),
+        "board_growth_pct": round_array(board_growth, 1),
+        "normalized_score": round_array(normalized_score, 1),
+    })
+
+
+def _load_table(path: str) -> SignalTable:
+    import pandas as pd  # CSV path only
+
+    table = _build_table(pd.read_csv(path))
+    print(f"[PINTEREST] Loaded {len(table)} keywords from CSV.")
+    return table
+
+
+def _load_store(path: str) -> SignalTable:
+    table = signal_store.load_table(path)
+    print(f"[PINTEREST] Mapped {len(table)} keywords from the signal store.")
+    return table
+
+
+def _on_reload(old: SignalTable, new: SignalTable):
+    # Cached analyses are rescored from the new rows when next read (see
+    # app.get_cached_analysis); nothing is refetched from Google
+    print(f"[PINTEREST] {len(old.changed_keywords(new))} keywords changed")
+
+
+def version():
+    """Version of the loaded pinterest data; changes whenever the file's content does."""
+    return _source.version
+
+
+# Loaded once at startup, then swapped in whole whenever the file changes
+if os.path.exists(_STORE_META):
+    _source = data_sources.register("pinterest", _STORE_META, _load_store, _on_reload, fallback=lambda: SignalTable([], {}))
+else:
+    _source = data_sources.register("pinterest", _CSV_PATH, _load_table, _on_reload, fallback=lambda: SignalTable([], {}))
+
+
+def get_pinterest_signal(keyword: str) -> PinterestSignal:
+    """
+    Returns save growth, board growth and the normalized 0-100 score
+    precomputed from the pre-seeded Pinterest CSV.
+    """
+    table = _source.current
+    signal = table.row(keyword, _FIELDS, PinterestSignal)
+    if signal is None:
+        if len(table):
+            print(f"[PINTEREST] Keyword not found: '{keyword}'")
+        return _FALLBACK
+    return signal
+
+
+def get_pinterest_signals(keywords: list[str]) -> dict:
+    """Batch lookup: {keyword: signal} for every keyword, with fallbacks for unknown ones."""
+    found = _source.current.rows(keywords, _FIELDS, PinterestSignal)
+    return {keyword: found.get(keyword) or _FALLBACK for keyword in keywords}
+
+
+# Neutral signal for keywords with no Pinterest row (immutable, so shared)
+_FALLBACK = PinterestSignal(
+    weekly_saves=0,
+    save_growth_pct=0.0,
+    board_count=0,
+    board_growth_pct=0.0,
+    normalized_score=40.0,
+)
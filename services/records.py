@@ -0,0 +1,159 @@
+# services/records.py
+
+from dataclasses import dataclass
+from typing import Optional
+
+from cache import codec
+
+# ─────────────────────────────────────────────
+# Signal and analysis records
+# ─────────────────────────────────────────────
+# Frozen, slotted records instead of nested dicts: one small object per
+# signal with no per-instance dict or repeated key strings. Being
+# immutable they are shared rather than copied — the cache, single-flight
+# waiters and every request read the same instance (copy/deepcopy return
+# it as is). A changed analysis is a new record (dataclasses.replace).
+#
+# Each record writes its own JSON shape with a fixed-key dict literal
+# (to_dict / to_detail / to_summary_row); the API contract is unchanged.
+# ─────────────────────────────────────────────
+
+
+class _Record:
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+@codec.register
+@dataclass(frozen=True, slots=True)
+class GoogleSignal(_Record):
+    current_interest: float
+    four_week_avg: float
+    growth_pct: float
+    normalized_score: float
+    source: str
+    fetched_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "current_interest": self.current_interest,
+            "four_week_avg": self.four_week_avg,
+            "growth_pct": self.growth_pct,
+            "normalized_score": self.normalized_score,
+            "source": self.source,
+            "fetched_at": self.fetched_at,
+        }
+
+
+@codec.register
+@dataclass(frozen=True, slots=True)
+class MarketplaceSignal(_Record):
+    current_rank: int
+    rank_7d_ago: int
+    rank_velocity: float
+    sales_growth_pct: float
+    normalized_score: float
+
+    def to_dict(self) -> dict:
+        return {
+            "current_rank": self.current_rank,
+            "rank_7d_ago": self.rank_7d_ago,
+            "rank_velocity": self.rank_velocity,
+            "sales_growth_pct": self.sales_growth_pct,
+            "normalized_score": self.normalized_score,
+        }
+
+
+@codec.register
+@dataclass(frozen=True, slots=True)
+class PinterestSignal(_Record):
+    weekly_saves: int
+    save_growth_pct: float
+    board_count: int
+    board_growth_pct: float
+    normalized_score: float
+
+    def to_dict(self) -> dict:
+        return {
+            "weekly_saves": self.weekly_saves,
+            "save_growth_pct": self.save_growth_pct,
+            "board_count": self.board_count,
+            "board_growth_pct": self.board_growth_pct,
+            "normalized_score": self.normalized_score,
+        }
+
+
+@codec.register
+@dataclass(frozen=True, slots=True)
+class AnalysisInputs(_Record):
+    """Versions of everything an analysis was derived from."""
+    google: Optional[float]
+    marketplace: Optional[str]
+    pinterest: Optional[str]
+    scoring: str
+
+    def to_dict(self) -> dict:
+        return {
+            "google": self.google,
+            "marketplace": self.marketplace,
+            "pinterest": self.pinterest,
+            "scoring": self.scoring,
+        }
+
+
+@codec.register
+@dataclass(frozen=True, slots=True)
+class Analysis(_Record):
+    keyword: str
+    trend_score: float
+    classification: str
+    recommendation: str
+    adjustment_pct: int
+    explanation: str
+    google: GoogleSignal
+    marketplace: MarketplaceSignal
+    pinterest: PinterestSignal
+    inputs: AnalysisInputs
+    generated_at: str
+    cached: bool = False
+
+    def to_detail(self) -> dict:
+        """The /api/trends/detail payload."""
+        return {
+            "keyword": self.keyword,
+            "trend_score": self.trend_score,
+            "classification": self.classification,
+            "recommendation": self.recommendation,
+            "adjustment_pct": self.adjustment_pct,
+            "explanation": self.explanation,
+            "signals": {
+                "google_trends": self.google.to_dict(),
+                "marketplace": self.marketplace.to_dict(),
+                "pinterest": self.pinterest.to_dict(),
+            },
+            "inputs": self.inputs.to_dict(),
+            "generated_at": self.generated_at,
+            "cached": self.cached,
+        }
+
+    def to_summary_row(self, category: Optional[str]) -> dict:
+        """Lightweight projection for the dashboard list."""
+        return {
+            "keyword": self.keyword,
+            "category": category,
+            "status": "ok",
+            "trend_score": self.trend_score,
+            "classification": self.classification,
+            "recommendation": self.recommendation,
+            "adjustment_pct": self.adjustment_pct,
+            "signals": {
+                "google_trends_score": self.google.normalized_score,
+                "marketplace_score": self.marketplace.normalized_score,
+                "pinterest_score": self.pinterest.normalized_score,
+            },
+        }
@@ -0,0 +1,194 @@
+# services/scheduler.py
+
+import fcntl
+import heapq
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Optional
+
+import config
+from cache import cache_manager
+from services import trends_service
+from utils.rate_limiter import TokenBucket
+
+# ─────────────────────────────────────────────
+# Background pre-warming scheduler
+# ─────────────────────────────────────────────
+# Every PREWARM_TICK_SECONDS the scheduler looks at each active keyword's
+# cached analysis. Anything missing or within PREWARM_LEAD_SECONDS of expiry
+# goes into a priority queue. Keywords are popped in groups that fit one
+# batched Google Trends request; each group costs one token from a bucket
+# refilled at PREWARM_RATE_PER_MINUTE, which keeps us under Google's 429
+# threshold. Expiry comes from the cache itself.
+#
+# Every worker process starts a scheduler thread, but only one per host
+# refreshes: the one holding an flock on PREWARM_LOCK_PATH. The others stand
+# by and retry each tick; the kernel drops the lock if its holder dies, so
+# another worker takes over. Standby workers only rely on pre-warmed results
+# when the cache is shared (SQLite backend) — see is_running().
+# ─────────────────────────────────────────────
+
+# A cached Google signal older than this is due: an analysis built on it is
+# already inside the refresh window. Refreshes refetch such signals instead
+# of reusing them, so every refresh moves the expiry forward.
+REFRESH_MAX_AGE_SECONDS = max(0, config.GOOGLE_SIGNAL_TTL_SECONDS - config.PREWARM_LEAD_SECONDS)
+
+_bucket = TokenBucket(rate=config.PREWARM_RATE_PER_MINUTE / 60.0, capacity=config.PREWARM_BURST)
+_requests: Counter = Counter()
+_lock = threading.Lock()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+_lock_fd: Optional[int] = None  # open and flocked while this process is the host's scheduler
+_refresh_fn: Optional[Callable[[str], object]] = None
+_status = {
+    "queue_depth": 0,
+    "refreshed": 0,
+    "failed": 0,
+    "cycles": 0,
+    "last_cycle_at": None,
+    "last_refreshed": None,
+}
+
+
+def start(refresh_fn: Callable[[str], object]):
+    """
+    Starts the scheduler thread. refresh_fn(keyword) must recompute and
+    cache the analysis for a keyword.
+    """
+    global _thread, _refresh_fn
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _refresh_fn = refresh_fn
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, daemon=True, name="prewarm-scheduler")
+        _thread.start()
+    print(f"[SCHEDULER] Pre-warming {len(config.KEYWORDS)} keywords "
+          f"({config.PREWARM_RATE_PER_MINUTE} Google batches/min, priority={config.PREWARM_PRIORITY})")
+
+
+def stop():
+    _stop.set()
+
+
+def is_running() -> bool:
+    """
+    True while pre-warmed results reach this process: it is the host's
+    scheduler, or it stands by and the cache is shared with the one that is.
+    """
+    if _thread is None or not _thread.is_alive() or _stop.is_set():
+        return False
+    return _lock_fd is not None or config.CACHE_BACKEND == "sqlite"
+
+
+def record_request(keyword: str):
+    """Counts a user request for keyword; used by the "popular" priority."""
+    with _lock:
+        _requests[keyword] += 1
+
+
+def status() -> dict:
+    """Progress, queue depth and limiter state for the status endpoint."""
+    with _lock:
+        return {
+            "running": is_running(),
+            "role": "leader" if _lock_fd is not None else "standby",
+            "priority": config.PREWARM_PRIORITY,
+            "keywords": len(config.KEYWORDS),
+            "tokens_available": _bucket.available(),
+            "rate_per_minute": config.PREWARM_RATE_PER_MINUTE,
+            **_status,
+        }
+
+
+def _build_queue() -> list:
+    """Heap of (priority, keyword) for every keyword that needs a refresh now."""
+    queue = []
+    for keyword in config.KEYWORDS:
+        expires_in = cache_manager.expires_in(f"analysis:{keyword}")
+        if expires_in is not None and expires_in > config.PREWARM_LEAD_SECONDS:
+            continue
+        # Missing entries sort before everything else
+        urgency = float("-inf") if expires_in is None else expires_in
+        if config.PREWARM_PRIORITY == "popular":
+            priority = (-_requests[keyword], urgency)
+        else:
+            priority = (urgency, -_requests[keyword])
+        queue.append((priority, keyword))
+    heapq.heapify(queue)
+    return queue
+
+
+def _try_lead() -> bool:
+    """Takes (or keeps) the host-wide scheduler lock without blocking."""
+    global _lock_fd
+    if _lock_fd is not None:
+        return True
+    fd = os.open(config.PREWARM_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    _lock_fd = fd
+    print(f"[SCHEDULER] Pre-warming from this worker (pid {os.getpid()})")
+    return True
+
+
+def _release_lead():
+    global _lock_fd
+    if _lock_fd is not None:
+        os.close(_lock_fd)  # drops the flock
+        _lock_fd = None
+
+
+def _loop():
+    try:
+        _run()
+    finally:
+        _release_lead()
+
+
+def _run():
+    group_size = trends_service.BATCH_MAX_TERMS - 1
+    while not _stop.is_set():
+        try:
+            if not _try_lead():
+                _stop.wait(config.PREWARM_TICK_SECONDS)
+                continue
+            queue = _build_queue()
+            with _lock:
+                _status["queue_depth"] = len(queue)
+
+            while queue and not _stop.is_set():
+                if not _bucket.acquire(timeout=config.PREWARM_TICK_SECONDS):
+                    break  # re-read priorities before waiting any longer
+                group = [heapq.heappop(queue)[1] for _ in range(min(group_size, len(queue)))]
+                _refresh_group(group)
+                with _lock:
+                    _status["queue_depth"] = len(queue)
+
+            with _lock:
+                _status["cycles"] += 1
+                _status["last_cycle_at"] = datetime.utcnow().isoformat()
+        except Exception as e:
+            print(f"[SCHEDULER] Cycle failed: {e}")
+        _stop.wait(config.PREWARM_TICK_SECONDS)
+
+
+def _refresh_group(group: list[str]):
+    # One batched Google request for the group; the per-keyword refreshes
+    # below wait for it instead of fetching on their own.
+    trends_service.prefetch_google_trends(group, max_age=REFRESH_MAX_AGE_SECONDS)
+    for keyword in group:
+        try:
+            _refresh_fn(keyword)
+            with _lock:
+                _status["refreshed"] += 1
+                _status["last_refreshed"] = keyword
+        except Exception as e:
+            print(f"[SCHEDULER] Refresh failed for '{keyword}': {e}")
+            with _lock:
+                _status["failed"] += 1
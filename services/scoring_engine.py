@@ -1,17 +1,40 @@
 # services/scoring_engine.py
 
-from config import SCORING_WEIGHTS
+import hashlib
+import json
 
+import numpy as np
 
-def compute_trend_score(google: dict, marketplace: dict, pinterest: dict) -> float:
+from config import SCORING_WEIGHTS, THRESHOLDS
+from services.records import GoogleSignal, MarketplaceSignal, PinterestSignal
+from utils.normalizer import round_array
+
+# Score cut-offs that pick the adjustment size within a classification
+STRONG_ACCELERATION_SCORE = 80
+SEVERE_DECLINE_SCORE = 25
+
+CLASSIFICATIONS = np.array(["Accelerating", "Emerging", "Stable", "Declining"], dtype=object)
+
+# Bump when the scoring/classification/explanation code itself changes
+RULES_REVISION = 1
+
+# Identifies the rules every derived field was computed with: cached analyses
+# scored under a different VERSION are rescored from their stored signals.
+VERSION = hashlib.blake2b(json.dumps(
+    [RULES_REVISION, SCORING_WEIGHTS, THRESHOLDS, STRONG_ACCELERATION_SCORE, SEVERE_DECLINE_SCORE],
+    sort_keys=True,
+).encode(), digest_size=8).hexdigest()
+
+
+def compute_trend_score(google: GoogleSignal, marketplace: MarketplaceSignal, pinterest: PinterestSignal) -> float:
     """
     Weighted composite of the three normalized signal scores.
     Formula: TMS = (Google x 0.45) + (Marketplace x 0.35) + (Pinterest x 0.20)
     """
     score = (
-        google["normalized_score"] * SCORING_WEIGHTS["google"] +
-        marketplace["normalized_score"] * SCORING_WEIGHTS["marketplace"] +
-        pinterest["normalized_score"] * SCORING_WEIGHTS["pinterest"]
+        google.normalized_score * SCORING_WEIGHTS["google"] +
+        marketplace.normalized_score * SCORING_WEIGHTS["marketplace"] +
+        pinterest.normalized_score * SCORING_WEIGHTS["pinterest"]
     )
     return round(score, 1)
 
@@ -22,11 +45,13 @@ def classify(trend_score: float, google_growth_pct: float) -> str:
     Using both prevents a keyword with a high static score but flat growth
     from being falsely classified as Accelerating.
     """
-    if trend_score >= 70 and google_growth_pct >= 15:
+    accelerating = THRESHOLDS["accelerating"]
+    emerging = THRESHOLDS["emerging"]
+    if trend_score >= accelerating["min_score"] and google_growth_pct >= accelerating["min_growth"]:
         return "Accelerating"
-    elif trend_score >= 55 and google_growth_pct >= 5:
+    elif trend_score >= emerging["min_score"] and google_growth_pct >= emerging["min_growth"]:
         return "Emerging"
-    elif trend_score >= 35:
+    elif trend_score >= THRESHOLDS["stable"]["min_score"]:
         return "Stable"
     else:
         return "Declining"
@@ -38,7 +63,7 @@ def recommend(classification: str, trend_score: float) -> dict:
     Returns the action (Increase/Maintain/Reduce) and suggested % adjustment.
     """
     if classification == "Accelerating":
-        adjustment = 30 if trend_score >= 80 else 20
+        adjustment = 30 if trend_score >= STRONG_ACCELERATION_SCORE else 20
         return {"action": "Increase", "adjustment_pct": adjustment}
 
     elif classification == "Emerging":
@@ -48,15 +73,67 @@ def recommend(classification: str, trend_score: float) -> dict:
         return {"action": "Maintain", "adjustment_pct": 0}
 
     else:  # Declining
-        adjustment = -20 if trend_score < 25 else -10
+        adjustment = -20 if trend_score < SEVERE_DECLINE_SCORE else -10
         return {"action": "Reduce", "adjustment_pct": adjustment}
 
 
-def build_explanation(classification: str, google: dict, marketplace: dict, pinterest: dict) -> str:
+def score_batch(google_scores, marketplace_scores, pinterest_scores, google_growth_pct) -> dict:
+    """
+    Vectorized compute_trend_score + classify + recommend for N keywords.
+    Takes equal-length arrays of normalized signal scores and Google growth %,
+    returns arrays keyed like the analysis fields. Results are identical to
+    calling the scalar functions one keyword at a time.
+    """
+    google_scores = np.asarray(google_scores, dtype=float)
+    marketplace_scores = np.asarray(marketplace_scores, dtype=float)
+    pinterest_scores = np.asarray(pinterest_scores, dtype=float)
+    google_growth_pct = np.asarray(google_growth_pct, dtype=float)
+
+    trend_score = round_array(
+        google_scores * SCORING_WEIGHTS["google"] +
+        marketplace_scores * SCORING_WEIGHTS["marketplace"] +
+        pinterest_scores * SCORING_WEIGHTS["pinterest"],
+        1,
+    )
+
+    accelerating = THRESHOLDS["accelerating"]
+    emerging = THRESHOLDS["emerging"]
+    # Index into CLASSIFICATIONS; conditions are checked in priority order
+    class_idx = np.select(
+        [
+            (trend_score >= accelerating["min_score"]) & (google_growth_pct >= accelerating["min_growth"]),
+            (trend_score >= emerging["min_score"]) & (google_growth_pct >= emerging["min_growth"]),
+            trend_score >= THRESHOLDS["stable"]["min_score"],
+        ],
+        [0, 1, 2],
+        default=3,
+    )
+
+    adjustment_pct = np.select(
+        [class_idx == 0, class_idx == 1, class_idx == 2],
+        [
+            np.where(trend_score >= STRONG_ACCELERATION_SCORE, 30, 20),
+            10,
+            0,
+        ],
+        default=np.where(trend_score < SEVERE_DECLINE_SCORE, -20, -10),
+    )
+    actions = np.array(["Increase", "Increase", "Maintain", "Reduce"], dtype=object)
+
+    return {
+        "trend_score": trend_score,
+        "classification": CLASSIFICATIONS[class_idx],
+        "recommendation": actions[class_idx],
+        "adjustment_pct": adjustment_pct,
+    }
+
+
+def build_explanation(classification: str, google: GoogleSignal, marketplace: MarketplaceSignal,
+                      pinterest: PinterestSignal) -> str:
     """Generates a human-readable explanation for the recommendation."""
     parts = []
 
-    g_growth = google["growth_pct"]
+    g_growth = google.growth_pct
     if g_growth >= 15:
         parts.append(f"Strong Google search surge (+{g_growth:.0f}% vs 4-week avg)")
     elif g_growth >= 5:
@@ -66,13 +143,13 @@ def build_explanation(classification: str, google: dict, marketplace: dict, pint
     else:
         parts.append("Flat Google search interest")
 
-    rv = marketplace["rank_velocity"]
+    rv = marketplace.rank_velocity
     if rv >= 10:
         parts.append(f"rising marketplace rank (+{rv:.0f} positions in 7 days)")
     elif rv < 0:
         parts.append(f"falling marketplace rank ({rv:.0f} positions in 7 days)")
 
-    sg = pinterest["save_growth_pct"]
+    sg = pinterest.save_growth_pct
     if sg >= 15:
         parts.append(f"high Pinterest save rate (+{sg:.0f}%)")
     elif sg < 0:
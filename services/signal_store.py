@@ -0,0 +1,245 @@
+# services/signal_store.py
+
+import argparse
+import json
+import math
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from config import DATA_DIR
+from services.signal_table import SignalTable
+
+# ─────────────────────────────────────────────
+# Columnar, memory-mapped signal store
+# ─────────────────────────────────────────────
+# One directory per source (data/store/marketplace, data/store/pinterest):
+#
+#   meta.json              source name, as-of day, metric and field lists
+#   keywords.json          keyword dictionary; a keyword's ID is its position
+#   offsets.npy            int64[n+1] — keyword i's history is rows offsets[i]:offsets[i+1]
+#   day.npy                int32 — days since 1970-01-01, ascending per keyword
+#   hist_<metric>.npy      float64 — daily history values, NaN where unknown
+#   field_<name>.npy       precomputed signal fields (what the service returns)
+#
+# Everything is opened with np.load(mmap_mode="r"), so workers share the
+# OS page cache instead of each parsing a CSV into its own heap. meta.json
+# is written last, which makes it the file to watch for reloads. Every file
+# is replaced by rename, never rewritten in place, so a worker still mapping
+# the previous generation keeps reading intact pages.
+# ─────────────────────────────────────────────
+
+STORE_DIR = os.path.join(DATA_DIR, 'store')
+
+# How each snapshot column the services need is read out of the history:
+# an int is "value N days before the as-of day"; "4w_avg" is the mean of the
+# values 7, 14, 21 and 28 days before it.
+SOURCES = {
+    "marketplace": {
+        "rank_today": ("rank", 0),
+        "rank_7d_ago": ("rank", 7),
+        "rank_30d_ago": ("rank", 30),
+        "weekly_sales_units": ("weekly_sales_units", 0),
+        "sales_4w_avg": ("weekly_sales_units", "4w_avg"),
+    },
+    "pinterest": {
+        "weekly_saves": ("weekly_saves", 0),
+        "saves_4w_avg": ("weekly_saves", "4w_avg"),
+        "board_count": ("board_count", 0),
+        "boards_4w_avg": ("board_count", "4w_avg"),
+    },
+}
+
+_AVG_LAGS = (7, 14, 21, 28)
+
+
+def store_path(source: str) -> str:
+    return os.path.join(STORE_DIR, source)
+
+
+class SignalStore:
+    """Read-only view of one source directory. All arrays are memory-mapped."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(directory, "keywords.json"), encoding="utf-8") as f:
+            self.keywords = json.load(f)
+        self.as_of = self.meta["as_of_day"]
+        self.offsets = self._load("offsets.npy")
+        self.day = self._load("day.npy")
+        self.history_columns = {m: self._load(f"hist_{m}.npy") for m in self.meta["metrics"]}
+        self.fields = {f: self._load(f"field_{f}.npy") for f in self.meta["fields"]}
+
+        # A reader racing a rewrite can see new arrays next to old metadata;
+        # fail so the DataSource keeps its previous table and retries.
+        n = len(self.keywords)
+        if len(self.offsets) != n + 1 or any(len(c) != n for c in self.fields.values()):
+            raise ValueError(f"store at {directory} is mid-rewrite")
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.directory, name), mmap_mode="r")
+
+    def table(self) -> SignalTable:
+        """SignalTable over the precomputed field columns (no copies)."""
+        return SignalTable(self.keywords, self.fields)
+
+    def history(self, keyword_id: int, metric: str, start_day: int = None, end_day: int = None):
+        """(days, values) for one keyword, optionally limited to [start_day, end_day]. Zero-copy slices."""
+        lo, hi = int(self.offsets[keyword_id]), int(self.offsets[keyword_id + 1])
+        days = self.day[lo:hi]
+        if start_day is not None:
+            lo += int(np.searchsorted(days, start_day, side="left"))
+        if end_day is not None:
+            hi = int(self.offsets[keyword_id]) + int(np.searchsorted(days, end_day, side="right"))
+        return self.day[lo:hi], self.history_columns[metric][lo:hi]
+
+
+def load_table(directory: str) -> SignalTable:
+    """DataSource loader: opens a store directory (or its meta.json) as a SignalTable."""
+    if os.path.basename(directory) == "meta.json":
+        directory = os.path.dirname(directory)
+    return SignalStore(directory).table()
+
+
+# ─────────────────────────────────────────────
+# Writing
+# ─────────────────────────────────────────────
+
+def write_store(directory: str, source: str, keywords: list, offsets, day, history: dict,
+                as_of_day: int, build_table):
+    """
+    Writes a complete store: history in CSR layout, snapshot columns read
+    back out of it per SOURCES[source], and the service's derived fields
+    (build_table is the service's DataFrame -> SignalTable function).
+    """
+    import pandas as pd
+
+    os.makedirs(directory, exist_ok=True)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int32)
+
+    snapshot = {"keyword": keywords}
+    for column, (metric, rule) in SOURCES[source].items():
+        snapshot[column] = _snapshot_column(offsets, day, np.asarray(history[metric], dtype=float), as_of_day, rule)
+    table = build_table(pd.DataFrame(snapshot))
+
+    # The table keeps only the first row per keyword; store exactly those
+    rows = np.fromiter(table.index.values(), dtype=np.intp, count=len(table))
+    kept = list(table.index.keys())
+
+    spans = np.concatenate([np.arange(offsets[r], offsets[r + 1]) for r in rows]) if len(rows) else np.array([], dtype=np.int64)
+    _save(directory, "offsets.npy", np.concatenate(([0], np.cumsum(np.diff(offsets)[rows]))).astype(np.int64))
+    _save(directory, "day.npy", day[spans])
+    for metric, values in history.items():
+        _save(directory, f"hist_{metric}.npy", np.asarray(values, dtype=np.float64)[spans])
+    for field, values in table.columns.items():
+        _save(directory, f"field_{field}.npy", np.asarray(values)[rows])
+    _save(directory, "keywords.json", kept)
+
+    meta = {
+        "source": source,
+        "as_of_day": int(as_of_day),
+        "as_of": (date(1970, 1, 1) + timedelta(days=int(as_of_day))).isoformat(),
+        "keywords": len(kept),
+        "history_rows": int(len(spans)),
+        "metrics": sorted(history),
+        "fields": sorted(table.columns),
+        # Changes the file's hash even when the counts don't, so watchers reload
+        "written_at": time.time(),
+    }
+    _save(directory, "meta.json", meta)
+    return meta
+
+
+def _save(directory: str, name: str, data):
+    """Writes a .npy array or a JSON document to a temp file, then renames it into place."""
+    path = os.path.join(directory, name)
+    tmp = f"{path}.tmp"
+    if name.endswith(".json"):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2 if name == "meta.json" else None)
+    else:
+        with open(tmp, "wb") as f:
+            np.save(f, data)
+    os.replace(tmp, path)
+
+
+def _snapshot_column(offsets, day, values, as_of_day: int, rule) -> np.ndarray:
+    """Evaluates one SOURCES rule for every keyword."""
+    out = np.full(len(offsets) - 1, np.nan)
+    lags = _AVG_LAGS if rule == "4w_avg" else (rule,)
+    for i in range(len(offsets) - 1):
+        lo, hi = offsets[i], offsets[i + 1]
+        points = [_as_of(day[lo:hi], values[lo:hi], as_of_day - lag) for lag in lags]
+        points = [p for p in points if not math.isnan(p)]
+        if points:
+            # fsum keeps the average exact when every point is the same
+            out[i] = math.fsum(points) / len(points)
+    return out
+
+
+def _as_of(days, values, target: int) -> float:
+    """Latest known value on or before target day."""
+    i = int(np.searchsorted(days, target, side="right"))
+    while i > 0:
+        i -= 1
+        if not math.isnan(values[i]):
+            return float(values[i])
+    return math.nan
+
+
+def convert_csv(source: str, csv_path: str, directory: str, as_of: date = None) -> dict:
+    """
+    Builds a store from today's snapshot CSV. Each snapshot column becomes
+    history points on the days its SOURCES rule reads, so the store
+    reproduces the CSV's signals exactly.
+    """
+    import pandas as pd
+
+    if source == "marketplace":
+        from services.marketplace_service import _build_table
+    else:
+        from services.pinterest_service import _build_table
+
+    df = pd.read_csv(csv_path)
+    as_of_day = ((as_of or date.today()) - date(1970, 1, 1)).days
+    rules = SOURCES[source]
+    metrics = sorted({metric for metric, _ in rules.values()})
+
+    # Every (lag -> value) point per keyword and metric
+    lags = sorted({lag for _, rule in rules.items() for lag in (_AVG_LAGS if rule[1] == "4w_avg" else (rule[1],))}, reverse=True)
+    day_grid = np.array([as_of_day - lag for lag in lags], dtype=np.int32)
+    history = {metric: np.full((len(df), len(lags)), np.nan) for metric in metrics}
+    for column, (metric, rule) in rules.items():
+        for lag in (_AVG_LAGS if rule == "4w_avg" else (rule,)):
+            history[metric][:, lags.index(lag)] = df[column].to_numpy(dtype=float)
+
+    n = len(df)
+    offsets = np.arange(n + 1, dtype=np.int64) * len(lags)
+    day = np.tile(day_grid, n)
+    return write_store(
+        directory, source, df["keyword"].tolist(), offsets, day,
+        {metric: values.ravel() for metric, values in history.items()},
+        as_of_day, _build_table,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert signal CSVs into the columnar store.")
+    parser.add_argument("--source", choices=sorted(SOURCES), action="append",
+                        help="source to convert (default: all)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="day the CSV snapshot describes (default: today)")
+    args = parser.parse_args()
+
+    for source in args.source or sorted(SOURCES):
+        meta = convert_csv(source, os.path.join(DATA_DIR, f"{source}_data.csv"), store_path(source), args.as_of)
+        print(f"[STORE] {source}: {meta['keywords']} keywords, {meta['history_rows']} history rows -> {store_path(source)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# services/signal_table.py
+
+import numpy as np
+
+
+class SignalTable:
+    """
+    Precomputed, keyword-indexed signal columns.
+    Every derived field is computed once (vectorized) when the table is built;
+    a lookup is a dict hit plus one element read per column.
+    """
+
+    __slots__ = ("index", "columns")
+
+    def __init__(self, keywords, columns: dict):
+        # keyword -> row position. The first row wins on duplicates, matching
+        # the old `_df[_df['keyword'] == keyword].iloc[0]` behaviour.
+        self.index = {}
+        for i, keyword in enumerate(keywords):
+            self.index.setdefault(keyword, i)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.index
+
+    def row(self, keyword: str, casts: dict, make=dict):
+        """
+        Returns make(field=cast(value), ...) for a keyword — a dict by
+        default, or a record type — or None if it isn't indexed.
+        """
+        i = self.index.get(keyword)
+        if i is None:
+            return None
+        return make(**{field: cast(self.columns[field][i]) for field, cast in casts.items()})
+
+    def rows(self, keywords, casts: dict, make=dict) -> dict:
+        """Batch form of row(); keywords that aren't indexed are left out."""
+        found = [(k, self.index[k]) for k in dict.fromkeys(keywords) if k in self.index]
+        if not found:
+            return {}
+        positions = np.fromiter((i for _, i in found), dtype=np.intp, count=len(found))
+        picked = {field: self.columns[field][positions].tolist() for field in casts}
+        return {
+            keyword: make(**{field: cast(picked[field][j]) for field, cast in casts.items()})
+            for j, (keyword, _) in enumerate(found)
+        }
+
+    def changed_keywords(self, other: "SignalTable") -> set:
+        """Keywords whose row differs between this table and other (including added/removed ones)."""
+        changed = set(self.index.keys() ^ other.index.keys())
+        common = [k for k in self.index if k in other.index]
+        if not common:
+            return changed
+
+        mine = np.fromiter((self.index[k] for k in common), dtype=np.intp, count=len(common))
+        theirs = np.fromiter((other.index[k] for k in common), dtype=np.intp, count=len(common))
+        differs = np.zeros(len(common), dtype=bool)
+        for field in self.columns.keys() | other.columns.keys():
+            if field not in self.columns or field not in other.columns:
+                return changed | set(common)
+            a = self.columns[field][mine]
+            b = other.columns[field][theirs]
+            same = a == b
+            if a.dtype.kind == "f" and b.dtype.kind == "f":
+                same |= np.isnan(a) & np.isnan(b)
+            differs |= ~same
+        changed.update(k for k, d in zip(common, differs) if d)
+        return changed
@@ -0,0 +1,112 @@
+# services/summary_index.py
+
+import base64
+import heapq
+import json
+import math
+
+import numpy as np
+
+# ─────────────────────────────────────────────
+# Query index over summary rows
+# ─────────────────────────────────────────────
+# Built once per summary snapshot (i.e. only when some row changed), then
+# every filtered/sorted/paginated dashboard query runs against its columns:
+# filters are vectorized masks, the page is picked with a bounded heap
+# (O(n log k) instead of a full sort), and pagination is keyset-based —
+# the cursor is the last row's sort key, so pages stay consistent while
+# other rows refresh underneath them.
+# ─────────────────────────────────────────────
+
+# Sortable fields: name -> how to read it from a summary row
+SORT_FIELDS = {
+    "trend_score": lambda row: row["trend_score"],
+    "adjustment_pct": lambda row: row["adjustment_pct"],
+    "google_trends_score": lambda row: row["signals"]["google_trends_score"],
+    "marketplace_score": lambda row: row["signals"]["marketplace_score"],
+    "pinterest_score": lambda row: row["signals"]["pinterest_score"],
+}
+
+
+class SummaryIndex:
+    __slots__ = ("rows", "keywords", "ok", "category", "classification", "columns")
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.keywords = [row["keyword"] for row in rows]
+        self.ok = np.array([row["status"] == "ok" for row in rows], dtype=bool)
+        self.category = np.array([row.get("category") or "" for row in rows], dtype=object)
+        self.classification = np.array([row.get("classification") or "" for row in rows], dtype=object)
+        self.columns = {
+            field: np.array([read(row) if row["status"] == "ok" else math.nan for row in rows], dtype=float)
+            for field, read in SORT_FIELDS.items()
+        }
+
+    def query(self, categories=None, classifications=None, min_score=None, max_score=None,
+              sort=None, descending=True, limit=None, after=None):
+        """
+        Returns (total matches, page rows, sort key of the page's last row or
+        None when there are no more pages).
+        Without `sort` rows keep dashboard order and pending/error rows are
+        included unless a classification or score filter excludes them;
+        sorting by a signal only considers analysed rows.
+        """
+        mask = np.ones(len(self.rows), dtype=bool)
+        if sort is not None or classifications or min_score is not None or max_score is not None:
+            mask &= self.ok
+        if categories:
+            mask &= np.isin(self.category, list(categories))
+        if classifications:
+            mask &= np.isin(self.classification, list(classifications))
+        scores = self.columns["trend_score"]
+        with np.errstate(invalid="ignore"):
+            if min_score is not None:
+                mask &= scores >= min_score
+            if max_score is not None:
+                mask &= scores <= max_score
+        total = int(mask.sum())
+
+        if sort is None:
+            # Dashboard order; the key is the row position
+            if after is not None:
+                mask[:int(after[0]) + 1] = False
+            positions = np.flatnonzero(mask)
+            page = positions if limit is None else positions[:limit]
+            keys = [(int(i),) for i in page]
+        else:
+            values = self.columns[sort]
+            sign = -1.0 if descending else 1.0
+            if after is not None:
+                # Rows strictly after (value, keyword) in the requested order
+                value, keyword = sign * float(after[0]), after[1]
+                keyed = sign * values
+                ties = np.fromiter((k > keyword for k in self.keywords), dtype=bool, count=len(self.keywords))
+                mask &= (keyed > value) | ((keyed == value) & ties)
+            positions = np.flatnonzero(mask)
+            key = lambda i: (sign * values[i], self.keywords[i])
+            if limit is None or limit >= len(positions):
+                page = sorted(positions, key=key)
+            else:
+                page = heapq.nsmallest(limit, positions, key=key)
+            keys = [(float(values[i]), self.keywords[i]) for i in page]
+
+        rows = [self.rows[i] for i in page]
+        more = len(rows) < int(mask.sum())
+        return total, rows, (keys[-1] if rows and more else None)
+
+
+def encode_cursor(key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort):
+    """Sort key from a cursor. Raises ValueError if it's malformed or for a different sort."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid 'cursor'.")
+    expected = (int,) if sort is None else ((int, float), str)
+    if not isinstance(key, list) or len(key) != len(expected) or not all(
+            isinstance(v, t) and not isinstance(v, bool) for v, t in zip(key, expected)):
+        raise ValueError("Invalid 'cursor' for this sort order.")
+    return key
@@ -0,0 +1,262 @@
+# services/trends_async.py
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import time
+
+import httpx
+
+from cache import cache_manager
+from utils import deadline
+from utils.metrics import GOOGLE_HTTP_RETRIES
+from config import GOOGLE_CONCURRENCY_WAIT_SECONDS, ANCHOR_KEYWORD
+from utils.circuit_breaker import CircuitOpenError
+from services.records import GoogleSignal
+from services.trends_service import (
+    _BASE_URL, _EXPLORE_URL, _MULTILINE_URL, _HEADERS, _CACHE_TTL, MAX_RETRIES,
+    _BREAKER, _LIMITER, _start_call, _finish_call,
+    _PENDING, _PENDING_LOCK, _cache_key, _cached, _explore_params, _multiline_params, _parse_series, _parse_json,
+    _summarize, _neutral_fallback, anchor_reference, rescale_factor,
+)
+
+# ─────────────────────────────────────────────
+# Google Trends – asyncio client
+# ─────────────────────────────────────────────
+# Same explore → multiline flow as trends_service, but on a pooled
+# keep-alive httpx.AsyncClient so one event loop can have many fetches in
+# flight without a thread each. Timeouts use asyncio.wait_for, which
+# cancels the underlying request instead of leaving it running, and every
+# wait is cut short by the deadline budget of the task that started the
+# fetch (utils/deadline.py).
+# Results share the "google:<keyword>" cache entries with the sync client;
+# cache calls block (SQLite), so they run via asyncio.to_thread.
+# ─────────────────────────────────────────────
+
+FETCH_TIMEOUT = 30          # seconds for the whole explore + multiline exchange
+MAX_CONCURRENT_FETCHES = 8  # live Google requests in flight per event loop
+BACKOFF_FACTOR = 1          # 1s, 2s, ... between retries, like the urllib3 Retry
+
+# 429 is left to the shared breaker/limiter, as in trends_service
+_RETRY_STATUSES = {500, 502, 503, 504}
+
+# Cache backends record the acquiring thread as a lock's owner and only
+# let that thread release it (asyncio.to_thread could release from a
+# different one). Lock calls run on single-thread executors, as many as
+# the default executor has threads, picked by key: a key's acquire and
+# release always land on the same thread.
+_LOCK_EXECUTORS = [
+    concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"async-cache-locks-{i}")
+    for i in range(min(32, (os.cpu_count() or 1) + 4))
+]
+
+
+class _LoopState:
+    """Client, limiter and in-flight fetches for one event loop."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            headers=_HEADERS,
+            timeout=httpx.Timeout(15.0),
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_FETCHES, max_keepalive_connections=MAX_CONCURRENT_FETCHES),
+            follow_redirects=True,
+        )
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self.inflight: dict[str, asyncio.Task] = {}
+        self.primed = False
+        # One fetch primes cookies at a time; generation counts primings so a
+        # rejection only un-primes the cookies that fetch was sent with
+        self.prime_lock = asyncio.Lock()
+        self.generation = 0
+
+
+_states: dict = {}
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _states.get(loop)
+    if state is None:
+        state = _states[loop] = _LoopState()
+    return state
+
+
+async def aclose():
+    """Closes this loop's client; call on ASGI shutdown."""
+    state = _states.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.client.aclose()
+
+
+def _lock_executor(key: str) -> concurrent.futures.ThreadPoolExecutor:
+    return _LOCK_EXECUTORS[hash(key) % len(_LOCK_EXECUTORS)]
+
+
+async def acquire_lock(key: str, ttl: float) -> bool:
+    """cache_manager.acquire_lock off the loop; release with release_lock below."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_lock_executor(key), functools.partial(cache_manager.acquire_lock, key, ttl=ttl))
+
+
+async def release_lock(key: str):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_lock_executor(key), cache_manager.release_lock, key)
+
+
+async def fetch_google_trends(keyword: str) -> GoogleSignal:
+    """
+    Async counterpart of trends_service.fetch_google_trends.
+    Concurrent calls for the same keyword share one fetch; a caller that is
+    cancelled (e.g. client disconnect) doesn't cancel it for the others.
+    """
+    cached = _cached(await asyncio.to_thread(cache_manager.get, _cache_key(keyword)))
+    if cached:
+        return cached
+
+    state = _state()
+    task = state.inflight.get(keyword)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_cache(state, keyword))
+        state.inflight[keyword] = task
+        task.add_done_callback(lambda _t: state.inflight.pop(keyword, None))
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_cache(state: _LoopState, keyword: str) -> GoogleSignal:
+    cache_key = _cache_key(keyword)
+
+    # A batch prefetch (trends_service.prefetch_google_trends) already covers
+    # this keyword — wait for it instead of sending a separate request
+    with _PENDING_LOCK:
+        pending = _PENDING.get(keyword)
+    if pending is not None:
+        cached = await _wait_for_prefetch(pending, cache_key, deadline.remaining(FETCH_TIMEOUT))
+        if cached:
+            return cached
+
+    # Another worker is fetching it right now — wait for its result
+    if not await acquire_lock(cache_key, ttl=FETCH_TIMEOUT):
+        cached = await _wait_for_cached(cache_key, deadline.remaining(FETCH_TIMEOUT))
+        if cached:
+            return cached
+        return await _fetch_with_timeout(state, keyword)
+
+    try:
+        # A batch or another worker may have cached it since the first look
+        # (a batch that finished by then has cleared its pending event too)
+        if await asyncio.to_thread(cache_manager.contains, cache_key):
+            cached = _cached(await asyncio.to_thread(cache_manager.get, cache_key))
+            if cached:
+                return cached
+        return await _fetch_with_timeout(state, keyword)
+    finally:
+        await release_lock(cache_key)
+
+
+async def _fetch_with_timeout(state: _LoopState, keyword: str) -> GoogleSignal:
+    if _BREAKER.is_open():
+        return _neutral_fallback(keyword, reason="circuit_open")
+    timeout = deadline.remaining(FETCH_TIMEOUT)
+    if timeout <= 0:
+        return _neutral_fallback(keyword, reason="deadline")
+    try:
+        async with state.semaphore:
+            result = await asyncio.wait_for(_fetch_live(state, keyword), timeout=timeout)
+        await asyncio.to_thread(cache_manager.set, _cache_key(keyword), result, ttl=_CACHE_TTL)
+        return result
+    except CircuitOpenError:
+        return _neutral_fallback(keyword, reason="circuit_open")
+    except asyncio.TimeoutError:
+        print(f"[TRENDS] Timeout fetching live data for '{keyword}'")
+    except httpx.HTTPStatusError as e:
+        print(f"[TRENDS] HTTP error fetching '{keyword}': {e}")
+    except Exception as e:
+        print(f"[TRENDS] Unexpected error fetching '{keyword}': {e}")
+
+    return _neutral_fallback(keyword, reason="all_retries_exhausted_or_error")
+
+
+async def _wait_for_prefetch(event, cache_key: str, timeout: float, poll_interval: float = 0.1):
+    """Waits (without blocking the loop) for a batch prefetch to finish, then reads its result."""
+    until = time.time() + timeout
+    while not event.is_set() and time.time() < until:
+        await asyncio.sleep(poll_interval)
+    return _cached(await asyncio.to_thread(cache_manager.get, cache_key))
+
+
+async def _wait_for_cached(cache_key: str, timeout: float, poll_interval: float = 0.2):
+    """Async cache_manager.wait_for: yields to the loop between polls."""
+    until = time.time() + timeout
+    while True:
+        value = _cached(await asyncio.to_thread(cache_manager.get, cache_key))
+        if value is not None or time.time() >= until or not await asyncio.to_thread(cache_manager.locked, cache_key):
+            return value
+        await asyncio.sleep(poll_interval)
+
+
+async def _prime(state: _LoopState) -> int:
+    """
+    Picks up initial cookies (NID, etc.) if the client has none yet; the cookie
+    jar and connections are reused by every later fetch. Concurrent fetches
+    wait for one priming instead of each clearing the jar. Returns the
+    generation of the cookies now in use.
+    """
+    if not state.primed:
+        async with state.prime_lock:
+            if not state.primed:
+                state.client.cookies.clear()
+                await state.client.get(f"{_BASE_URL}/explore")
+                state.generation += 1
+                state.primed = True
+    return state.generation
+
+
+async def _fetch_live(state: _LoopState, keyword: str) -> GoogleSignal:
+    client = state.client
+    generation = await _prime(state)
+
+    # Compared against the anchor and rescaled like the sync client's fetches
+    terms, reference = [keyword], None
+    if keyword != ANCHOR_KEYWORD:
+        terms = [ANCHOR_KEYWORD, keyword]
+        reference = await asyncio.to_thread(anchor_reference)
+
+    await _acquire_slot()
+    _start_call()
+    try:
+        explore_data = await _get_json(client, _EXPLORE_URL, _explore_params(terms))
+        multiline_data = await _get_json(client, _MULTILINE_URL, _multiline_params(explore_data))
+    except BaseException as e:
+        _finish_call(e)
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (401, 403, 429):
+            # Cookies rejected: pick up fresh ones on the next fetch, unless
+            # another fetch already has since this one was sent
+            if state.generation == generation:
+                state.primed = False
+        raise
+    _finish_call(None)
+    series = _parse_series(multiline_data, terms)
+    scale = rescale_factor(series[ANCHOR_KEYWORD], reference)
+    return _summarize(keyword, [v * scale for v in series[keyword]])
+
+
+async def _acquire_slot():
+    """Polls the shared adaptive limiter; its slots are shared with the sync client."""
+    until = time.monotonic() + deadline.remaining(GOOGLE_CONCURRENCY_WAIT_SECONDS)
+    while not _LIMITER.try_acquire():
+        if time.monotonic() >= until:
+            raise TimeoutError("No free Google concurrency slot")
+        await asyncio.sleep(0.05)
+
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: dict) -> dict:
+    """GET with retry/backoff on 5xx, then decode the JSON body."""
+    for attempt in range(MAX_RETRIES + 1):
+        resp = await client.get(url, params=params)
+        if resp.status_code in _RETRY_STATUSES and attempt < MAX_RETRIES:
+            GOOGLE_HTTP_RETRIES.inc(str(resp.status_code))
+            await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+            continue
+        resp.raise_for_status()
+        return _parse_json(resp.text)
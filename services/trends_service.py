@@ -5,12 +5,28 @@ import json
 import time
 import random
 import threading
+import contextvars
 import concurrent.futures
-from typing import Optional
+from contextlib import contextmanager
+from typing import Callable, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import requests.exceptions as req_exceptions
 
+from cache import cache_manager
+from config import (
+    TRENDS_BASE_URL, GOOGLE_SIGNAL_TTL_SECONDS, ANCHOR_KEYWORD,
+    GOOGLE_BREAKER_FAILURES, GOOGLE_BREAKER_RESET_SECONDS, GOOGLE_BREAKER_MAX_RESET_SECONDS,
+    GOOGLE_CONCURRENCY_INITIAL, GOOGLE_CONCURRENCY_MAX, GOOGLE_CONCURRENCY_WAIT_SECONDS,
+    GOOGLE_SESSION_POOL_SIZE, GOOGLE_SESSION_MAX_AGE_SECONDS,
+)
+from services.records import GoogleSignal
+from utils import deadline
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.metrics import GOOGLE_RESULTS, GOOGLE_HTTP_RETRIES, Gauge
+from utils.rate_limiter import AdaptiveLimiter
+from utils.session_pool import SessionPool
+
 # ─────────────────────────────────────────────
 # Google Trends – Direct HTTP Fetcher
 # ─────────────────────────────────────────────
@@ -25,7 +41,7 @@ import requests.exceptions as req_exceptions
 # headers, cookies, and retry logic ourselves.
 # ─────────────────────────────────────────────
 
-_BASE_URL = "https://trends.google.com/trends"
+_BASE_URL = TRENDS_BASE_URL
 _EXPLORE_URL = f"{_BASE_URL}/api/explore"
 _MULTILINE_URL = f"{_BASE_URL}/api/widgetdata/multiline"
 
@@ -42,72 +58,483 @@ _HEADERS = {
 
 MAX_RETRIES = 2
 RETRY_DELAY = 3  # seconds between retries
+FETCH_TIMEOUT = 30  # seconds a caller waits for one live fetch (or any wait on another fetch)
+
+# Batched fetching: the explore API accepts up to 5 comparison items per
+# request. One slot is always taken by ANCHOR_KEYWORD (config.py), whose
+# series is used to rescale every batch onto the same reference so scores
+# from different batches stay comparable.
+BATCH_MAX_TERMS = 5
+
+class _CountingRetry(Retry):
+    """urllib3 Retry that counts each retried request for /api/metrics."""
 
-# Global session with retry/backoff
-_SESSION = requests.Session()
-_RETRY_STRATEGY = Retry(
+    def increment(self, method=None, url=None, response=None, error=None, *args, **kwargs):
+        # Raises MaxRetryError on the attempt that exhausts the budget: that
+        # one fails the request instead of being retried, so isn't counted
+        retry = super().increment(method, url, response, error, *args, **kwargs)
+        GOOGLE_HTTP_RETRIES.inc(str(response.status) if response is not None else type(error).__name__)
+        return retry
+
+
+# Retry/backoff for every pooled session. 429 is not retried here: it goes
+# straight to the adaptive limiter and circuit breaker below, since retrying
+# into a rate limit only deepens it.
+_RETRY_STRATEGY = _CountingRetry(
     total=2,
     backoff_factor=1,
-    status_forcelist=[429, 500, 502, 503, 504],
+    status_forcelist=[500, 502, 503, 504],
     allowed_methods=["GET", "POST"],
 )
-_ADAPTER = HTTPAdapter(max_retries=_RETRY_STRATEGY)
-_SESSION.mount("https://", _ADAPTER)
-_SESSION.mount("http://", _ADAPTER)
 
-# Simple in-memory TTL cache to reduce live calls
-_CACHE: dict[str, tuple[float, dict]] = {}
-_CACHE_TTL = 300  # seconds
-_CACHE_LOCK = threading.Lock()
 
-def fetch_google_trends(keyword: str) -> dict:
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update(_HEADERS)
+    adapter = HTTPAdapter(max_retries=_RETRY_STRATEGY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _prime_session(session: requests.Session):
+    # Visit the trends page to pick up initial cookies (NID, etc.)
+    session.get(f"{_BASE_URL}/explore", timeout=15)
+
+# Every explore + multiline round-trip (sync or async) runs under both:
+# the breaker turns a blocked IP into instant fallbacks instead of minutes
+# of retries, and the limiter shrinks concurrency when Google throttles.
+_BREAKER = CircuitBreaker(GOOGLE_BREAKER_FAILURES, GOOGLE_BREAKER_RESET_SECONDS, GOOGLE_BREAKER_MAX_RESET_SECONDS)
+_LIMITER = AdaptiveLimiter(GOOGLE_CONCURRENCY_INITIAL, maximum=GOOGLE_CONCURRENCY_MAX)
+
+# Each fetch checks out its own session; cookies are picked up once per
+# session instead of once per keyword. Sessions are checked out (and so
+# primed) under the fetch's limiter slot and breaker check, so priming
+# requests are throttled and cut off along with the fetches.
+_SESSIONS = SessionPool(
+    GOOGLE_SESSION_POOL_SIZE, _new_session, _prime_session, max_age=GOOGLE_SESSION_MAX_AGE_SECONDS,
+)
+
+# Live results are kept in cache_manager (shared between workers when the
+# SQLite backend is on) under "google:<keyword>" to reduce live calls.
+# Each result carries its fetched_at time, which analyses use as the Google
+# signal's version and to expire together with it.
+_CACHE_TTL = GOOGLE_SIGNAL_TTL_SECONDS
+
+# The anchor's own average interest (see anchor_reference), cached like a
+# signal and refetched with it
+_REFERENCE_KEY = f"google-reference:{ANCHOR_KEYWORD}"
+_REFERENCE_LOCK = threading.Lock()
+
+# Keywords queued in a running batch prefetch in this process -> event set
+# when it finishes
+_PENDING: dict[str, threading.Event] = {}
+_PENDING_LOCK = threading.Lock()
+
+
+def _cache_key(keyword: str) -> str:
+    return f"google:{keyword}"
+
+
+def _cached(value, max_age: Optional[float] = None) -> Optional[GoogleSignal]:
+    """
+    A cache read, ignoring entries from before signals were records (they are
+    refetched) and, given max_age, signals fetched more than max_age seconds ago.
+    """
+    if not isinstance(value, GoogleSignal):
+        return None
+    if max_age is not None and (value.fetched_at or 0) < time.time() - max_age:
+        return None
+    return value
+
+
+def is_cached(keyword: str, max_age: Optional[float] = None) -> bool:
+    """
+    True if a fresh Google signal (no older than max_age, if given) is cached
+    for keyword, i.e. fetch_google_trends won't go to Google.
+    """
+    if max_age is None:
+        return cache_manager.contains(_cache_key(keyword))
+    return _cached(cache_manager.get(_cache_key(keyword)), max_age) is not None
+
+
+def is_prefetching(keyword: str) -> bool:
+    """True while a batch prefetch in this process is fetching keyword's signal."""
+    with _PENDING_LOCK:
+        return keyword in _PENDING
+
+
+def fetch_google_trends(keyword: str, max_age: Optional[float] = None) -> GoogleSignal:
     """
     Fetches 4 weeks of Google Trends data for a keyword in India.
     Uses direct HTTP requests to Google Trends' internal API.
 
-    Returns a dict with current interest, average, growth %, and normalized score.
+    Returns a GoogleSignal with current interest, average, growth %, and normalized score.
     Falls back to neutral values (score=50) if the API fails or returns empty data.
+    Every wait is cut short by the caller's deadline budget (utils/deadline.py).
+    With max_age, a cached signal fetched longer ago than that is refetched
+    (the pre-warm scheduler's refreshes must extend freshness, not reuse it).
     """
     # Check cache
-    now = time.time()
-    with _CACHE_LOCK:
-        cached = _CACHE.get(keyword)
-        if cached and cached[0] > now:
-            # return cached copy
-            return dict(cached[1])
-
-    # Run network fetch off the main Gunicorn worker thread
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
-        fut = ex.submit(_fetch_live, keyword)
+    cache_key = _cache_key(keyword)
+    cached = _cached(cache_manager.get(cache_key), max_age)
+    if cached:
+        return cached
+    with _PENDING_LOCK:
+        pending = _PENDING.get(keyword)
+
+    # A batch prefetch already covers this keyword — wait for it instead of
+    # sending a separate request
+    if pending is not None and pending.wait(timeout=deadline.remaining(FETCH_TIMEOUT)):
+        cached = _cached(cache_manager.get(cache_key), max_age)
+        if cached:
+            return cached
+
+    # Another worker is fetching it right now — wait for its result
+    if not cache_manager.acquire_lock(cache_key, ttl=FETCH_TIMEOUT):
+        cached = _cached(cache_manager.wait_for(cache_key, timeout=deadline.remaining(FETCH_TIMEOUT)), max_age)
+        return cached or _fetch_with_timeout(keyword)
+
+    try:
+        # A batch or another worker may have cached it since the first look
+        # (a batch that finished by then has cleared its pending event too)
+        if cache_manager.contains(cache_key):
+            cached = _cached(cache_manager.get(cache_key), max_age)
+            if cached:
+                return cached
+        return _fetch_with_timeout(keyword)
+    finally:
+        cache_manager.release_lock(cache_key)
+
+
+def _fetch_with_timeout(keyword: str) -> GoogleSignal:
+    """
+    Runs _fetch_live with a FETCH_TIMEOUT timeout (less if the deadline
+    budget is nearly spent). A fetch that outlives its caller keeps going
+    and still caches its result.
+    """
+    if _BREAKER.is_open():
+        return _neutral_fallback(keyword, reason="circuit_open")
+    timeout = deadline.remaining(FETCH_TIMEOUT)
+    if timeout <= 0:
+        return _neutral_fallback(keyword, reason="deadline")
+
+    # Run network fetch off the main Gunicorn worker thread, under the
+    # caller's deadline. Not `with`: exiting it would wait for the fetch.
+    ex = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    fut = ex.submit(contextvars.copy_context().run, _fetch_and_cache, keyword)
+    ex.shutdown(wait=False)
+    try:
+        return fut.result(timeout=timeout)
+    except CircuitOpenError:
+        return _neutral_fallback(keyword, reason="circuit_open")
+    except concurrent.futures.TimeoutError:
+        print(f"[TRENDS] Timeout fetching live data for '{keyword}'")
+    except req_exceptions.HTTPError as e:
+        print(f"[TRENDS] HTTP error fetching '{keyword}': {e}")
+    except Exception as e:
+        print(f"[TRENDS] Unexpected error fetching '{keyword}': {e}")
+
+    return _neutral_fallback(keyword, reason="all_retries_exhausted_or_error")
+
+
+def _fetch_and_cache(keyword: str) -> GoogleSignal:
+    result = _fetch_live(keyword)
+    cache_manager.set(_cache_key(keyword), result, ttl=_CACHE_TTL)
+    return result
+
+
+def prefetch_google_trends(keywords: list[str], max_age: Optional[float] = None) -> None:
+    """
+    Starts a background batch fetch for every keyword not already cached
+    (or, with max_age, cached but fetched longer ago than that).
+    Callers of fetch_google_trends for those keywords wait for the batch
+    instead of issuing their own requests.
+    """
+    with _PENDING_LOCK:
+        todo = []
+        for keyword in dict.fromkeys(keywords):
+            if keyword in _PENDING or is_cached(keyword, max_age):
+                continue
+            _PENDING[keyword] = threading.Event()
+            todo.append(keyword)
+
+    if todo:
+        threading.Thread(target=_run_prefetch, args=(todo,), daemon=True, name="trends-prefetch").start()
+
+
+def _run_prefetch(keywords: list[str]):
+    """Runs fetch_google_trends_batch, releasing waiters batch by batch as results land."""
+    def claim(batch: list[str]) -> list[str]:
+        # Each batch locks its keywords as it goes out, for one round-trip
+        # like a single fetch. Keywords another worker is already fetching
+        # are left out; their waiters fall through to fetch_google_trends'
+        # own lock/wait.
+        claimed = []
+        for keyword in batch:
+            if cache_manager.acquire_lock(_cache_key(keyword), ttl=FETCH_TIMEOUT):
+                claimed.append(keyword)
+            else:
+                _release_pending(keyword)
+        return claimed
+
+    def publish(keyword: str, result: GoogleSignal):
+        # Runs on the batch's thread, which holds its locks
+        if result.source == "live":
+            cache_manager.set(_cache_key(keyword), result, ttl=_CACHE_TTL)
+        cache_manager.release_lock(_cache_key(keyword))
+        _release_pending(keyword)
+
+    try:
+        fetch_google_trends_batch(keywords, on_result=publish, claim=claim)
+    except Exception as e:
+        print(f"[TRENDS] Batch prefetch failed: {e}")
+    finally:
+        for keyword in keywords:
+            _release_pending(keyword)
+
+
+def _release_pending(keyword: str):
+    with _PENDING_LOCK:
+        event = _PENDING.pop(keyword, None)
+    if event is not None:
+        event.set()
+
+
+def fetch_google_trends_batch(keywords: list[str], on_result: Optional[Callable[[str, GoogleSignal], None]] = None,
+                              reference: Optional[float] = None, workers: Optional[int] = None,
+                              claim: Optional[Callable[[list], list]] = None) -> dict:
+    """
+    Fetches Google Trends data for many keywords using multi-term explore
+    requests (anchor + up to BATCH_MAX_TERMS - 1 keywords each), sent
+    concurrently on up to `workers` threads (default: the adaptive limit
+    at the time of the call); each request takes its own _LIMITER slot.
+
+    Google scales every batch to its own peak, so each batch is rescaled by
+    the anchor: values are multiplied by (reference / this batch's anchor
+    avg), where the reference is anchor_reference() unless one is passed in —
+    the same scale single-keyword fetches use, so a keyword's score doesn't
+    depend on which request fetched it. If the reference can't be fetched,
+    the anchor avg in the first batch is used for this call.
+    Growth % is unaffected by the rescale. Keywords in a failed batch get the
+    usual neutral fallback.
+
+    on_result(keyword, result) is called as soon as each batch is parsed,
+    on that batch's thread, so callers can use early results while later
+    batches are in flight. claim(batch), if given, is called on the same
+    thread right before a batch is sent and returns the keywords to fetch;
+    keywords it leaves out get no result.
+    """
+    terms = [k for k in dict.fromkeys(keywords) if k != ANCHOR_KEYWORD]
+    per_batch = BATCH_MAX_TERMS - 1
+    batches = [terms[i:i + per_batch] for i in range(0, len(terms), per_batch)]
+    if not batches and ANCHOR_KEYWORD in keywords:
+        batches = [[]]
+
+    results = {}
+    results_lock = threading.Lock()
+    if reference is None and batches:
+        reference = anchor_reference()
+
+    def emit(batch_results: dict):
+        with results_lock:
+            results.update(batch_results)
+        if on_result is not None:
+            for keyword, result in batch_results.items():
+                on_result(keyword, result)
+
+    def fetch_batch(batch: list[str]):
+        nonlocal reference
+        if claim is not None and batch:
+            batch = claim(batch)
+            if not batch:
+                return
+        batch_results = {}
+        try:
+            series = _fetch_live_series([ANCHOR_KEYWORD] + batch)
+        except Exception as e:
+            print(f"[TRENDS] Batch fetch failed for {batch}: {e}")
+            for keyword in batch:
+                batch_results[keyword] = _neutral_fallback(keyword, reason="batch_fetch_error")
+            emit(batch_results)
+            return
+
+        anchor_values = series[ANCHOR_KEYWORD]
+        anchor_avg = _average(anchor_values)
+
+        scale = 1.0
+        if anchor_avg > 0:
+            with results_lock:
+                if reference is None:
+                    reference = anchor_avg
+                scale = reference / anchor_avg
+                want_anchor = ANCHOR_KEYWORD in keywords and ANCHOR_KEYWORD not in results
+                if want_anchor:
+                    # Claimed here so only one batch reports it
+                    results[ANCHOR_KEYWORD] = None
+            if want_anchor:
+                batch_results[ANCHOR_KEYWORD] = _summarize(ANCHOR_KEYWORD, [v * scale for v in anchor_values])
+        else:
+            print(f"[TRENDS] Anchor '{ANCHOR_KEYWORD}' has no interest in batch {batch}; not rescaling")
+
+        for keyword in batch:
+            try:
+                batch_results[keyword] = _summarize(keyword, [v * scale for v in series[keyword]])
+            except ValueError as e:
+                batch_results[keyword] = _neutral_fallback(keyword, reason=str(e))
+        emit(batch_results)
+
+    workers = min(len(batches), workers or _LIMITER.limit)
+    if workers <= 1:
+        for batch in batches:
+            fetch_batch(batch)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="trends-batch") as pool:
+            # Each batch runs in a copy of the caller's context (deadline budget)
+            futures = [pool.submit(contextvars.copy_context().run, fetch_batch, batch) for batch in batches]
+            try:
+                for fut in futures:
+                    fut.result()
+            except BaseException:
+                for fut in futures:
+                    fut.cancel()
+                raise
+
+    if ANCHOR_KEYWORD in keywords and results.get(ANCHOR_KEYWORD) is None:
+        emit({ANCHOR_KEYWORD: _neutral_fallback(ANCHOR_KEYWORD, reason="batch_fetch_error")})
+
+    return results
+
+
+def anchor_reference() -> Optional[float]:
+    """
+    The anchor keyword's average interest fetched on its own: the common
+    scale every batched and single-keyword result is rescaled onto. Cached
+    for as long as a signal; None if it can't be fetched.
+    """
+    reference = cache_manager.get(_REFERENCE_KEY)
+    if isinstance(reference, float):
+        return reference
+    with _REFERENCE_LOCK:
+        reference = cache_manager.get(_REFERENCE_KEY)
+        if isinstance(reference, float):
+            return reference
         try:
-            result = fut.result(timeout=30)
-            # store in cache
-            with _CACHE_LOCK:
-                _CACHE[keyword] = (time.time() + _CACHE_TTL, result)
-            return result
-        except concurrent.futures.TimeoutError:
-            print(f"[TRENDS] Timeout fetching live data for '{keyword}'")
-        except req_exceptions.HTTPError as e:
-            print(f"[TRENDS] HTTP error fetching '{keyword}': {e}")
+            reference = _average(_fetch_live_series([ANCHOR_KEYWORD])[ANCHOR_KEYWORD])
         except Exception as e:
-            print(f"[TRENDS] Unexpected error fetching '{keyword}': {e}")
+            print(f"[TRENDS] Could not fetch the anchor reference: {e}")
+            return None
+        if reference <= 0:
+            print(f"[TRENDS] Anchor '{ANCHOR_KEYWORD}' has no interest; no common scale")
+            return None
+        cache_manager.set(_REFERENCE_KEY, reference, ttl=_CACHE_TTL)
+        return reference
 
-    return _neutral_fallback(keyword, reason="all_retries_exhausted_or_error")
+
+def rescale_factor(anchor_values: list, reference: Optional[float]) -> float:
+    """Multiplier that puts one request's values on the reference scale (1.0 without a reference)."""
+    anchor_avg = _average(anchor_values)
+    if reference is None or anchor_avg <= 0:
+        return 1.0
+    return reference / anchor_avg
 
 
-def _fetch_live(keyword: str) -> dict:
+def _average(values: list) -> float:
+    return float(sum(values)) / len(values) if values else 0.0
+
+
+def _fetch_live(keyword: str) -> GoogleSignal:
     """
-    Core fetcher: creates a session, gets a token from /explore,
-    then fetches interest-over-time data from /widgetdata/multiline.
+    Core fetcher: gets a token from /explore, then fetches
+    interest-over-time data from /widgetdata/multiline.
+    The keyword is compared against the anchor and rescaled onto
+    anchor_reference(), exactly like a batch.
     """
-    # Use the global session configured with retries
-    session = _SESSION
-    session.headers.update(_HEADERS)
+    if keyword == ANCHOR_KEYWORD:
+        # On its own the anchor is already on the reference scale
+        return _summarize(keyword, _fetch_live_series([keyword])[keyword])
+    reference = anchor_reference()
+    series = _fetch_live_series([ANCHOR_KEYWORD, keyword])
+    scale = rescale_factor(series[ANCHOR_KEYWORD], reference)
+    return _summarize(keyword, [v * scale for v in series[keyword]])
 
-    # Step 0: Visit the trends page to pick up initial cookies (NID, etc.)
-    # Do not sleep here — the session has retry/backoff configured
-    session.get(f"{_BASE_URL}/explore", timeout=15)
-    # Step 1: Call /explore to get the TIMESERIES widget token
+
+def _fetch_live_series(keywords: list[str]) -> dict:
+    """
+    Fetches the interest-over-time series for up to BATCH_MAX_TERMS keywords
+    in one explore + multiline round-trip, on a session of its own from the pool.
+    Returns {keyword: [values...]}; values are on a shared 0-100 scale.
+    """
+    # The session is primed (if due) once the breaker has let the call
+    # through, so a half-open probe goes out with fresh cookies and an open
+    # circuit sends no priming requests either
+    with _guarded(), _SESSIONS.checkout(timeout=deadline.remaining(GOOGLE_CONCURRENCY_WAIT_SECONDS)) as session:
+        # Step 1: Call /explore to get the TIMESERIES widget token
+        explore_data = _get_json(session, _EXPLORE_URL, _explore_params(keywords))
+
+        # Step 2: Fetch the actual interest-over-time data (retries handled by session)
+        multiline_data = _get_json(session, _MULTILINE_URL, _multiline_params(explore_data))
+
+    return _parse_series(multiline_data, keywords)
+
+
+# ─────────────────────────────────────────────
+# Circuit breaker + adaptive concurrency
+# ─────────────────────────────────────────────
+
+@contextmanager
+def _guarded():
+    """One Google round-trip: waits for a concurrency slot (within the deadline budget), then asks the breaker."""
+    if not _LIMITER.acquire(timeout=deadline.remaining(GOOGLE_CONCURRENCY_WAIT_SECONDS)):
+        raise TimeoutError("No free Google concurrency slot")
+    _start_call()
+    try:
+        yield
+    except BaseException as e:
+        _finish_call(e)
+        raise
+    _finish_call(None)
+
+
+def _start_call():
+    """Breaker check for a caller already holding a limiter slot."""
+    if not _BREAKER.allow():
+        _LIMITER.release("skipped")
+        raise CircuitOpenError("Google Trends circuit is open")
+
+
+def _finish_call(error: Optional[BaseException]):
+    """Feeds one round-trip's outcome to the breaker and the limiter, and frees the slot."""
+    throttled = getattr(getattr(error, "response", None), "status_code", None) == 429
+    if error is None:
+        _BREAKER.record_success()
+    else:
+        _BREAKER.record_failure()
+    _LIMITER.release("throttled" if throttled else "ok")
+
+
+def client_status() -> dict:
+    """Breaker state, concurrency limit and session pool, for /api/health."""
+    return {
+        "circuit": _BREAKER.status(),
+        "concurrency_limit": _LIMITER.limit,
+        "inflight": _LIMITER.inflight,
+        "sessions": _SESSIONS.status(),
+    }
+
+
+Gauge("trendspire_google_circuit_open", "1 while the Google circuit breaker is open or half-open.",
+      lambda: 0 if _BREAKER.state == "closed" else 1)
+Gauge("trendspire_google_concurrency_limit", "Current adaptive limit on concurrent Google fetches.",
+      lambda: _LIMITER.limit)
+
+
+# ─────────────────────────────────────────────
+# Request/response helpers shared with the async client
+# ─────────────────────────────────────────────
+
+def _explore_params(keywords: list[str]) -> dict:
+    """Query params for /api/explore comparing the given keywords."""
     explore_payload = {
         "comparisonItem": [
             {
@@ -115,28 +542,21 @@ def _fetch_live(keyword: str) -> dict:
                 "geo": "IN",
                 "time": "today 1-m",  # last ~4 weeks
             }
+            for keyword in keywords
         ],
         "category": 0,
         "property": "",
     }
 
-    params = {
+    return {
         "hl": "en-IN",
         "tz": "-330",
         "req": json.dumps(explore_payload),
     }
 
-    resp = session.get(_EXPLORE_URL, params=params, timeout=15)
-    resp.raise_for_status()
 
-    # Google prefixes response with ")]}'\n" to prevent JSON hijacking
-    raw_text = resp.text
-    if raw_text.startswith(")]}'"):
-        raw_text = raw_text[5:]
-
-    explore_data = json.loads(raw_text)
-
-    # Find the TIMESERIES widget
+def _multiline_params(explore_data: dict) -> dict:
+    """Query params for /widgetdata/multiline, from the explore response's TIMESERIES widget."""
     token = None
     req_payload = None
     for widget in explore_data.get("widgets", []):
@@ -148,53 +568,81 @@ def _fetch_live(keyword: str) -> dict:
     if not token or not req_payload:
         raise ValueError("Could not find TIMESERIES widget token in explore response")
 
-    # Step 2: Fetch the actual interest-over-time data (retries handled by session)
-    multiline_params = {
+    return {
         "hl": "en-IN",
         "tz": "-330",
         "req": json.dumps(req_payload),
         "token": token,
     }
 
-    resp2 = session.get(_MULTILINE_URL, params=multiline_params, timeout=15)
-    resp2.raise_for_status()
 
-    raw_text2 = resp2.text
-    if raw_text2.startswith(")]}'"):
-        raw_text2 = raw_text2[5:]
-
-    multiline_data = json.loads(raw_text2)
-
-    # Parse the timeline data points
+def _parse_series(multiline_data: dict, keywords: list[str]) -> dict:
+    """
+    Splits the multiline timeline into {keyword: [values...]}. Each point
+    carries one value per comparison item, in the order they were requested.
+    """
     timeline = multiline_data.get("default", {}).get("timelineData", [])
 
     if not timeline:
         raise ValueError("Empty timeline data returned from Google")
 
-    values = [point["value"][0] for point in timeline if point.get("value")]
+    series = {keyword: [] for keyword in keywords}
+    for point in timeline:
+        values = point.get("value")
+        if not values or len(values) < len(keywords):
+            continue
+        for keyword, value in zip(keywords, values):
+            series[keyword].append(value)
+
+    return series
+
+
+def _parse_json(raw_text: str) -> dict:
+    """Decodes a Google Trends API body."""
+    # Google prefixes response with ")]}'\n" to prevent JSON hijacking
+    if raw_text.startswith(")]}'"):
+        raw_text = raw_text[5:]
+    return json.loads(raw_text)
+
+
+def _get_json(session: requests.Session, url: str, params: dict) -> dict:
+    """GET a Google Trends API endpoint and decode its JSON body."""
+    resp = session.get(url, params=params, timeout=15)
+    resp.raise_for_status()
+    return _parse_json(resp.text)
+
 
+def _summarize(keyword: str, values: list) -> GoogleSignal:
+    """Turns an interest-over-time series into the Google signal."""
     if len(values) == 0:
         raise ValueError("No values in timeline data")
 
     current = float(values[-1])             # Most recent data point
     four_week_avg = sum(values) / len(values)
 
-    # Growth % = how much the current value exceeds the average
-    # +0.001 avoids division by zero if avg is 0
-    growth_pct = ((current - four_week_avg) / (four_week_avg + 0.001)) * 100
+    # Growth % = how much the current value exceeds the average, as a plain
+    # ratio: long-tail keywords rescaled to a fraction of a point keep their
+    # real growth (an added epsilon would swamp it). No interest, no growth.
+    growth_pct = (current / four_week_avg - 1) * 100 if four_week_avg > 0 else 0.0
 
     print(f"[TRENDS] ✓ Live data for '{keyword}': current={current}, avg={four_week_avg:.1f}, growth={growth_pct:.1f}%")
-
-    return {
-        "current_interest": round(current, 1),
-        "four_week_avg": round(four_week_avg, 1),
-        "growth_pct": round(growth_pct, 1),
-        "normalized_score": round(current, 1),  # Google Trends is already 0–100
-        "source": "live",
-    }
-
-
-def _neutral_fallback(keyword: str, reason: str = "unknown") -> dict:
+    GOOGLE_RESULTS.inc("live")
+
+    # Values are on the anchor's reference scale: a keyword more popular than
+    # the anchor can go past 100. The score is capped at 100; the interest
+    # figures are reported as is, with enough decimals that long-tail
+    # keywords don't round to 0.
+    return GoogleSignal(
+        current_interest=round(current, 3),
+        four_week_avg=round(four_week_avg, 3),
+        growth_pct=round(growth_pct, 1),
+        normalized_score=round(min(current, 100.0), 1),
+        source="live",
+        fetched_at=round(time.time(), 3),
+    )
+
+
+def _neutral_fallback(keyword: str, reason: str = "unknown") -> GoogleSignal:
     """
     Returns a neutral 50-point score when the API fails.
     This keeps the scoring pipeline alive — a fallback Google score
@@ -202,10 +650,12 @@ def _neutral_fallback(keyword: str, reason: str = "unknown") -> dict:
     The 'source' field tells you in the API response whether this was live or fallback.
     """
     print(f"[TRENDS] Using fallback for '{keyword}'. Reason: {reason}")
-    return {
-        "current_interest": 50.0,
-        "four_week_avg": 50.0,
-        "growth_pct": 0.0,
-        "normalized_score": 50.0,
-        "source": "fallback",
-    }
+    GOOGLE_RESULTS.inc("fallback")
+    return GoogleSignal(
+        current_interest=50.0,
+        four_week_avg=50.0,
+        growth_pct=0.0,
+        normalized_score=50.0,
+        source="fallback",
+        fetched_at=round(time.time(), 3),
+    )
@@ -0,0 +1,27 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+import fake_trends
+
+# Google is the local stand-in for every test; set before config is imported
+_SERVER, FAKE, _URL = fake_trends.serve()
+os.environ["TRENDS_BASE_URL"] = _URL
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("HISTORY_DIR", tempfile.mkdtemp(prefix="trendspire-history-"))
+
+
+@pytest.fixture
+def fake():
+    """The fake Trends server, with default settings restored after the test."""
+    yield FAKE
+    FAKE.latency_ms = 0
+    FAKE.rate_429 = 0
@@ -0,0 +1,99 @@
+# tests/test_app.py
+
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
+
+import pytest
+
+import app
+
+
+class _InlineExecutor:
+    """Runs each task on submit, so the returned future is already done."""
+
+    def submit(self, fn, *args):
+        fut = Future()
+        fut.set_result(fn(*args))
+        return fut
+
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    monkeypatch.setattr(app, "_EXECUTOR", _InlineExecutor())
+    monkeypatch.setattr(app, "_run_analysis", lambda keyword: f"analysis of {keyword}")
+
+
+def _call_with_timeout(fn, *args, timeout=5):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn(*args)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"{fn.__name__} hung"
+    return result[0]
+
+
+def test_submit_analysis_with_future_done_before_callback(inline_pool, monkeypatch):
+    monkeypatch.setattr(app.trends_service, "is_cached", lambda keyword: True)
+
+    fut = _call_with_timeout(app.submit_analysis, "kw done early")
+
+    assert fut.result() == "analysis of kw done early"
+    assert "kw done early" not in app._INFLIGHT
+
+
+def test_cold_slot_released_when_future_done_before_callback(inline_pool, monkeypatch):
+    monkeypatch.setattr(app.trends_service, "is_cached", lambda keyword: False)
+    before = app._COLD_FETCHES.inflight
+
+    admitted, holds_slot = app.admit_analysis("kw cold", "request")
+    assert (admitted, holds_slot) == (True, True)
+    app.release_cold_fetch()
+
+    fut = _call_with_timeout(app.submit_analysis, "kw cold")
+
+    assert fut.result() == "analysis of kw cold"
+    assert app._COLD_FETCHES.inflight == before
+    assert "kw cold" not in app._INFLIGHT
+
+
+def test_submit_analysis_sheds_when_cold_slots_are_taken(inline_pool, monkeypatch):
+    monkeypatch.setattr(app.trends_service, "is_cached", lambda keyword: False)
+    monkeypatch.setattr(app, "_COLD_FETCHES", app.PriorityLimiter({"request": 1, "background": 0}))
+    assert app._COLD_FETCHES.try_acquire("request")
+
+    assert app.submit_analysis("kw shed") is None
+    assert app.admit_analysis("kw shed", "background") == (False, False)
+
+    app.release_cold_fetch()
+    assert app.submit_analysis("kw shed").result() == "analysis of kw shed"
+    assert app._COLD_FETCHES.inflight == 0
+
+
+def test_cold_summary_waits_for_prefetched_keywords_instead_of_shedding(fake):
+    app.cache_manager.clear()
+
+    payload = app.app.test_client().get("/api/trends/summary").get_json()
+
+    assert payload["pending"] == 0
+    assert payload["status"] == "ok"
+    assert app._COLD_FETCHES.inflight == 0
+
+
+def test_rescore_keeps_the_entry_expiry(monkeypatch):
+    keyword = app.config.KEYWORDS[9]
+    key = f"analysis:{keyword}"
+    google = app.trends_service._neutral_fallback(keyword)
+    analysis = app.build_analysis(keyword, google, app.marketplace_service.get_marketplace_signal(keyword),
+                                  app.pinterest_service.get_pinterest_signal(keyword))
+    outdated = replace(analysis, inputs=replace(analysis.inputs, scoring="outdated"))
+    monkeypatch.setattr(app.scheduler, "is_running", lambda: True)
+    app.cache_manager.set(key, outdated, ttl=-10, stale_ttl=60)
+    _, expires_at, stale_until = app.cache_manager._backend._store[key]
+
+    rescored = app.get_cached_analysis(keyword)
+
+    assert rescored.inputs.scoring == app.scoring_engine.VERSION
+    value, *times = app.cache_manager._backend._store[key]
+    assert value.inputs.scoring == app.scoring_engine.VERSION
+    assert times == [expires_at, stale_until]
@@ -0,0 +1,154 @@
+# tests/test_asgi.py
+
+import asyncio
+import json
+import math
+import threading
+import time
+
+import app as wsgi
+import asgi
+import config
+from cache import cache_manager
+from services import history_store, trends_async, trends_service
+
+
+def _run(coro):
+    async def run():
+        try:
+            return await coro
+        finally:
+            # Let analyses that outlived the request finish (and release
+            # their locks) before the loop goes away
+            if asgi._inflight:
+                await asyncio.wait(list(asgi._inflight.values()))
+            await trends_async.aclose()
+    return asyncio.run(run())
+
+
+def _wait_for_prefetch(timeout=10):
+    until = time.monotonic() + timeout
+    while trends_service._PENDING and time.monotonic() < until:
+        time.sleep(0.05)
+    assert not trends_service._PENDING
+
+
+def test_summary_batches_cold_google_fetches(fake):
+    cache_manager.clear()
+    calls = fake.counts["multiline"]
+
+    status, _headers, body = _run(asgi.summary({}, {}))
+    _wait_for_prefetch()
+
+    assert status == 200
+    assert json.loads(body)
+    # Keywords shed by cold-fetch admission still got their Google data
+    assert all(trends_service.is_cached(keyword) for keyword in config.KEYWORDS)
+    # One request per batch of BATCH_MAX_TERMS - 1 keywords (plus the anchor),
+    # and one for the anchor reference; no single-keyword fetches
+    batches = math.ceil(len(config.KEYWORDS) / (trends_service.BATCH_MAX_TERMS - 1))
+    assert fake.counts["multiline"] - calls <= batches + 1
+
+
+def test_compute_analysis_keeps_blocking_calls_off_the_loop(fake, monkeypatch):
+    keyword = config.KEYWORDS[3]
+    threads = {}
+
+    def on_thread(name, fn):
+        def wrapper(*args, **kwargs):
+            threads.setdefault(name, set()).add(threading.get_ident())
+            return fn(*args, **kwargs)
+        return wrapper
+
+    for name in ("get", "set", "acquire_lock", "release_lock"):
+        monkeypatch.setattr(cache_manager, name, on_thread(name, getattr(cache_manager, name)))
+    monkeypatch.setattr(history_store, "record", on_thread("record", history_store.record))
+
+    async def compute():
+        threads["loop"] = {threading.get_ident()}
+        return await asgi._load_analysis(keyword)
+
+    result = _run(compute())
+
+    assert result.keyword == keyword
+    # Released by the thread that took it (backends check the owner)
+    assert not cache_manager.locked(f"analysis:{keyword}")
+    loop = threads.pop("loop")
+    assert {"set", "acquire_lock", "release_lock", "record"} <= threads.keys()
+    for name, idents in threads.items():
+        assert not idents & loop, f"cache_manager.{name} ran on the event loop"
+
+
+def test_admission_and_summary_encoding_run_off_the_loop(fake, monkeypatch):
+    threads = {}
+
+    def on_thread(name, fn):
+        def wrapper(*args, **kwargs):
+            threads.setdefault(name, set()).add(threading.get_ident())
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(trends_service, "is_cached", on_thread("is_cached", trends_service.is_cached))
+    monkeypatch.setattr(wsgi, "summary_snapshot", on_thread("summary_snapshot", wsgi.summary_snapshot))
+    monkeypatch.setattr(asgi.scheduler, "is_running", lambda: False)
+    cache_manager.clear()
+
+    async def summary():
+        threads["loop"] = {threading.get_ident()}
+        return await asgi.summary({}, {})
+
+    status, _headers, _body = _run(summary())
+    _wait_for_prefetch()
+
+    assert status == 200
+    loop = threads.pop("loop")
+    assert {"is_cached", "summary_snapshot"} <= threads.keys()
+    for name, idents in threads.items():
+        assert not idents & loop, f"{name} ran on the event loop"
+
+
+def test_async_locks_are_released_from_many_keys_at_once():
+    keys = [f"async-lock:{i}" for i in range(64)]
+
+    async def cycle(key):
+        assert await trends_async.acquire_lock(key, ttl=30)
+        await asyncio.sleep(0)
+        await trends_async.release_lock(key)
+
+    async def run():
+        await asyncio.gather(*(cycle(key) for key in keys))
+
+    _run(run())
+
+    assert not any(cache_manager.locked(key) for key in keys)
+    assert len({trends_async._lock_executor(key) for key in keys}) > 1
+
+
+def _post(body: bytes, content_type: bytes):
+    keyword = config.KEYWORDS[0]
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/trends/detail/batch",
+        "query_string": f"keyword={keyword}".encode(), "headers": [(b"content-type", content_type)],
+    }
+    _run(asgi.app(scope, receive, send))
+    return sent[0]["status"]
+
+
+def test_batch_post_ignores_a_body_flask_would_ignore(fake):
+    client = wsgi.app.test_client()
+    keyword = config.KEYWORDS[0]
+
+    for body, content_type in ((b"not json", b"text/plain"), (b"{broken", b"application/json")):
+        flask = client.post(f"/api/trends/detail/batch?keyword={keyword}", data=body,
+                            content_type=content_type.decode()).status_code
+        assert _post(body, content_type) == flask == 200
+
+    assert _post(b'{"keywords": "one"}', b"application/json") == 400
@@ -0,0 +1,104 @@
+# tests/test_bulk_score.py
+
+import csv
+import json
+
+import pytest
+
+import config
+from cache import cache_manager
+from services import bulk_score, trends_service
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+KEYWORDS = config.KEYWORDS[:50]
+
+
+@pytest.fixture
+def keywords_file(tmp_path):
+    path = tmp_path / "keywords.txt"
+    path.write_text("\n".join(KEYWORDS) + "\n")
+    return str(path)
+
+
+def _run(keywords_file, out, **kwargs):
+    return bulk_score.run(keywords_file, str(out), chunk_size=8, workers=1, google_workers=1,
+                          offline=True, **kwargs)
+
+
+def _rows(path):
+    with open(path, newline="") as f:
+        # generated_at differs between runs
+        return [row[:-1] for row in csv.reader(f)]
+
+
+def _interrupt_at(monkeypatch, keyword):
+    google_signals = bulk_score.google_signals
+
+    def failing(keywords, reference, offline):
+        if keyword in keywords:
+            raise KeyboardInterrupt
+        return google_signals(keywords, reference, offline)
+
+    monkeypatch.setattr(bulk_score, "google_signals", failing)
+
+
+def test_resume_continues_an_interrupted_run(keywords_file, tmp_path, monkeypatch):
+    _run(keywords_file, tmp_path / "full.csv")
+    out = tmp_path / "scores.csv"
+
+    _interrupt_at(monkeypatch, KEYWORDS[30])
+    with pytest.raises(KeyboardInterrupt):
+        _run(keywords_file, out)
+    with open(bulk_score.checkpoint_path(str(out))) as f:
+        state = json.load(f)
+    assert 0 < state["done"] <= 24 and state["done"] % 8 == 0
+
+    # Half a chunk written after the checkpoint is cut away
+    with open(out, "ab") as f:
+        f.write(b"unfinished,row\r\n")
+    monkeypatch.undo()
+    totals = _run(keywords_file, out, resume=True)
+
+    assert totals["keywords"] == len(KEYWORDS)
+    assert sum(totals["google"].values()) == len(KEYWORDS)
+    assert _rows(out) == _rows(tmp_path / "full.csv")
+    assert [row[0] for row in _rows(out)[1:]] == KEYWORDS
+
+
+def test_resume_refuses_another_runs_checkpoint(keywords_file, tmp_path, monkeypatch):
+    out = tmp_path / "scores.csv"
+    _interrupt_at(monkeypatch, KEYWORDS[0])
+    with pytest.raises(KeyboardInterrupt):
+        _run(keywords_file, out)
+
+    other = tmp_path / "other.txt"
+    other.write_text("linen shirt\n")
+    with pytest.raises(ValueError):
+        bulk_score.run(str(other), str(out), offline=True, resume=True)
+
+
+def test_run_stops_when_the_google_circuit_opens(keywords_file, tmp_path, monkeypatch, fake):
+    breaker = CircuitBreaker(1, reset_timeout=60)
+    monkeypatch.setattr(trends_service, "_BREAKER", breaker)
+    for keyword in KEYWORDS:
+        cache_manager.delete(trends_service._cache_key(keyword))
+
+    def fetch(keywords, on_result=None, reference=None, workers=None):
+        # Google goes down from the chunk holding KEYWORDS[20] on
+        if KEYWORDS[20] in keywords:
+            breaker.record_failure()
+        if breaker.is_open():
+            return {k: trends_service._neutral_fallback(k, reason="circuit_open") for k in keywords}
+        return {k: trends_service._summarize(k, [40, 50]) for k in keywords}
+
+    monkeypatch.setattr(trends_service, "fetch_google_trends_batch", fetch)
+    out = tmp_path / "scores.csv"
+
+    with pytest.raises(CircuitOpenError):
+        bulk_score.run(keywords_file, str(out), chunk_size=8, workers=1, google_workers=1)
+
+    with open(bulk_score.checkpoint_path(str(out))) as f:
+        state = json.load(f)
+    assert state["done"] == 16
+    assert state["sources"] == {"live": 16}
+    assert {row[7] for row in _rows(out)[1:]} == {"live"}
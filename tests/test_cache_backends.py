@@ -0,0 +1,110 @@
+# tests/test_cache_backends.py
+
+import time
+
+import pytest
+
+from cache import backends, cache_manager
+from cache.backends import SQLiteBackend
+
+
+def _sqlite(tmp_path, max_entries=10):
+    return SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entries=max_entries)
+
+
+def _accessed_at(backend, key):
+    return backend._conn().execute("SELECT accessed_at FROM cache WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_sqlite_hits_are_read_only_within_the_touch_window(tmp_path):
+    backend = _sqlite(tmp_path)
+    now = time.time()
+    backend.set("k", "v", expires_at=now + 60, stale_until=now + 120)
+    writes = backend._conn().total_changes
+
+    for _ in range(5):
+        assert backend.get_entry("k") == ("v", True)
+
+    assert backend._conn().total_changes == writes
+
+
+def test_sqlite_hit_touches_an_entry_past_the_touch_window(tmp_path, monkeypatch):
+    backend = _sqlite(tmp_path)
+    now = time.time()
+    backend.set("k", "v", expires_at=now + 600, stale_until=now + 1200)
+    later = now + backends.ACCESS_TOUCH_SECONDS + 1
+    monkeypatch.setattr(backends.time, "time", lambda: later)
+
+    assert backend.get("k") == "v"
+    assert _accessed_at(backend, "k") == later
+
+
+def test_sqlite_evicts_the_least_recently_touched_entry(tmp_path, monkeypatch):
+    backend = _sqlite(tmp_path, max_entries=2)
+    now = time.time()
+    backend.set("old", 1, expires_at=now + 600, stale_until=now + 1200)
+    backend.set("new", 2, expires_at=now + 600, stale_until=now + 1200)
+    monkeypatch.setattr(backends.time, "time", lambda: now + backends.ACCESS_TOUCH_SECONDS + 1)
+
+    assert backend.get("old") == 1
+    backend.set("third", 3, expires_at=now + 600, stale_until=now + 1200)
+
+    assert backend.get("old") == 1
+    assert backend.get("new") is None
+    assert backend.evictions == 1
+
+
+def test_replace_value_keeps_expiry_and_stale_window(tmp_path):
+    now = time.time()
+    for backend in (_sqlite(tmp_path), backends.MemoryBackend(10)):
+        backend.set("k", "old", expires_at=now - 5, stale_until=now + 60)
+
+        assert backend.replace_value("k", "new")
+        assert backend.get_entry("k") == ("new", False)
+        assert backend.expires_in("k") == pytest.approx(-5, abs=1)
+        assert not backend.replace_value("missing", "new")
+
+
+def test_sqlite_row_count_follows_every_write(tmp_path):
+    now = time.time()
+    backend = _sqlite(tmp_path, max_entries=5)
+    for i in range(8):
+        backend.set(f"k{i}", i, expires_at=now + 60, stale_until=now + 120)
+    backend.set("k7", "again", expires_at=now + 60, stale_until=now + 120)
+    backend.delete("k7")
+    backend.set("gone", 0, expires_at=now - 10, stale_until=now - 5)
+    backend.sweep()
+
+    counted = backend._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert backend.size() == counted == 4
+    assert backend.evictions == 3
+
+    # Another worker opening the same file shares the count
+    assert _sqlite(tmp_path, max_entries=5).size() == 4
+    backend.clear()
+    assert backend.size() == 0
+
+
+def test_sqlite_count_is_seeded_from_an_existing_table(tmp_path):
+    now = time.time()
+    backend = _sqlite(tmp_path)
+    backend.set("a", 1, expires_at=now + 60, stale_until=now + 120)
+    backend.set("b", 2, expires_at=now + 60, stale_until=now + 120)
+    conn = backend._conn()
+    conn.execute("DROP TABLE cache_size")
+    conn.execute("DROP TRIGGER cache_inserted")
+    conn.execute("DROP TRIGGER cache_deleted")
+
+    assert _sqlite(tmp_path).size() == 2
+
+
+def test_wait_for_counts_one_lookup():
+    cache_manager.set("waited", "value")
+    before = cache_manager.stats()
+    assert cache_manager.acquire_lock("waited-late", ttl=0.5)
+    assert cache_manager.wait_for("waited-late", timeout=2, poll_interval=0.05) is None
+    assert cache_manager.wait_for("waited", timeout=2) == "value"
+    cache_manager.release_lock("waited-late")
+    after = cache_manager.stats()
+
+    assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 1)
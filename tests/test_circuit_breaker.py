@@ -0,0 +1,114 @@
+# tests/test_circuit_breaker.py
+
+import types
+
+import pytest
+
+from services import trends_service
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.rate_limiter import AdaptiveLimiter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures_only(clock):
+    breaker = CircuitBreaker(3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.is_open()
+    assert not breaker.allow()
+    assert breaker.status()["retry_in_seconds"] == 10
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(2, reset_timeout=10)
+    _open(breaker)
+
+    clock.now += 9.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert not breaker.is_open()
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_doubles_the_timeout_up_to_the_cap(clock):
+    breaker = CircuitBreaker(1, reset_timeout=10, max_reset_timeout=30)
+    _open(breaker)
+
+    for expected in (20, 30, 30):
+        clock.now += breaker.reset_timeout
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.reset_timeout == expected
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.reset_timeout == 10
+    assert breaker.status()["times_opened"] == 4
+
+
+class _Throttled(Exception):
+    response = types.SimpleNamespace(status_code=429)
+
+
+def test_google_calls_feed_the_breaker_and_the_limiter(clock, monkeypatch):
+    breaker, limiter = CircuitBreaker(3, reset_timeout=10), AdaptiveLimiter(8, cooldown=0)
+    monkeypatch.setattr(trends_service, "_BREAKER", breaker)
+    monkeypatch.setattr(trends_service, "_LIMITER", limiter)
+
+    for _ in range(3):
+        with pytest.raises(_Throttled):
+            with trends_service._guarded():
+                raise _Throttled()
+    assert breaker.state == "open"
+    assert limiter.limit == 1
+
+    # Refused calls give their slot back without touching the limit
+    with pytest.raises(CircuitOpenError):
+        with trends_service._guarded():
+            pass
+    assert (limiter.inflight, limiter.limit) == (0, 1)
+
+    clock.now += 10
+    with trends_service._guarded():
+        pass
+    assert breaker.state == "closed"
+    assert limiter.limit == 2
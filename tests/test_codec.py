@@ -0,0 +1,79 @@
+# tests/test_codec.py
+
+import copy
+import json
+
+import pytest
+
+from cache import codec
+from cache.backends import SQLiteBackend
+from services.records import (
+    Analysis, AnalysisInputs, GoogleSignal, MarketplaceSignal, PinterestSignal,
+)
+
+
+def _analysis(**changes) -> Analysis:
+    fields = dict(
+        keyword="oversized linen shirt",
+        trend_score=71.35,
+        classification="Accelerating",
+        recommendation="Increase stock",
+        adjustment_pct=20,
+        explanation="Search interest is up 0.1% on a 1e-7 base",
+        google=GoogleSignal(42.125, 1e-7, -3.5, 0.1, "live", fetched_at=1760659200.123456),
+        marketplace=MarketplaceSignal(12, 30, 0.6, 14.2, 88.0),
+        pinterest=PinterestSignal(15200, 8.75, 340, 2.5, 64.3),
+        inputs=AnalysisInputs(1760659200.123456, "3f2a", None, "v2"),
+        generated_at="2026-10-17T00:00:00.000001",
+    )
+    fields.update(changes)
+    return Analysis(**fields)
+
+
+@pytest.mark.parametrize("value", [
+    _analysis(),
+    _analysis(cached=True, google=GoogleSignal(50.0, 50.0, 0.0, 50.0, "neutral")),
+    GoogleSignal(0, 0, 0, 0, "stale"),
+    {"batch": [_analysis(), None], "reference": 12.5},
+    ["plain", 1, 2.5, None, True, {"nested": {"list": []}}],
+])
+def test_round_trip_is_lossless(value):
+    text = codec.dumps(value)
+
+    assert codec.loads(text) == value
+    # Re-encoding the decoded value gives the same text
+    assert codec.dumps(codec.loads(text)) == text
+
+
+def test_records_come_back_as_records():
+    restored = codec.loads(codec.dumps(_analysis()))
+
+    assert type(restored) is Analysis
+    assert type(restored.google) is GoogleSignal and type(restored.inputs) is AnalysisInputs
+    assert restored.to_detail() == _analysis().to_detail()
+    assert json.loads(codec.dumps(_analysis().google))["__record__"] == "GoogleSignal"
+
+
+def test_unregistered_objects_are_refused():
+    class GoogleSignal:
+        __slots__ = ("source",)
+
+    with pytest.raises(TypeError):
+        codec.dumps({"value": object()})
+    # Same name as a registered record, different class
+    with pytest.raises(TypeError):
+        codec.dumps(GoogleSignal())
+
+
+def test_records_are_shared_not_copied():
+    analysis = _analysis()
+
+    assert copy.copy(analysis) is analysis
+    assert copy.deepcopy({"a": analysis})["a"] is analysis
+
+
+def test_sqlite_backend_round_trips_records(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entries=10)
+    backend.set("analysis:k", _analysis(), expires_at=2e9, stale_until=2e9)
+
+    assert backend.get("analysis:k") == _analysis()
@@ -0,0 +1,34 @@
+# tests/test_data_sources.py
+
+import time
+
+from services import data_sources
+
+
+def test_stop_ends_the_watcher_and_a_new_start_runs_again(monkeypatch):
+    checks = []
+    monkeypatch.setattr(data_sources, "check_all", lambda: checks.append(time.monotonic()))
+    running = data_sources._watcher
+    if running is not None:
+        # The app's own watcher (started with a 30s interval) ends mid-wait too
+        data_sources.stop()
+        running.join(timeout=1)
+        assert not running.is_alive()
+
+    data_sources.start_watcher(0.02)
+    first = data_sources._watcher
+    time.sleep(0.1)
+    data_sources.stop()
+    first.join(timeout=1)
+
+    assert checks
+    assert not first.is_alive()
+
+    data_sources.start_watcher(0.02)
+    second = data_sources._watcher
+    try:
+        assert second is not first and second.is_alive()
+    finally:
+        data_sources.stop()
+        second.join(timeout=1)
+    assert not second.is_alive()
@@ -0,0 +1,86 @@
+# tests/test_history_store.py
+
+import fcntl
+import os
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+
+import app
+import config
+from services import history_store
+from services.analysis import build_analysis, degraded_analysis
+
+
+@pytest.fixture(autouse=True)
+def history_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "HISTORY_DIR", str(tmp_path))
+
+
+def _points(keyword):
+    return history_store.query(keyword, 0, time.time() + 3600)
+
+
+def _later(analysis, seconds):
+    at = datetime.now(timezone.utc).timestamp() + seconds
+    return replace(analysis, generated_at=datetime.fromtimestamp(at, tz=timezone.utc).isoformat())
+
+
+def test_fallback_analyses_are_not_recorded(fake):
+    keyword = config.KEYWORDS[30]
+
+    history_store.record(degraded_analysis(keyword, reason="deadline"))
+
+    assert len(_points(keyword)) == 0
+
+
+def test_repeat_of_the_last_point_is_not_recorded(fake):
+    keyword = config.KEYWORDS[31]
+    analysis = app._compute_analysis(keyword)
+
+    history_store.record(analysis)
+    # A scheduler pass that reused the same Google fetch
+    history_store.record(_later(analysis, 60))
+
+    points = _points(keyword)
+    assert len(points) == 1
+    assert points["fetched_at"][0] == int(analysis.google.fetched_at)
+
+
+def test_new_google_fetch_or_score_is_recorded(fake):
+    keyword = config.KEYWORDS[32]
+    analysis = app._compute_analysis(keyword)
+    refetched = replace(analysis.google, fetched_at=analysis.google.fetched_at + 60)
+    # Same Google fetch as the point before it, different marketplace data
+    rescored = build_analysis(keyword, refetched, replace(analysis.marketplace, normalized_score=1.0),
+                              analysis.pinterest)
+
+    history_store.record(analysis)
+    history_store.record(_later(replace(analysis, google=refetched), 60))
+    history_store.record(_later(rescored, 120))
+
+    assert len(_points(keyword)) == 3
+
+
+def test_query_waits_for_a_compaction_in_progress(fake):
+    keyword = config.KEYWORDS[33]
+    history_store.record(app._compute_analysis(keyword))
+    raw_path, _ = history_store._paths(keyword)
+    results = []
+
+    fd = os.open(raw_path, os.O_WRONLY)
+    try:
+        # Holds the .raw flock the way an append/compaction does
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        reader = threading.Thread(target=lambda: results.append(_points(keyword)))
+        reader.start()
+        reader.join(timeout=0.2)
+        assert reader.is_alive() and not results
+    finally:
+        os.close(fd)
+    reader.join(timeout=5)
+
+    assert len(results) == 1 and len(results[0]) == 1
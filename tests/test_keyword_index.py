@@ -0,0 +1,93 @@
+# tests/test_keyword_index.py
+
+import random
+
+import pytest
+
+import config
+from services.keyword_index import MIN_FUZZY_SCORE, KeywordIndex, _grams, normalize
+
+INDEX = KeywordIndex(config.KEYWORDS)
+
+
+def _brute_fuzzy(index, norm, limit):
+    """Exact Jaccard over every keyword, ranked the way KeywordIndex.fuzzy ranks."""
+    grams = _grams(norm)
+    scored = []
+    for i, other in enumerate(index.norms):
+        theirs = _grams(other)
+        shared = len(grams & theirs)
+        if not shared:
+            continue
+        score = shared / len(grams | theirs)
+        contains = " " + norm in " " + other
+        if contains or score >= MIN_FUZZY_SCORE:
+            scored.append((i, score, contains))
+    scored.sort(key=lambda item: (not item[2], -item[1], index.norms[item[0]]))
+    return scored[:limit]
+
+
+def _typo(text, rng):
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice("aeiourstn") + text[i + 1:]
+
+
+def test_lookup_ignores_case_and_spacing():
+    keyword = config.KEYWORDS[0]
+
+    assert INDEX.lookup("  " + keyword.upper().replace(" ", "   ") + " ") == keyword
+    assert INDEX.lookup(keyword + " extra") is None
+    assert normalize("Ｃａｒｇｏ\tPANTS") == "cargo pants"
+
+
+def test_prefix_matches_a_scan_shortest_first():
+    for text in ("cargo", "lin", "men ", config.KEYWORDS[7][:4]):
+        norm = normalize(text)
+        matching = sorted(n for n in INDEX.norms if n.startswith(norm))
+        got = [INDEX.norms[i] for i in INDEX.prefix(norm, 5)]
+
+        assert len(got) == min(5, len(matching))
+        assert all(n.startswith(norm) for n in got)
+        assert got == sorted(got, key=lambda n: (len(n), n))
+        # Shortest of all matches while they fit the look-ahead window
+        if len(matching) <= 5 * 4:
+            assert got == sorted(matching, key=lambda n: (len(n), n))[:5]
+
+
+def test_fuzzy_matches_exact_jaccard_ranking():
+    rng = random.Random(3)
+    queries = [_typo(normalize(k), rng) for k in rng.sample(config.KEYWORDS, 30)] + ["cargo pan", "shrt", "linen"]
+
+    for query in queries:
+        got = INDEX.fuzzy(query, 5)
+        expected = _brute_fuzzy(INDEX, query, 5)
+        assert [(INDEX.norms[i], round(s, 6), c) for i, s, c in got] == \
+            [(INDEX.norms[i], round(s, 6), c) for i, s, c in expected], query
+
+
+def test_fuzzy_finds_a_typo_in_a_large_index():
+    rng = random.Random(5)
+    words = ["cargo", "linen", "oversized", "pleated", "denim", "shirt", "pants", "men", "women",
+             "korean", "vintage", "wide", "leg", "cropped", "jacket", "summer", "black", "white"]
+    keywords = sorted({" ".join(rng.sample(words, rng.randint(2, 5))) for _ in range(60_000)})
+    index = KeywordIndex(keywords)
+
+    # Past the candidate budget the common trigrams are skipped, but the
+    # best match must still get its exact similarity
+    for target in rng.sample(keywords, 8):
+        query = _typo(target, rng)
+        best = index.fuzzy(query, 3)[0]
+        assert best[1] == pytest.approx(_brute_fuzzy(index, query, 1)[0][1]), query
+
+
+def test_search_ranks_exact_then_prefix_then_fuzzy():
+    keyword = config.KEYWORDS[0]
+
+    results = INDEX.search(keyword.upper(), 5)
+    assert results[0] == {"keyword": keyword, "match": "exact", "score": 1.0}
+    assert len({r["keyword"] for r in results}) == len(results)
+
+    matches = [r["match"] for r in INDEX.search(keyword.split()[0], 10)]
+    order = {"exact": 0, "prefix": 1, "contains": 2, "fuzzy": 3}
+    assert matches == sorted(matches, key=order.get)
+    assert INDEX.search("   ") == []
@@ -0,0 +1,37 @@
+# tests/test_metrics.py
+
+import pytest
+from urllib3.exceptions import MaxRetryError
+from urllib3.response import HTTPResponse
+
+from cache import cache_manager
+from services import trends_service
+from utils import metrics
+from utils.metrics import GOOGLE_HTTP_RETRIES
+
+
+def _retries(reason) -> float:
+    return GOOGLE_HTTP_RETRIES._values.get((reason,), 0)
+
+
+def test_the_exhausting_attempt_is_not_counted_as_a_retry():
+    retry = trends_service._CountingRetry(total=2, backoff_factor=0, status_forcelist=[503])
+    before = _retries("503")
+
+    # Three attempts fail: two are retried, the third gives up
+    for _ in range(2):
+        retry = retry.increment("GET", "/trends", response=HTTPResponse(status=503))
+    with pytest.raises(MaxRetryError):
+        retry.increment("GET", "/trends", response=HTTPResponse(status=503))
+
+    assert _retries("503") - before == 2
+
+
+def test_cache_totals_are_exported_as_counters():
+    cache_manager.get("never cached")
+    text = metrics.render()
+
+    assert "# TYPE trendspire_cache_lookups_total counter" in text
+    assert "# TYPE trendspire_cache_evictions_total counter" in text
+    assert 'trendspire_cache_lookups_total{result="miss"}' in text
+    assert "# TYPE trendspire_cache_entries gauge" in text
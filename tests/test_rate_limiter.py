@@ -0,0 +1,84 @@
+# tests/test_rate_limiter.py
+
+import threading
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import AdaptiveLimiter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def _call(limiter, outcome):
+    assert limiter.try_acquire()
+    limiter.release(outcome)
+
+
+def test_successes_add_about_one_slot_per_window(clock):
+    limiter = AdaptiveLimiter(4, maximum=6)
+
+    for _ in range(4):
+        _call(limiter, "ok")
+    assert limiter.limit == 4
+    _call(limiter, "ok")
+    assert limiter.limit == 5
+
+    for _ in range(50):
+        _call(limiter, "ok")
+    assert limiter.limit == 6
+
+
+def test_throttling_halves_once_per_cooldown(clock):
+    limiter = AdaptiveLimiter(8, minimum=1, cooldown=1.0)
+
+    # A burst of 429s from calls already in flight is one signal
+    for _ in range(4):
+        _call(limiter, "throttled")
+    assert limiter.limit == 4
+
+    clock.now += 1.0
+    _call(limiter, "throttled")
+    assert limiter.limit == 2
+    for _ in range(3):
+        clock.now += 1.0
+        _call(limiter, "throttled")
+    assert limiter.limit == 1
+
+
+def test_skipped_slots_leave_the_limit_alone(clock):
+    limiter = AdaptiveLimiter(3)
+    for _ in range(10):
+        _call(limiter, "skipped")
+
+    assert limiter.limit == 3
+    assert limiter.inflight == 0
+
+
+def test_slots_are_capped_at_the_limit(clock):
+    limiter = AdaptiveLimiter(2)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert not limiter.acquire(timeout=0.01)
+
+    # A release wakes a blocked caller
+    waiter = threading.Thread(target=lambda: limiter.acquire(timeout=5))
+    waiter.start()
+    limiter.release("ok")
+    waiter.join(5)
+
+    assert not waiter.is_alive()
+    assert limiter.inflight == 2
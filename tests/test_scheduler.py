@@ -0,0 +1,71 @@
+# tests/test_scheduler.py
+
+import fcntl
+import os
+import time
+from dataclasses import replace
+
+import app
+import config
+from cache import cache_manager
+from services import scheduler, trends_service
+
+
+def test_refresh_refetches_a_google_signal_that_is_due(fake):
+    keyword = config.KEYWORDS[0]
+    fresh = trends_service.fetch_google_trends(keyword)
+    # Same signal, fetched just inside the refresh window
+    due = replace(fresh, fetched_at=time.time() - scheduler.REFRESH_MAX_AGE_SECONDS - 60)
+    cache_manager.set(trends_service._cache_key(keyword), due, ttl=config.PREWARM_LEAD_SECONDS - 60)
+    calls = fake.counts["multiline"]
+
+    result = app.refresh_analysis(keyword)
+
+    assert fake.counts["multiline"] == calls + 1
+    assert result.google.fetched_at > due.fetched_at
+    assert cache_manager.expires_in(f"analysis:{keyword}") > config.PREWARM_LEAD_SECONDS
+
+
+def test_refresh_reuses_a_signal_that_is_not_due(fake):
+    keyword = config.KEYWORDS[1]
+    fresh = trends_service.fetch_google_trends(keyword)
+    calls = fake.counts["multiline"]
+
+    result = app.refresh_analysis(keyword)
+
+    assert fake.counts["multiline"] == calls
+    assert result.google == fresh
+
+
+def _wait_until(condition, timeout=5):
+    until = time.monotonic() + timeout
+    while not condition() and time.monotonic() < until:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_only_the_lock_holder_prewarms(fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PREWARM_LOCK_PATH", str(tmp_path / "prewarm.lock"))
+    monkeypatch.setattr(config, "PREWARM_TICK_SECONDS", 0.05)
+    cache_manager.clear()
+    # Another worker on this host is the scheduler
+    other = os.open(config.PREWARM_LOCK_PATH, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(other, fcntl.LOCK_EX)
+    refreshed = []
+    scheduler.start(refreshed.append)
+    try:
+        time.sleep(0.3)
+        assert refreshed == []
+        assert scheduler.status()["role"] == "standby"
+        # Memory backend: the other worker's results don't reach this one
+        assert not scheduler.is_running()
+
+        os.close(other)  # that worker exits
+
+        assert _wait_until(lambda: scheduler.status()["role"] == "leader")
+        assert _wait_until(lambda: refreshed)
+        assert scheduler.is_running()
+    finally:
+        scheduler.stop()
+        scheduler._thread.join(5)
+    assert scheduler.status()["role"] == "standby"
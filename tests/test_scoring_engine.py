@@ -0,0 +1,74 @@
+# tests/test_scoring_engine.py
+
+import random
+from dataclasses import replace
+
+import numpy as np
+
+import config
+from services import marketplace_service, pinterest_service, scoring_engine, trends_service
+from services.analysis import build_analyses, build_analysis
+from services.records import GoogleSignal, MarketplaceSignal, PinterestSignal
+
+
+def _scalar(google, marketplace, pinterest, growth):
+    g = GoogleSignal(current_interest=google, four_week_avg=google, growth_pct=growth,
+                     normalized_score=google, source="live")
+    m = MarketplaceSignal(current_rank=1, rank_7d_ago=1, rank_velocity=0.0, sales_growth_pct=0.0,
+                          normalized_score=marketplace)
+    p = PinterestSignal(weekly_saves=0, save_growth_pct=0.0, board_count=0, board_growth_pct=0.0,
+                        normalized_score=pinterest)
+    score = scoring_engine.compute_trend_score(g, m, p)
+    classification = scoring_engine.classify(score, growth)
+    rec = scoring_engine.recommend(classification, score)
+    return score, classification, rec["action"], rec["adjustment_pct"]
+
+
+def _cases():
+    rng = random.Random(4)
+    cases = [(rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(-50, 80))
+             for _ in range(2000)]
+    # Scores on one-decimal steps (rounding ties) and growth on the thresholds
+    cases += [(rng.randint(0, 1000) / 10, rng.randint(0, 1000) / 10, rng.randint(0, 1000) / 10,
+               rng.choice([-0.1, 0.0, 4.9, 5.0, 14.9, 15.0, 15.1]))
+              for _ in range(2000)]
+    # Composite scores right at the classification and adjustment cut-offs
+    cases += [(score, score, score, growth)
+              for score in (24.9, 25.0, 34.9, 35.0, 54.9, 55.0, 69.9, 70.0, 79.9, 80.0)
+              for growth in (4.9, 5.0, 15.0)]
+    return cases
+
+
+def test_score_batch_matches_the_scalar_scorers():
+    cases = _cases()
+    google, marketplace, pinterest, growth = (list(column) for column in zip(*cases))
+
+    batch = scoring_engine.score_batch(google, marketplace, pinterest, growth)
+
+    for i, case in enumerate(cases):
+        expected = _scalar(*case)
+        got = (float(batch["trend_score"][i]), batch["classification"][i], batch["recommendation"][i],
+               int(batch["adjustment_pct"][i]))
+        assert got == expected, case
+
+
+def test_score_batch_of_nothing():
+    batch = scoring_engine.score_batch([], [], [], [])
+
+    assert all(len(values) == 0 for values in batch.values())
+    assert isinstance(batch["trend_score"], np.ndarray)
+
+
+def test_build_analyses_matches_build_analysis():
+    keywords = config.KEYWORDS
+    rng = random.Random(7)
+    google = [replace(trends_service._neutral_fallback(k), normalized_score=round(rng.uniform(0, 100), 1),
+                      growth_pct=round(rng.uniform(-40, 60), 1)) for k in keywords]
+    marketplace = [marketplace_service.get_marketplace_signal(k) for k in keywords]
+    pinterest = [pinterest_service.get_pinterest_signal(k) for k in keywords]
+
+    batch = build_analyses(keywords, google, marketplace, pinterest)
+
+    for analysis, args in zip(batch, zip(keywords, google, marketplace, pinterest)):
+        single = build_analysis(*args)
+        assert replace(analysis, generated_at="") == replace(single, generated_at="")
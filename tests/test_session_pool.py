@@ -0,0 +1,55 @@
+# tests/test_session_pool.py
+
+import pytest
+import requests
+
+from services import trends_service
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.session_pool import SessionPool
+
+
+def _pool():
+    primed = []
+    pool = SessionPool(1, requests.Session, primed.append, max_age=3600)
+    return pool, primed
+
+
+def _rejected(pool, status):
+    response = requests.Response()
+    response.status_code = status
+    with pytest.raises(requests.HTTPError):
+        with pool.checkout():
+            raise requests.HTTPError(response=response)
+
+
+def test_rejected_session_is_primed_again():
+    pool, primed = _pool()
+    _rejected(pool, 403)
+    with pool.checkout():
+        pass
+
+    assert len(primed) == 2
+
+
+def test_throttled_session_keeps_its_cookies():
+    pool, primed = _pool()
+    _rejected(pool, 429)
+    with pool.checkout():
+        pass
+
+    assert len(primed) == 1
+
+
+def test_open_circuit_sends_no_priming_requests(fake, monkeypatch):
+    breaker = CircuitBreaker(1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(trends_service, "_BREAKER", breaker)
+    pool = SessionPool(1, trends_service._new_session, trends_service._prime_session, max_age=3600)
+    monkeypatch.setattr(trends_service, "_SESSIONS", pool)
+    pages = fake.counts["explore_page"]
+
+    with pytest.raises(CircuitOpenError):
+        trends_service._fetch_live_series(["linen shirt"])
+
+    assert fake.counts["explore_page"] == pages
+    assert pool.primes == 0
@@ -0,0 +1,55 @@
+# tests/test_signal_store.py
+
+import math
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import marketplace_service, pinterest_service, signal_store
+
+AS_OF = date(2026, 3, 1)
+
+
+def _comparable(row):
+    return {k: "nan" if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()}
+
+
+@pytest.mark.parametrize("source, service", [("marketplace", marketplace_service), ("pinterest", pinterest_service)])
+def test_store_reproduces_the_csv_tables(tmp_path, source, service):
+    df = pd.read_csv(service._CSV_PATH)
+    expected = service._build_table(df)
+
+    meta = signal_store.convert_csv(source, service._CSV_PATH, str(tmp_path), AS_OF)
+    table = signal_store.load_table(str(tmp_path / "meta.json"))
+
+    assert meta["keywords"] == len(expected) == len(table)
+    for keyword in df["keyword"].unique():
+        assert _comparable(table.row(keyword, service._FIELDS)) == _comparable(expected.row(keyword, service._FIELDS))
+    # Fields are memory-mapped, not copied into the heap
+    assert not any(column.flags.owndata for column in table.columns.values())
+
+
+def test_history_range_query(tmp_path):
+    day0 = (AS_OF - date(1970, 1, 1)).days
+    keywords = ["a", "b"]
+    days = [[day0 - 28, day0 - 14, day0 - 7, day0], [day0 - 30, day0]]
+    ranks = [[40.0, 30.0, float("nan"), 10.0], [90.0, 80.0]]
+    offsets = np.cumsum([0] + [len(d) for d in days])
+    history = {
+        "rank": np.concatenate(ranks),
+        "weekly_sales_units": np.full(offsets[-1], 100.0),
+    }
+
+    signal_store.write_store(str(tmp_path), "marketplace", keywords, offsets, np.concatenate(days), history,
+                             day0, marketplace_service._build_table)
+    store = signal_store.SignalStore(str(tmp_path))
+
+    got_days, got_ranks = store.history(0, "rank", day0 - 14, day0 - 1)
+    assert got_days.tolist() == [day0 - 14, day0 - 7]
+    assert np.array_equal(got_ranks, [30.0, float("nan")], equal_nan=True)
+    # rank_7d_ago falls back to the last known value before a gap
+    row = store.table().row("a", marketplace_service._FIELDS)
+    assert (row["current_rank"], row["rank_7d_ago"]) == (10, 30)
+    assert store.table().row("b", marketplace_service._FIELDS)["current_rank"] == 80
@@ -0,0 +1,116 @@
+# tests/test_signal_table.py
+
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from services import marketplace_service, pinterest_service
+from services.signal_table import SignalTable
+from utils.normalizer import round_array
+
+
+def _comparable(row):
+    """NaN (missing CSV values) compares equal to NaN."""
+    return {k: "nan" if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()}
+
+
+# The per-row pandas lookups the tables replaced, kept as the reference
+
+def _marketplace_row(df, keyword):
+    row = df[df['keyword'] == keyword].iloc[0]
+    rank_velocity = float(row['rank_7d_ago']) - float(row['rank_today'])
+    sales_growth_pct = (
+        (float(row['weekly_sales_units']) - float(row['sales_4w_avg']))
+        / (float(row['sales_4w_avg']) + 0.001)
+    ) * 100
+    velocity_norm = min(max((rank_velocity / 50.0) * 100, 0), 100)
+    sales_norm = min(max(sales_growth_pct, 0), 100)
+    return {
+        "current_rank": int(row['rank_today']),
+        "rank_7d_ago": int(row['rank_7d_ago']),
+        "rank_velocity": round(rank_velocity, 1),
+        "sales_growth_pct": round(sales_growth_pct, 1),
+        "normalized_score": round((velocity_norm * 0.6) + (sales_norm * 0.4), 1),
+    }
+
+
+def _pinterest_row(df, keyword):
+    row = df[df['keyword'] == keyword].iloc[0]
+    save_growth = ((float(row['weekly_saves']) - float(row['saves_4w_avg']))
+                   / (float(row['saves_4w_avg']) + 0.001)) * 100
+    board_growth = ((float(row['board_count']) - float(row['boards_4w_avg']))
+                    / (float(row['boards_4w_avg']) + 0.001)) * 100
+    save_norm = min(max(save_growth, 0), 100)
+    board_norm = min(max(board_growth, 0), 100)
+    return {
+        "weekly_saves": int(row['weekly_saves']),
+        "save_growth_pct": round(save_growth, 1),
+        "board_count": int(row['board_count']),
+        "board_growth_pct": round(board_growth, 1),
+        "normalized_score": round((save_norm * 0.7) + (board_norm * 0.3), 1),
+    }
+
+
+def _random_marketplace(n, rng):
+    return pd.DataFrame({
+        "keyword": [f"kw {rng.randrange(n // 2)}" for _ in range(n)],  # duplicates on purpose
+        "rank_today": [rng.randint(1, 200) for _ in range(n)],
+        "rank_7d_ago": [rng.randint(1, 200) for _ in range(n)],
+        "weekly_sales_units": [rng.randint(0, 5000) for _ in range(n)],
+        "sales_4w_avg": [rng.choice([0, rng.randint(1, 5000), round(rng.uniform(0, 5000), 2)]) for _ in range(n)],
+    })
+
+
+def _random_pinterest(n, rng):
+    return pd.DataFrame({
+        "keyword": [f"kw {rng.randrange(n // 2)}" for _ in range(n)],
+        "weekly_saves": [rng.randint(0, 90000) for _ in range(n)],
+        "saves_4w_avg": [rng.choice([0, rng.randint(1, 90000)]) for _ in range(n)],
+        "board_count": [rng.randint(0, 3000) for _ in range(n)],
+        "boards_4w_avg": [rng.choice([0, rng.randint(1, 3000)]) for _ in range(n)],
+    })
+
+
+@pytest.mark.parametrize("service, reference, frame", [
+    (marketplace_service, _marketplace_row, _random_marketplace),
+    (pinterest_service, _pinterest_row, _random_pinterest),
+])
+def test_table_matches_the_pandas_row_lookup(service, reference, frame):
+    frames = [pd.read_csv(service._CSV_PATH), frame(600, random.Random(3))]
+    for df in frames:
+        table = service._build_table(df)
+
+        for keyword in df['keyword'].unique():
+            assert _comparable(table.row(keyword, service._FIELDS)) == _comparable(reference(df, keyword)), keyword
+
+
+def test_rows_matches_row():
+    df = _random_marketplace(200, random.Random(5))
+    table = marketplace_service._build_table(df)
+    keywords = list(df['keyword'].unique()) + ["not a keyword"]
+
+    rows = table.rows(keywords, marketplace_service._FIELDS)
+
+    assert "not a keyword" not in rows
+    assert rows == {k: table.row(k, marketplace_service._FIELDS) for k in keywords if k in table}
+    assert table.row("not a keyword", marketplace_service._FIELDS) is None
+
+
+def test_round_array_matches_builtin_round():
+    rng = random.Random(11)
+    values = [rng.uniform(-1000, 1000) for _ in range(20000)]
+    # Decimal ties and values a hair either side of them
+    values += [i / 100 + 0.005 for i in range(-1000, 1000)]
+    values += [(i + 0.5) / 10 * (1 + d) for i in range(-500, 500) for d in (-1e-15, 0, 1e-15)]
+
+    assert round_array(values, 1).tolist() == [round(v, 1) for v in values]
+
+
+def test_changed_keywords():
+    old = SignalTable(["a", "b", "c"], {"x": [1.0, 2.0, float("nan")]})
+    new = SignalTable(["a", "b", "c", "d"], {"x": [1.0, 3.0, float("nan"), 4.0]})
+
+    assert old.changed_keywords(new) == {"b", "d"}
+    assert old.changed_keywords(old) == set()
@@ -0,0 +1,39 @@
+# tests/test_singleflight.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache.singleflight import SingleFlight
+
+
+def test_go_frees_the_key_when_the_executor_refuses():
+    flights = SingleFlight()
+    pool = ThreadPoolExecutor(1)
+    pool.shutdown()
+
+    with pytest.raises(RuntimeError):
+        flights.go("k", lambda: "never", pool)
+
+    # The key isn't stuck: a later call starts
+    with ThreadPoolExecutor(1) as live:
+        assert flights.go("k", lambda: "ran", live)
+
+
+def test_go_fails_waiters_when_the_executor_refuses():
+    flights = SingleFlight()
+    joined = []
+
+    class RefusingExecutor:
+        def submit(self, fn, *args):
+            # What a caller arriving now would wait on
+            joined.append(flights._calls["k"])
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+    with pytest.raises(RuntimeError):
+        flights.go("k", lambda: "never", RefusingExecutor())
+
+    call, = joined
+    assert call.done.is_set()
+    assert isinstance(call.error, RuntimeError)
+    assert flights._calls == {}
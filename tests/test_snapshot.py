@@ -0,0 +1,88 @@
+# tests/test_snapshot.py
+
+import asyncio
+import gzip
+from dataclasses import replace
+
+import pytest
+
+import app
+import asgi
+import config
+from services import trends_async
+from utils.snapshot import Snapshot
+
+KEYWORD = config.KEYWORDS[5]
+
+
+def test_identical_payloads_share_an_etag():
+    payload = {"b": [1, 2.5, None], "a": "linen"}
+    first, second = Snapshot(payload), Snapshot(dict(reversed(payload.items())))
+
+    assert first.etag == second.etag
+    assert Snapshot({**payload, "a": "silk"}).etag != first.etag
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ("{etag}", True),
+    ("W/{etag}", True),
+    ('"stale", {etag}', True),
+    ('"stale"', False),
+])
+def test_if_none_match(header, matches):
+    snapshot = Snapshot({"status": "ok"})
+    header = header.format(etag=snapshot.etag) if header else header
+
+    assert snapshot.matches(header) is matches
+
+
+def test_encoded_bodies_decode_to_the_same_json():
+    snapshot = Snapshot({"data": list(range(100))})
+
+    body, encoding = snapshot.encoded("gzip;q=1.0, identity")
+    assert (gzip.decompress(body), encoding) == (snapshot.body, "gzip")
+    assert snapshot.encoded(None) == (snapshot.body, None)
+
+
+def test_detail_snapshot_changes_only_with_the_analysis(fake):
+    analysis = app.serve_analysis(KEYWORD)
+    snapshot = app.detail_snapshot(KEYWORD, analysis)
+
+    assert app.detail_snapshot(KEYWORD, analysis) is snapshot
+    newer = replace(analysis, generated_at="2099-01-01T00:00:00")
+    assert app.detail_snapshot(KEYWORD, newer).etag != snapshot.etag
+
+
+def test_flask_detail_answers_a_matching_etag_with_304(fake):
+    client = app.app.test_client()
+    url = f"/api/trends/detail?keyword={KEYWORD}"
+    first = client.get(url)
+    assert first.status_code == 200
+
+    again = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_asgi_detail_sends_the_same_etag_and_304(fake):
+    etag = app.app.test_client().get(f"/api/trends/detail?keyword={KEYWORD}").headers["ETag"]
+
+    async def run():
+        try:
+            fresh = await asgi.detail({"keyword": [KEYWORD]}, {})
+            cached = await asgi.detail({"keyword": [KEYWORD]}, {"if-none-match": etag})
+            return fresh, cached
+        finally:
+            await trends_async.aclose()
+
+    (status, headers, _body), (cached_status, _, cached_body) = asyncio.run(run())
+
+    assert status == 200
+    assert dict(headers)[b"etag"] == etag.encode()
+    assert (cached_status, cached_body) == (304, b"")
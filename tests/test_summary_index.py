@@ -0,0 +1,168 @@
+# tests/test_summary_index.py
+
+import random
+import threading
+
+import pytest
+
+import app
+from services.summary_index import SORT_FIELDS, SummaryIndex, decode_cursor, encode_cursor
+
+CLASSES = ["Accelerating", "Emerging", "Stable", "Declining"]
+
+
+def _rows(n=300, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        keyword = f"kw {i:03d}"
+        if rng.random() < 0.1:
+            rows.append({"keyword": keyword, "category": rng.choice(["tops", "bottoms"]), "status": "pending"})
+            continue
+        # Few distinct values, so sorts have plenty of ties to break by keyword
+        score = lambda: float(rng.randint(0, 20) * 5)
+        rows.append({
+            "keyword": keyword,
+            "category": rng.choice(["tops", "bottoms", "shoes"]),
+            "status": "ok",
+            "trend_score": score(),
+            "classification": rng.choice(CLASSES),
+            "adjustment_pct": rng.choice([-20, -10, 0, 10, 20, 30]),
+            "signals": {"google_trends_score": score(), "marketplace_score": score(), "pinterest_score": score()},
+        })
+    rows.sort(key=lambda row: rng.random())  # dashboard order isn't keyword order
+    return rows
+
+
+def _reference(rows, categories=None, classifications=None, min_score=None, max_score=None,
+               sort=None, descending=True):
+    """Filter and sort with plain Python: what every page put together must equal."""
+    def keep(row):
+        analysed = row["status"] == "ok"
+        if (sort or classifications or min_score is not None or max_score is not None) and not analysed:
+            return False
+        if categories and row["category"] not in categories:
+            return False
+        if classifications and row["classification"] not in classifications:
+            return False
+        if min_score is not None and row["trend_score"] < min_score:
+            return False
+        if max_score is not None and row["trend_score"] > max_score:
+            return False
+        return True
+
+    kept = [row for row in rows if keep(row)]
+    if sort:
+        sign = -1 if descending else 1
+        kept.sort(key=lambda row: (sign * SORT_FIELDS[sort](row), row["keyword"]))
+    return [row["keyword"] for row in kept]
+
+
+def _all_pages(index, limit, **query):
+    keywords, after, pages = [], None, 0
+    while True:
+        total, rows, last = index.query(limit=limit, after=after, **query)
+        keywords += [row["keyword"] for row in rows]
+        pages += 1
+        if last is None:
+            return total, keywords, pages
+        # Through the wire format, as a client would
+        after = decode_cursor(encode_cursor(last), query.get("sort"))
+
+
+QUERIES = [
+    {},
+    {"categories": ("tops",)},
+    {"classifications": ("Emerging", "Stable"), "min_score": 20.0, "max_score": 80.0},
+    {"sort": "trend_score"},
+    {"sort": "trend_score", "descending": False, "categories": ("shoes", "tops")},
+    {"sort": "adjustment_pct", "min_score": 50.0},
+    {"sort": "pinterest_score", "descending": False},
+    {"sort": "google_trends_score", "classifications": ("Declining",)},
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_top_k_matches_a_full_sort(query):
+    rows = _rows()
+    index = SummaryIndex(rows)
+    expected = _reference(rows, **query)
+
+    for limit in (1, 7, 50, None):
+        total, page, _ = index.query(limit=limit, **query)
+        assert total == len(expected)
+        assert [row["keyword"] for row in page] == expected[:limit]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_cursor_pages_cover_every_row_once(query):
+    rows = _rows()
+    index = SummaryIndex(rows)
+    expected = _reference(rows, **query)
+
+    total, keywords, pages = _all_pages(index, 13, **query)
+
+    assert total == len(expected)
+    assert keywords == expected
+    assert pages == max(1, -(-len(expected) // 13))
+
+
+def test_cursor_survives_rows_changing_underneath():
+    rows = _rows()
+    first = SummaryIndex(rows)
+    _, page, last = first.query(sort="trend_score", limit=20)
+
+    # A later snapshot in which an already-served row dropped to the bottom
+    changed = [dict(row) for row in rows]
+    moved = next(row for row in changed if row["keyword"] == page[0]["keyword"])
+    moved["trend_score"] = -1.0
+    _, rest, _ = SummaryIndex(changed).query(sort="trend_score", after=last)
+
+    served = {row["keyword"] for row in page}
+    assert not served & {row["keyword"] for row in rest[:-1]}
+    assert rest[-1]["keyword"] == moved["keyword"]
+
+
+@pytest.mark.parametrize("cursor, sort", [
+    ("not base64!", None),
+    (encode_cursor([1]), "trend_score"),
+    (encode_cursor([50.0, "kw"]), None),
+    (encode_cursor([True]), None),
+])
+def test_decode_cursor_rejects_bad_cursors(cursor, sort):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, sort)
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity"])
+def test_non_finite_score_bounds_are_rejected(value):
+    for name in ("min_score", "max_score"):
+        with pytest.raises(ValueError, match="finite"):
+            app.parse_summary_query({name: value})
+
+    response = app.app.test_client().get(f"/api/trends/summary?min_score={value}")
+    assert response.status_code == 400
+
+
+def test_concurrent_summary_builds_get_their_own_version(monkeypatch):
+    monkeypatch.setattr(app, "_SUMMARY", None)
+    keywords = [f"kw {i}" for i in range(8)]
+    barrier = threading.Barrier(len(keywords))
+    built = {}
+
+    def build(keyword):
+        barrier.wait()
+        # A different error per thread, so every fingerprint differs
+        built[keyword] = app.summary_snapshot(dict.fromkeys(keywords), {keyword})
+
+    threads = [threading.Thread(target=build, args=(keyword,)) for keyword in keywords]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({snapshot.version for snapshot in built.values()}) == len(keywords)
+    # The index always belongs to the snapshot it was published with
+    summary, index, payload = app._SUMMARY
+    assert summary.body == app.Snapshot(payload).body
+    assert [row["status"] for row in index.rows] == [row["status"] for row in payload["data"]]
@@ -0,0 +1,28 @@
+# tests/test_trends_async.py
+
+import asyncio
+
+import config
+from services import trends_async, trends_service
+
+
+async def _closing(coro):
+    try:
+        return await coro
+    finally:
+        await trends_async.aclose()
+
+
+def test_concurrent_fetches_prime_cookies_once(fake):
+    trends_service.anchor_reference()
+    keywords = config.KEYWORDS[20:26]
+    primings = fake.counts["explore_page"]
+
+    async def fetch_all():
+        state = trends_async._state()
+        return await asyncio.gather(*(trends_async._fetch_live(state, keyword) for keyword in keywords))
+
+    results = asyncio.run(_closing(fetch_all()))
+
+    assert [result.source for result in results] == ["live"] * len(keywords)
+    assert fake.counts["explore_page"] == primings + 1
@@ -0,0 +1,138 @@
+# tests/test_trends_service.py
+
+import asyncio
+import time
+
+import pytest
+
+import config
+from cache import cache_manager
+from services import trends_async, trends_service
+
+KEYWORDS = config.KEYWORDS[10:20]
+
+
+@pytest.fixture(autouse=True)
+def fresh_reference():
+    cache_manager.delete(trends_service._REFERENCE_KEY)
+    yield
+
+
+def test_single_and_batched_fetches_share_one_scale(fake):
+    keyword, *others = KEYWORDS
+    single = trends_service._fetch_live(keyword)
+    batched = trends_service.fetch_google_trends_batch([keyword] + others[:3])[keyword]
+    other_batch = trends_service.fetch_google_trends_batch(others[3:] + [keyword])[keyword]
+
+    for result in (batched, other_batch):
+        assert result.source == "live"
+        # The fake rounds each request's values to integers on its own peak
+        assert result.four_week_avg == pytest.approx(single.four_week_avg, rel=0.03, abs=1)
+        assert result.current_interest == pytest.approx(single.current_interest, rel=0.05, abs=2)
+
+
+def test_separate_batch_calls_share_one_scale(fake):
+    keyword = KEYWORDS[0]
+    first = trends_service.fetch_google_trends_batch([keyword])[keyword]
+    second = trends_service.fetch_google_trends_batch(KEYWORDS[5:9] + [keyword])[keyword]
+
+    assert second.four_week_avg == pytest.approx(first.four_week_avg, rel=0.03, abs=1)
+
+
+def test_anchor_reference_is_the_anchor_on_its_own_scale(fake):
+    reference = trends_service.anchor_reference()
+    anchor = trends_service._fetch_live(config.ANCHOR_KEYWORD)
+
+    assert reference == pytest.approx(anchor.four_week_avg, abs=0.05)
+    assert trends_service.anchor_reference() == reference
+
+
+def test_async_single_fetch_matches_the_sync_scale(fake):
+    keyword = KEYWORDS[2]
+    single = trends_service._fetch_live(keyword)
+
+    async def run():
+        try:
+            return await trends_async._fetch_live(trends_async._state(), keyword)
+        finally:
+            await trends_async.aclose()
+
+    result = asyncio.run(run())
+
+    assert result.four_week_avg == pytest.approx(single.four_week_avg, abs=0.05)
+
+
+def _prefetch(keywords, timeout=10):
+    trends_service.prefetch_google_trends(keywords)
+    until = time.monotonic() + timeout
+    while trends_service._PENDING and time.monotonic() < until:
+        time.sleep(0.02)
+
+
+def test_prefetch_sends_batches_concurrently(fake):
+    trends_service.anchor_reference()
+    keywords = config.KEYWORDS[40:72]
+    for keyword in keywords:
+        cache_manager.delete(trends_service._cache_key(keyword))
+    fake.latency_ms = 200
+    batches = len(keywords) // (trends_service.BATCH_MAX_TERMS - 1)
+
+    started = time.monotonic()
+    _prefetch(keywords)
+    elapsed = time.monotonic() - started
+
+    assert all(trends_service.is_cached(keyword) for keyword in keywords)
+    # One batch after another would take 2 round-trips (explore + multiline) each
+    assert elapsed < batches * 2 * 0.2 / 2
+    assert not any(cache_manager.locked(trends_service._cache_key(keyword)) for keyword in keywords)
+
+
+def test_prefetch_leaves_out_keywords_locked_elsewhere(fake):
+    keywords = config.KEYWORDS[72:76]
+    for keyword in keywords:
+        cache_manager.delete(trends_service._cache_key(keyword))
+    busy = trends_service._cache_key(keywords[0])
+    assert cache_manager.acquire_lock(busy, ttl=30)
+    try:
+        _prefetch(keywords)
+
+        assert not trends_service.is_cached(keywords[0])
+        assert all(trends_service.is_cached(keyword) for keyword in keywords[1:])
+        assert cache_manager.locked(busy)
+    finally:
+        cache_manager.release_lock(busy)
+
+
+def test_summary_keeps_long_tail_growth():
+    signal = trends_service._summarize("long tail", [0.002, 0.002, 0.002, 0.004])
+
+    assert signal.growth_pct == pytest.approx(60.0)
+    assert signal.current_interest == 0.004
+    assert trends_service._summarize("none", [0, 0, 0]).growth_pct == 0.0
+
+
+def test_summary_caps_only_the_score_above_the_anchor_scale():
+    signal = trends_service._summarize("bigger than the anchor", [150.0, 250.0])
+
+    assert signal.normalized_score == 100.0
+    assert (signal.current_interest, signal.four_week_avg) == (250.0, 200.0)
+
+
+def test_fetch_uses_a_result_published_while_it_took_the_lock(fake, monkeypatch):
+    keyword = config.KEYWORDS[21]
+    key = trends_service._cache_key(keyword)
+    cache_manager.delete(key)
+    published = trends_service._summarize(keyword, [40, 50])
+    acquire_lock = cache_manager.acquire_lock
+
+    def batch_finishes_first(lock_key, ttl):
+        # A prefetch publishes (and clears its pending event) just before
+        cache_manager.set(key, published, ttl=60)
+        return acquire_lock(lock_key, ttl=ttl)
+
+    monkeypatch.setattr(cache_manager, "acquire_lock", batch_finishes_first)
+    calls = fake.counts["multiline"]
+
+    assert trends_service.fetch_google_trends(keyword) == published
+    assert fake.counts["multiline"] == calls
+    assert not cache_manager.locked(key)
@@ -0,0 +1,84 @@
+# utils/circuit_breaker.py
+
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    closed     calls go through; `failure_threshold` consecutive failures open it
+    open       calls fail fast until `reset_timeout` seconds have passed
+    half_open  one probe call at a time; success closes the circuit, failure
+               re-opens it with the timeout doubled (up to `max_reset_timeout`)
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, max_reset_timeout: float = None):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout or reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may go ahead now. In half-open state this claims the probe."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """True while calls would be refused (without claiming a probe)."""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self.opened_at < self.reset_timeout
+            return self.state == "half_open" and self._probing
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print("[BREAKER] Probe succeeded; circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                self._open()
+            elif self.state == "closed" and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.opened_count += 1
+        self._probing = False
+        print(f"[BREAKER] Circuit open after {self.failures} failures; next probe in {self.reset_timeout:.0f}s")
+
+    def status(self) -> dict:
+        with self._lock:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state == "open" else 0.0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.opened_count,
+                "retry_in_seconds": round(retry_in, 1),
+            }
@@ -0,0 +1,57 @@
+# utils/deadline.py
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# ─────────────────────────────────────────────
+# Deadline budgets
+# ─────────────────────────────────────────────
+# A budget is set once where work starts (a request handler, a background
+# analysis) and read by everything underneath it — lock waits, prefetch
+# waits, Google limiter and session checkouts — through remaining(cap):
+# the smaller of that call's own timeout and what is left of the budget.
+# The deadline lives in a context variable, so it follows the work into
+# asyncio tasks and into threads started with contextvars.copy_context().
+# ─────────────────────────────────────────────
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def scope(seconds: float):
+    """Runs the block with a deadline `seconds` from now, or the enclosing one if that is sooner."""
+    at = time.monotonic() + seconds
+    outer = _DEADLINE.get()
+    token = _DEADLINE.set(at if outer is None else min(outer, at))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+@contextmanager
+def detached(seconds: float):
+    """
+    Like scope(), ignoring any enclosing deadline: for shared work that
+    outlives the request that started it (it keeps filling the cache).
+    """
+    token = _DEADLINE.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining(cap: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds left in the current budget, at most cap and never negative.
+    Without a budget: cap (None meaning no limit).
+    """
+    at = _DEADLINE.get()
+    if at is None:
+        return cap
+    left = max(0.0, at - time.monotonic())
+    return left if cap is None else min(cap, left)
+
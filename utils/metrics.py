@@ -0,0 +1,167 @@
+# utils/metrics.py
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# ─────────────────────────────────────────────
+# In-process metrics, Prometheus text format
+# ─────────────────────────────────────────────
+# Counters and fixed-bucket histograms keyed by label values. Recording is
+# a dict lookup, a bisect and a locked increment; nothing is formatted
+# until /api/metrics is scraped. Gauges (and CounterFuncs, totals counted
+# elsewhere) are read from callbacks at scrape time. Values are per worker
+# process.
+# ─────────────────────────────────────────────
+
+# Seconds; covers a sub-millisecond cache read up to a slow Google fetch
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_registry = []
+_lock = threading.Lock()
+
+
+def _label_text(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_label_text(self.labels, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _register(self)
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 3)
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), series):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_label_text(names, key + (_number(bound),))} {cumulative}")
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """Read at scrape time: fn() returns a number or {label value tuple: number}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable, labels: tuple = ()):
+        self.name, self.help, self.labels, self.fn = name, help, tuple(labels), fn
+        _register(self)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            value = self.fn()
+        except Exception as e:
+            print(f"[METRICS] Gauge {self.name} failed: {e}")
+            return lines
+        items = sorted(value.items()) if isinstance(value, dict) else [((), value)]
+        lines += [f"{self.name}{_label_text(self.labels, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class CounterFunc(Gauge):
+    """A Gauge for running totals kept elsewhere (e.g. cache stats): exported as a counter."""
+    kind = "counter"
+
+
+def _register(metric):
+    with _lock:
+        _registry.append(metric)
+
+
+def render() -> str:
+    """Every registered metric in Prometheus text exposition format."""
+    with _lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ─────────────────────────────────────────────
+# Application metrics
+# ─────────────────────────────────────────────
+
+STAGE_SECONDS = Histogram(
+    "trendspire_stage_seconds", "Time spent in each analysis pipeline stage.", ("stage",))
+REQUEST_SECONDS = Histogram(
+    "trendspire_http_request_seconds", "Time to handle an HTTP request, by route.", ("route", "method", "status"))
+GOOGLE_RESULTS = Counter(
+    "trendspire_google_results_total", "Google Trends results produced, by source (live or fallback).", ("source",))
+GOOGLE_HTTP_RETRIES = Counter(
+    "trendspire_google_http_retries_total", "Retried Google Trends HTTP requests, by reason.", ("reason",))
+ADMISSION_SHED = Counter(
+    "trendspire_admission_shed_total",
+    "Cold work turned away instead of queued, by limit (cold_fetch or cold_wait) and priority.",
+    ("limit", "priority"))
+DEGRADED_ANALYSES = Counter(
+    "trendspire_degraded_analyses_total",
+    "Analyses served with Google neutral-filled because the request was shed or ran out of time, by reason.",
+    ("reason",))
@@ -1,5 +1,8 @@
 # utils/normalizer.py
 
+import numpy as np
+
+
 def min_max_normalize(value: float, min_val: float, max_val: float) -> float:
     """
     Converts a value to a 0-100 scale given a known min and max.
@@ -13,3 +16,20 @@ def min_max_normalize(value: float, min_val: float, max_val: float) -> float:
 def clamp(value: float, low: float = 0.0, high: float = 100.0) -> float:
     """Force a value to stay within a given range."""
     return round(max(low, min(high, value)), 1)
+
+def round_array(values, ndigits: int = 1) -> np.ndarray:
+    """
+    Vectorized round() that gives exactly the same result as Python's
+    built-in round(x, ndigits) for every element.
+    np.round scales by 10**ndigits before rounding, which can push a value
+    that sits just off a .5 boundary onto it — those near-ties are
+    re-rounded one by one with the built-in.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        idx = np.flatnonzero(ties)
+        rounded[idx] = [round(float(v), ndigits) for v in values[idx]]
+    return rounded
@@ -0,0 +1,140 @@
+# utils/rate_limiter.py
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills at
+    `rate` tokens per second. Each unit of work takes one token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available right now."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """Block until tokens are available. Returns False if timeout passes first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return round(self._tokens, 2)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted AIMD-style: every successful call raises the
+    limit by 1/limit (about +1 per limit's worth of calls), a throttled call
+    halves it — at most once per `cooldown` seconds, so one burst of 429s
+    from requests that were already in flight counts as one signal.
+    Callers hold a slot from acquire() to release(outcome), where outcome
+    is "ok", "throttled" or "skipped" (slot unused; limit unchanged).
+    """
+
+    def __init__(self, initial: float, minimum: float = 1, maximum: float = 16, cooldown: float = 1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown
+        self._limit = float(initial)
+        self._inflight = 0
+        self._decreased_at = float("-inf")
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._inflight < int(self._limit):
+                self._inflight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Block until a slot is free. Returns False if timeout passes first."""
+        with self._cond:
+            ok = self._cond.wait_for(lambda: self._inflight < int(self._limit), timeout)
+            if ok:
+                self._inflight += 1
+            return ok
+
+    def release(self, outcome: str = "ok"):
+        with self._cond:
+            self._inflight -= 1
+            if outcome == "throttled":
+                now = time.monotonic()
+                if now - self._decreased_at >= self.cooldown:
+                    self._limit = max(self.minimum, self._limit / 2)
+                    self._decreased_at = now
+            elif outcome == "ok":
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+
+class PriorityLimiter:
+    """
+    Non-blocking concurrency limit with priority classes. All classes share
+    one in-flight count, but each may only take a slot while the count is
+    below its own limit in `limits`, so a lower-priority class (given a
+    smaller limit) is turned away first and leaves headroom for the others.
+    try_acquire never waits: a caller that isn't admitted degrades instead
+    of queueing, and calls release() when an admitted slot is done.
+    """
+
+    def __init__(self, limits: dict):
+        self.limits = dict(limits)
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, priority: str) -> bool:
+        with self._lock:
+            if self._inflight < self.limits[priority]:
+                self._inflight += 1
+                return True
+            return False
+
+    def release(self):
+        with self._lock:
+            self._inflight -= 1
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
@@ -0,0 +1,102 @@
+# utils/session_pool.py
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+import requests
+
+# Statuses that mean the server no longer accepts this session's cookies
+# (not 429: that is throttling, and re-priming would only add requests)
+_REJECTED_STATUSES = {401, 403}
+
+
+class _Pooled:
+    __slots__ = ("session", "primed_at")
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+        self.primed_at = None
+
+
+class SessionPool:
+    """
+    Up to `size` requests.Sessions, each with its own cookie jar and
+    keep-alive connections. checkout() lends one session to one caller at
+    a time, so no two threads ever share a session. A session is primed
+    (prime(session), e.g. a page visit that sets cookies) on first use and
+    again only when a cookie has expired, it is older than `max_age`
+    seconds, or the server rejected it (401/403). Priming happens inside
+    checkout(), so it is covered by whatever guards the caller holds then.
+    """
+
+    def __init__(self, size: int, factory: Callable[[], requests.Session],
+                 prime: Callable[[requests.Session], None], max_age: float):
+        self.size = size
+        self.factory = factory
+        self.prime = prime
+        self.max_age = max_age
+        self.primes = 0
+        self._lock = threading.Lock()
+        self._reset()
+        # Sessions' sockets must not be shared with a forked worker
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._idle = queue.LifoQueue()
+        self._created = 0
+
+    def _take(self, timeout: float) -> _Pooled:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return _Pooled(self.factory())
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No free session in the pool")
+
+    def _needs_priming(self, pooled: _Pooled) -> bool:
+        if pooled.primed_at is None:
+            return True
+        now = time.time()
+        if now - pooled.primed_at > self.max_age:
+            return True
+        return any(c.expires is not None and c.expires <= now for c in pooled.session.cookies)
+
+    @contextmanager
+    def checkout(self, timeout: float = None):
+        """Lends out a primed session, returning it to the pool afterwards (LIFO: the warmest goes first)."""
+        pooled = self._take(timeout)
+        try:
+            if self._needs_priming(pooled):
+                self._prime(pooled)
+            yield pooled.session
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in _REJECTED_STATUSES:
+                pooled.primed_at = None
+            raise
+        finally:
+            self._idle.put(pooled)
+
+    def _prime(self, pooled: _Pooled):
+        pooled.session.cookies.clear()
+        try:
+            self.prime(pooled.session)
+        except Exception as e:
+            # Still usable; priming is retried on the next checkout
+            print(f"[SESSIONS] Could not prime session: {e}")
+            return
+        pooled.primed_at = time.time()
+        with self._lock:
+            self.primes += 1
+
+    def status(self) -> dict:
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize(), "primes": self.primes}
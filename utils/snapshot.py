@@ -0,0 +1,77 @@
+# utils/snapshot.py
+
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from utils.metrics import STAGE_SECONDS
+
+# orjson and brotli are optional: without them we fall back to the stdlib
+# encoder and serve gzip only.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dumps(payload) -> bytes:
+    """Compact JSON with sorted keys — the same shape Flask's jsonify produces."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class Snapshot:
+    """
+    A response body encoded once and reused until its content changes:
+    raw JSON bytes, pre-compressed variants, a content-hash ETag and a
+    Last-Modified date.
+    """
+
+    __slots__ = ("fingerprint", "version", "body", "gzip_body", "br_body", "etag", "last_modified")
+
+    def __init__(self, payload, fingerprint=None, version: int = 1, modified_at: datetime = None):
+        self.fingerprint = fingerprint
+        self.version = version
+        with STAGE_SECONDS.time("serialize"):
+            self.body = dumps(payload)
+        with STAGE_SECONDS.time("compress"):
+            self.gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self.br_body = brotli.compress(self.body, quality=5) if brotli is not None else None
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        modified_at = modified_at or datetime.now(timezone.utc)
+        if modified_at.tzinfo is None:
+            modified_at = modified_at.replace(tzinfo=timezone.utc)
+        self.last_modified = format_datetime(modified_at, usegmt=True)
+
+    def headers(self) -> dict:
+        """Validator and caching headers sent with every response for this snapshot."""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+
+    def encoded(self, accept_encoding: str) -> tuple:
+        """Picks the best body for an Accept-Encoding header: (bytes, content-encoding or None)."""
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        if self.br_body is not None and "br" in accepted:
+            return self.br_body, "br"
+        if "gzip" in accepted:
+            return self.gzip_body, "gzip"
+        return self.body, None
+
+    def matches(self, if_none_match: str) -> bool:
+        """True if an If-None-Match header already names this snapshot."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags